@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio loaders of notebooks, for many concurrent (slow) file reads
+
+Usage:
+
+    async for nb in load_many(paths, concurrency=32):
+        ...
+
+The files are read in a pool of threads (the reads overlap, up to the
+given concurrency) and parsed in an executor, so that the event loop is
+never blocked.
+"""
+
+# Python Standard Library
+import asyncio
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Local Libraries
+import notebook_json
+from notebook_v2 import NotebookLoader
+
+
+DEFAULT_CONCURRENCY = 16
+
+
+def read_file(filename):
+    r"""Read a file (bytes); the default (blocking) reader of the loaders."""
+    with open(filename, "rb") as file:
+        return file.read()
+
+
+def parse_notebook(data):
+    r"""Build a `notebook_v2.Notebook` from the content (bytes) of a .ipynb file.
+
+    The function is picklable: it may run in a `ProcessPoolExecutor`.
+    """
+    return NotebookLoader.from_ipynb(notebook_json.loads(data))
+
+
+class AsyncNotebookLoader:
+    r"""Loads a Jupyter Notebook from a file, without blocking the event loop.
+
+    Args:
+        filename (str): The name of the file to load.
+        executor (concurrent.futures.Executor): The executor of the parsing
+            (defaults to the default executor of the event loop; use a
+            `ProcessPoolExecutor` to parse large notebooks in parallel).
+        read (callable): The (blocking) function reading a file, run in a
+            thread (defaults to `read_file`).
+        io_executor (concurrent.futures.ThreadPoolExecutor): The threads of
+            the reads (defaults to the default executor of the event loop).
+        semaphore (asyncio.Semaphore): Limits the number of concurrent reads
+            (defaults to None, no limit).
+
+    Usage:
+
+        >>> nb = asyncio.run(AsyncNotebookLoader("samples/hello-world.ipynb").load())
+        >>> nb.version
+        '4.5'
+        >>> [cell.id for cell in nb]
+        ['a9541506', 'b777420a', 'a23ab5ac']
+    """
+    def __init__(self, filename, executor=None, read=read_file, io_executor=None,
+                 semaphore=None):
+        self.filename = filename
+        self.executor = executor
+        self.read = read
+        self.io_executor = io_executor
+        self.semaphore = semaphore
+
+    async def read_bytes(self):
+        r"""Reads the content (bytes) of the file, in a thread."""
+        loop = asyncio.get_running_loop()
+        if self.semaphore is None:
+            return await loop.run_in_executor(self.io_executor, self.read, self.filename)
+        async with self.semaphore:
+            return await loop.run_in_executor(self.io_executor, self.read, self.filename)
+
+    async def load(self):
+        r"""Loads a `notebook_v2.Notebook` instance from the file."""
+        data = await self.read_bytes()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, parse_notebook, data)
+
+
+async def load_many(paths, concurrency=DEFAULT_CONCURRENCY, executor=None, read=read_file):
+    r"""Load many notebooks concurrently; yield them in the order of paths.
+
+    At most `concurrency` files are read at the same time (in as many
+    threads), and at most twice as many notebooks are loaded ahead of the
+    one being yielded, which bounds the memory used. When a notebook can't
+    be loaded, its exception is raised and the pending loads are cancelled.
+
+    Args:
+        paths (iterable): the .ipynb files.
+        concurrency (int): the maximal number of concurrent reads.
+        executor (concurrent.futures.Executor): the executor of the parsing
+            (see `AsyncNotebookLoader`).
+        read (callable): the (blocking) function reading a file.
+
+    Usage:
+
+        >>> async def versions(paths):
+        ...     return [nb.version async for nb in load_many(paths, concurrency=2)]
+        >>> asyncio.run(versions(["samples/minimal.ipynb", "samples/hello-world.ipynb"]))
+        ['4.5', '4.5']
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, not {concurrency}")
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    paths = iter(paths)
+    pending = collections.deque()
+    io_executor = ThreadPoolExecutor(concurrency, thread_name_prefix="notebook-read")
+
+    def schedule():
+        # Les tâches en avance attendent le sémaphore, sans rien lire
+        for path in paths:
+            loader = AsyncNotebookLoader(
+                os.fspath(path), executor, read, io_executor, semaphore
+            )
+            pending.append(asyncio.ensure_future(loader.load()))
+            if len(pending) >= 2 * concurrency:
+                break
+
+    try:
+        schedule()
+        while pending:
+            notebook = await pending.popleft()
+            schedule()
+            yield notebook
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Ne pas bloquer la boucle sur les lectures en cours (annulées)
+        io_executor.shutdown(wait=False)
@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+
+import notebook_async
+from notebook_v1 import Serializer
+from notebook_v2 import NotebookLoader
+
+SAMPLES = [
+    "samples/hello-world.ipynb",
+    "samples/errors.ipynb",
+    "samples/images.ipynb",
+    "samples/streams.ipynb",
+    "samples/minimal.ipynb",
+]
+
+
+class AsyncLoader(unittest.IsolatedAsyncioTestCase):
+    async def test_load(self):
+        for filename in SAMPLES:
+            nb = await notebook_async.AsyncNotebookLoader(filename).load()
+            self.assertEqual(
+                Serializer(NotebookLoader(filename).load()).serialize(),
+                Serializer(nb).serialize(),
+            )
+
+    async def test_load_many_order(self):
+        paths = SAMPLES * 5
+        notebooks = [nb async for nb in notebook_async.load_many(paths, concurrency=3)]
+        self.assertEqual(
+            [[cell.id for cell in NotebookLoader(path).load()] for path in paths],
+            [[cell.id for cell in nb] for nb in notebooks],
+        )
+
+    async def test_load_many_concurrency(self):
+        lock, active, peak = threading.Lock(), [0], [0]
+
+        def read(filename):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return notebook_async.read_file(filename)
+
+        start = time.perf_counter()
+        count = 0
+        async for _ in notebook_async.load_many(SAMPLES * 4, concurrency=4, read=read):
+            count += 1
+        self.assertEqual(20, count)
+        self.assertEqual(4, peak[0])
+        self.assertLess(time.perf_counter() - start, 20 * 0.01)
+
+    async def test_load_many_error(self):
+        paths = ["samples/hello-world.ipynb", "samples/missing.ipynb"] + SAMPLES
+        loaded = []
+        with self.assertRaises(FileNotFoundError):
+            async for nb in notebook_async.load_many(paths, concurrency=2):
+                loaded.append(nb)
+        self.assertEqual(1, len(loaded))
+
+    async def test_bad_concurrency(self):
+        with self.assertRaises(ValueError):
+            async for _ in notebook_async.load_many(SAMPLES, concurrency=0):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+batch conversion of whole directories of notebooks
+
+Usage (command line):
+
+    python notebook_batch.py samples --target starboard-html --workers 4
+    python notebook_batch.py samples --count-errors --json
+    python notebook_batch.py samples --target percent --metrics metrics.prom
+"""
+
+# Python Standard Library
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Local Libraries
+import notebook_instrument
+import notebook_v0 as toolbox
+
+
+# Les conversions sont écrites au fil des cellules (out=), suivies du
+# retour à la ligne final qu'ajoutait print
+def _write_percent(ipynb, output):
+    with open(output, "w", encoding="utf-8") as file:
+        toolbox.to_percent(ipynb, out=file)
+        file.write("\n")
+
+
+def _write_starboard(ipynb, output):
+    with open(output, "w", encoding="utf-8") as file:
+        toolbox.to_starboard(ipynb, out=file)
+        file.write("\n")
+
+
+def _write_starboard_html(ipynb, output):
+    with open(output, "w", encoding="utf-8") as file:
+        toolbox.to_starboard(ipynb, html=True, out=file)
+        file.write("\n")
+
+
+def _write_cleared(ipynb, output):
+    toolbox.save_ipynb(toolbox.clear_outputs(ipynb), output)
+
+
+# target: (suffix of the output files, writer)
+TARGETS = {
+    "percent": (".py", _write_percent),
+    "starboard": (".nb", _write_starboard),
+    "starboard-html": (".html", _write_starboard_html),
+    "ipynb-cleared": ("-cleared.ipynb", _write_cleared),
+}
+# The suffixes of the notebooks written by the conversions, skipped when the
+# notebooks of a directory are collected (a nightly run over a tree must not
+# convert the outputs of the previous runs)
+GENERATED_SUFFIXES = tuple(
+    suffix for suffix, _ in TARGETS.values() if suffix.endswith(".ipynb")
+)
+
+
+ConversionResult = collections.namedtuple(
+    "ConversionResult", ["path", "output", "seconds", "error", "metrics"], defaults=(None,)
+)
+ConversionResult.__doc__ = r"""The outcome of the conversion of a notebook.
+
+    Attributes:
+        path (str): the converted notebook.
+        output (str): the converted file.
+        seconds (dict): the time spent to "load", "convert" (and write)
+            the notebook, and the "total".
+        error (str): the error which stopped the conversion (None on success).
+        metrics (dict): the `notebook_instrument.report` of the conversion
+            (None unless requested).
+"""
+
+
+def output_path(path, target, output_dir=None, relative=None):
+    r"""Return the name of the file a notebook is converted to.
+
+    Args:
+        path (str): the notebook file.
+        target (str): the conversion (see `TARGETS`).
+        output_dir (str): the directory of the converted files (defaults to
+            the directory of the notebook).
+        relative (str): the path of the notebook relative to the directory
+            it was found in (see `walk_notebooks`); its subdirectories are
+            kept in output_dir (defaults to the name of the notebook).
+
+    Usage:
+
+        >>> output_path("samples/hello-world.ipynb", "percent")
+        'samples/hello-world.py'
+        >>> output_path("samples/hello-world.ipynb", "ipynb-cleared", "build")
+        'build/hello-world-cleared.ipynb'
+        >>> output_path("t/a/nb.ipynb", "percent", "build", relative="a/nb.ipynb")
+        'build/a/nb.py'
+    """
+    suffix, _ = TARGETS[target]
+    path = Path(path)
+    if output_dir is None:
+        directory = path.parent
+    else:
+        directory = Path(output_dir) / Path(relative or path.name).parent
+    return str(directory / (path.stem + suffix))
+
+
+def check_outputs(tasks):
+    r"""Raise ValueError when two notebooks would be written to the same
+    file; tasks are (path, output, ...) tuples.
+    """
+    sources = {}
+    for path, output, *_ in tasks:
+        other = sources.setdefault(os.path.normpath(output), path)
+        if os.path.normpath(other) != os.path.normpath(path):
+            raise ValueError(f"{other!r} and {path!r} would both be written to {output!r}")
+
+
+def _convert(task):
+    path, target, output, metrics, trace_memory = task
+    if not metrics:
+        return _convert_file(path, target, output)
+    # L'instrumentation du processus est remise à zéro pour chaque notebook
+    with notebook_instrument.recording(trace_memory):
+        result = _convert_file(path, target, output)
+    return result._replace(metrics=notebook_instrument.report())
+
+
+def _convert_file(path, target, output):
+    _, write = TARGETS[target]
+    seconds = {}
+    start = time.perf_counter()
+    try:
+        ipynb = toolbox.load_ipynb(path)
+        loaded = time.perf_counter()
+        seconds["load"] = loaded - start
+        write(ipynb, output)
+        seconds["convert"] = time.perf_counter() - loaded
+        error = None
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    seconds["total"] = time.perf_counter() - start
+    return ConversionResult(str(path), output, seconds, error)
+
+
+def walk_notebooks(paths, exclude=GENERATED_SUFFIXES):
+    r"""Iterate the notebook files, with their path relative to the
+    directory they were found in (their name for the files given).
+
+    Usage:
+
+        >>> ("samples/hello-world.ipynb", "hello-world.ipynb") in walk_notebooks(["samples"])
+        True
+    """
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for notebook_file in sorted(path.rglob("*.ipynb")):
+                if not notebook_file.name.endswith(exclude):
+                    yield str(notebook_file), str(notebook_file.relative_to(path))
+        else:
+            yield str(path), path.name
+
+
+def iter_notebooks(paths, exclude=GENERATED_SUFFIXES):
+    r"""Iterate the notebook files, looking for .ipynb files in directories.
+
+    Args:
+        paths (list): notebook files or directories (searched recursively).
+        exclude (tuple): the suffixes of the names of the notebooks skipped
+            in the directories (defaults to the generated notebooks, see
+            `GENERATED_SUFFIXES`); the files given are never skipped.
+
+    Usage:
+
+        >>> "samples/hello-world.ipynb" in iter_notebooks(["samples"])
+        True
+        >>> list(iter_notebooks(["samples/a-cleared.ipynb"]))
+        ['samples/a-cleared.ipynb']
+    """
+    for path, _ in walk_notebooks(paths, exclude):
+        yield path
+
+
+def run_many(function, items, workers=None, chunksize=None):
+    r"""Apply function to every item in a pool of processes, in order.
+
+    Args:
+        function (callable): a module-level (picklable) function.
+        items (list): the arguments of the calls.
+        workers (int): the number of processes (defaults to the number of
+            CPUs); with workers=1 everything runs in the current process.
+        chunksize (int): the number of items sent to a process at once
+            (defaults to a few chunks per process).
+
+    Returns:
+        list: the results of the calls.
+    """
+    items = list(items)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        return list(map(function, items))
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(function, items, chunksize=chunksize))
+
+
+def convert_many(paths, target="percent", workers=None, output_dir=None, chunksize=None,
+                 metrics=False, trace_memory=False):
+    r"""Convert many notebooks in a pool of processes.
+
+    Args:
+        paths (list): notebook files or directories (searched recursively).
+        target (str): one of "percent", "starboard", "starboard-html"
+            and "ipynb-cleared".
+        workers (int): the number of processes (defaults to the number of CPUs).
+        output_dir (str): the directory of the converted files (defaults to
+            the directory of each notebook); the subdirectories of the
+            notebooks found in a directory are kept (see `output_path`).
+        chunksize (int): the number of notebooks sent to a process at once.
+        metrics (bool): instrument each conversion (see `notebook_instrument`;
+            its records in the current process are reset).
+        trace_memory (bool): with metrics, record the memory peaks too.
+
+    Returns:
+        list: a `ConversionResult` per notebook.
+
+    Raises:
+        ValueError: when two notebooks would be converted to the same file.
+
+    Usage:
+
+        >>> notebooks = ["samples/hello-world.ipynb", "samples/streams.ipynb"]
+        >>> results = convert_many(notebooks, target="percent", workers=2)
+        >>> [result.output for result in results]
+        ['samples/hello-world.py', 'samples/streams.py']
+        >>> [result.error for result in results]
+        [None, None]
+    """
+    if target not in TARGETS:
+        raise ValueError(f"unknown target {target!r} (expected one of {list(TARGETS)})")
+    tasks = [
+        (path, output_path(path, target, output_dir, relative))
+        for path, relative in walk_notebooks(paths)
+    ]
+    check_outputs(tasks)
+    if output_dir is not None:
+        for directory in {os.path.dirname(output) for _, output in tasks}:
+            os.makedirs(directory, exist_ok=True)
+    tasks = [(path, target, output, metrics, trace_memory) for path, output in tasks]
+    return run_many(_convert, tasks, workers, chunksize)
+
+
+def _count_errors(path):
+    try:
+        counts = collections.Counter(error.ename for error in toolbox.iter_errors(path))
+    except Exception as exception:
+        return path, collections.Counter(), f"{type(exception).__name__}: {exception}"
+    return path, counts, None
+
+
+def count_errors(paths, workers=None, chunksize=None):
+    r"""Count the exceptions raised in many notebooks, per exception type,
+    in a pool of processes.
+
+    Args:
+        paths (list): notebook files or directories (searched recursively).
+        workers (int): the number of processes (defaults to the number of CPUs).
+        chunksize (int): the number of notebooks sent to a process at once.
+
+    Returns:
+        tuple: the number of error outputs per exception name
+            (collections.Counter) and the (path, error) pairs of the
+            notebooks that could not be read.
+
+    Usage:
+
+        >>> counts, failures = count_errors(["samples/errors.ipynb", "samples/hello-world.ipynb"])
+        >>> sorted(counts.items()), failures
+        ([('TypeError', 1), ('Warning', 1)], [])
+    """
+    counts, failures = collections.Counter(), []
+    results = run_many(_count_errors, iter_notebooks(paths), workers, chunksize)
+    for path, notebook_counts, error in results:
+        counts.update(notebook_counts)
+        if error is not None:
+            failures.append((path, error))
+    return counts, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert notebooks (files or directories) in parallel."
+    )
+    parser.add_argument("paths", nargs="+", help="notebook files or directories")
+    parser.add_argument("--target", choices=list(TARGETS), default="percent")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    parser.add_argument(
+        "--metrics", default=None,
+        help="write the stage timers and counters to this file (.json, or .prom)",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="with --metrics, record the memory peaks"
+    )
+    parser.add_argument(
+        "--count-errors", action="store_true",
+        help="count the exceptions per type instead of converting",
+    )
+    args = parser.parse_args(argv)
+
+    if args.count_errors:
+        counts, failures = count_errors(args.paths, args.workers, args.chunksize)
+        if args.json:
+            json.dump(
+                {"counts": dict(counts.most_common()), "failures": failures},
+                sys.stdout, indent=1,
+            )
+            print()
+        else:
+            for path, error in failures:
+                print(f"{path}: {error}", file=sys.stderr)
+            for ename, count in counts.most_common():
+                print(f"{count:8d} {ename}")
+        return 1 if failures else 0
+
+    start = time.perf_counter()
+    results = convert_many(
+        args.paths, args.target, args.workers, args.output_dir, args.chunksize,
+        args.metrics is not None, args.trace_memory,
+    )
+    elapsed = time.perf_counter() - start
+    failures = [result for result in results if result.error]
+    if args.metrics is not None:
+        notebook_instrument.write_report(
+            args.metrics, notebook_instrument.merge(result.metrics for result in results)
+        )
+
+    if args.json:
+        report = {
+            "target": args.target,
+            "seconds": elapsed,
+            "results": [result._asdict() for result in results],
+        }
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        for result in failures:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+        print(
+            f"{len(results) - len(failures)}/{len(results)} notebooks converted "
+            f"to {args.target} in {elapsed:.2f}s"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+import notebook_v0 as toolbox
+import notebook_batch
+
+
+class ConvertMany(unittest.TestCase):
+    def test_targets(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            for target in notebook_batch.TARGETS:
+                results = notebook_batch.convert_many(
+                    ["samples"], target, workers=2, output_dir=output_dir
+                )
+                self.assertEqual(
+                    sorted(notebook_batch.iter_notebooks(["samples"])),
+                    [result.path for result in results],
+                )
+                for result in results:
+                    self.assertIsNone(result.error)
+                    self.assertTrue(os.path.exists(result.output))
+                    self.assertGreaterEqual(result.seconds["total"], 0.0)
+
+    def test_metrics(self):
+        notebooks = ["samples/hello-world.ipynb", "samples/streams.ipynb"]
+        with tempfile.TemporaryDirectory() as output_dir:
+            results = notebook_batch.convert_many(
+                notebooks, "percent", workers=2, output_dir=output_dir, metrics=True
+            )
+        for result in results:
+            self.assertEqual(1, result.metrics["stages"]["to_percent"]["calls"])
+            self.assertEqual(os.path.getsize(result.path), result.metrics["counters"]["bytes"])
+        self.assertIsNone(notebook_batch.convert_many(notebooks[:1], output_dir=None)[0].metrics)
+
+    def test_percent_output(self):
+        ipynb = toolbox.load_ipynb("samples/hello-world.ipynb")
+        expected = {
+            "percent": toolbox.to_percent(ipynb),
+            "starboard": toolbox.to_starboard(ipynb),
+            "starboard-html": toolbox.to_starboard(ipynb, html=True),
+        }
+        for target, text in expected.items():
+            with tempfile.TemporaryDirectory() as output_dir:
+                (result,) = notebook_batch.convert_many(
+                    ["samples/hello-world.ipynb"], target, output_dir=output_dir
+                )
+                with open(result.output, encoding="utf-8") as file:
+                    self.assertEqual(text + "\n", file.read())
+
+    def test_cleared_output(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            (result,) = notebook_batch.convert_many(
+                ["samples/streams.ipynb"], "ipynb-cleared", output_dir=output_dir
+            )
+            cleared = toolbox.load_ipynb(result.output)
+        ipynb = toolbox.clear_outputs(toolbox.load_ipynb("samples/streams.ipynb"))
+        self.assertEqual(ipynb, cleared)
+
+    def test_run_twice(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open("samples/streams.ipynb", "rb") as file:
+                data = file.read()
+            with open(os.path.join(directory, "streams.ipynb"), "wb") as file:
+                file.write(data)
+            for _ in range(2):
+                results = notebook_batch.convert_many([directory], "ipynb-cleared", workers=1)
+                self.assertEqual([os.path.join(directory, "streams-cleared.ipynb")],
+                                 [result.output for result in results])
+            self.assertEqual(["streams-cleared.ipynb", "streams.ipynb"], sorted(os.listdir(directory)))
+            self.assertEqual(2, len(list(notebook_batch.iter_notebooks([directory], exclude=()))))
+
+    def test_same_names(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root, output_dir = os.path.join(directory, "t"), os.path.join(directory, "out")
+            for name in ["a", "b"]:
+                os.makedirs(os.path.join(root, name))
+                with open(os.path.join(root, name, "nb.ipynb"), "w", encoding="utf-8") as file:
+                    file.write(f'{{"cells": [], "metadata": {{"name": "{name}"}}, '
+                               '"nbformat": 4, "nbformat_minor": 5}')
+            results = notebook_batch.convert_many(
+                [root], "ipynb-cleared", workers=1, output_dir=output_dir
+            )
+            self.assertEqual(
+                [os.path.join(output_dir, "a", "nb-cleared.ipynb"),
+                 os.path.join(output_dir, "b", "nb-cleared.ipynb")],
+                [result.output for result in results],
+            )
+            self.assertEqual(
+                ["a", "b"],
+                [toolbox.load_ipynb(result.output)["metadata"]["name"] for result in results],
+            )
+            with self.assertRaises(ValueError):
+                notebook_batch.convert_many(
+                    [os.path.join(root, "a", "nb.ipynb"), os.path.join(root, "b", "nb.ipynb")],
+                    output_dir=output_dir,
+                )
+
+    def test_errors(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            broken = os.path.join(output_dir, "broken.ipynb")
+            with open(broken, "w", encoding="utf-8") as file:
+                file.write("{")
+            results = notebook_batch.convert_many(
+                [broken, "samples/minimal.ipynb"], workers=2, output_dir=output_dir
+            )
+        self.assertTrue(results[0].error.startswith("JSONDecodeError"))
+        self.assertIsNone(results[1].error)
+
+    def test_count_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            broken = os.path.join(directory, "broken.ipynb")
+            with open(broken, "w", encoding="utf-8") as file:
+                file.write("{")
+            counts, failures = notebook_batch.count_errors(
+                ["samples", broken, "samples/errors.ipynb"], workers=2
+            )
+        self.assertEqual({"TypeError": 2, "Warning": 2}, dict(counts))
+        self.assertEqual([broken], [path for path, _ in failures])
+
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            notebook_batch.convert_many(["samples"], "pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
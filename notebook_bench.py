@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+benchmarks of the notebook toolbox on synthetic notebooks
+
+Usage (command line):
+
+    python notebook_bench.py --cells 10000 --image-bytes 100000 --output bench.json
+    python notebook_bench.py --image-bytes 100000 --backend json orjson --only load_ipynb save_ipynb
+    python notebook_bench.py --load-many 200 --cells 100 --latency 0.02 --concurrency 32
+
+The report (JSON) gives, for each benchmark, the best time, the throughput
+(cells/s and MB/s of .ipynb file) and the peak memory allocated (tracemalloc);
+with several JSON backends, one report is made for each of them.
+"""
+
+# Python Standard Library
+import argparse
+import asyncio
+import base64
+import collections
+import copy
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+# Local Libraries
+import notebook_async
+import notebook_json
+import notebook_pipeline
+import notebook_v0 as toolbox
+import notebook_v1
+import notebook_v2
+
+
+def make_png(width, height, rng):
+    r"""Return a (random, grayscale) PNG image of the given size (bytes)."""
+
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    rows = b"".join(
+        b"\0" + bytes(rng.getrandbits(8) for _ in range(width)) for _ in range(height)
+    )
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_notebook(cells=100, source_lines=10, line_length=40, outputs=1,
+                  image_bytes=0, seed=0):
+    r"""Build a synthetic notebook (dict).
+
+    One cell out of three is a markdown cell; each code cell has `outputs`
+    stream outputs, plus one PNG image output of about `image_bytes` bytes
+    when image_bytes is not zero.
+
+    Usage:
+
+        >>> ipynb = make_notebook(cells=6, source_lines=2, image_bytes=1000)
+        >>> toolbox.get_format_version(ipynb)
+        '4.5'
+        >>> [cell['cell_type'] for cell in ipynb['cells']]
+        ['markdown', 'code', 'code', 'markdown', 'code', 'code']
+        >>> len(toolbox.get_images(ipynb))
+        4
+    """
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz    "
+
+    def line():
+        return "".join(rng.choice(alphabet) for _ in range(line_length))
+
+    side = max(1, int(image_bytes ** 0.5))
+    png = base64.b64encode(make_png(side, side, rng)).decode("ascii") if image_bytes else None
+
+    ipynb_cells = []
+    for index in range(cells):
+        source = [line() + "\n" for _ in range(source_lines - 1)] + [line()]
+        cell = {"id": f"{index:08x}", "metadata": {}, "source": source}
+        if index % 3 == 0:
+            cell["cell_type"] = "markdown"
+        else:
+            cell["cell_type"] = "code"
+            cell["execution_count"] = index
+            cell["outputs"] = [
+                {
+                    "name": "stdout" if number % 2 == 0 else "stderr",
+                    "output_type": "stream",
+                    "text": [line() + "\n"],
+                }
+                for number in range(outputs)
+            ]
+            if png is not None:
+                cell["outputs"].append({
+                    "data": {"image/png": png, "text/plain": ["<Figure>"]},
+                    "metadata": {},
+                    "output_type": "display_data",
+                })
+        ipynb_cells.append(cell)
+    return {"cells": ipynb_cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+
+
+def write_notebook(ipynb, filename):
+    r"""Write a notebook the way Jupyter does (indented JSON)."""
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(ipynb, file, indent=1, sort_keys=True, ensure_ascii=False)
+        file.write("\n")
+
+
+# Each benchmark is a function setup(filename, ipynb, workdir) returning the
+# function to time; setup is called again before every repetition.
+BENCHMARKS = {
+    "load_ipynb": lambda filename, ipynb, workdir: (
+        lambda: toolbox.load_ipynb(filename)
+    ),
+    "save_ipynb": lambda filename, ipynb, workdir: (
+        lambda: toolbox.save_ipynb(ipynb, os.path.join(workdir, "saved.ipynb"))
+    ),
+    "save_ipynb(pretty)": lambda filename, ipynb, workdir: (
+        lambda: toolbox.save_ipynb(
+            ipynb, os.path.join(workdir, "saved.ipynb"), mode="nbformat-pretty"
+        )
+    ),
+    "to_percent": lambda filename, ipynb, workdir: (
+        lambda: toolbox.to_percent(ipynb)
+    ),
+    "to_starboard": lambda filename, ipynb, workdir: (
+        lambda: toolbox.to_starboard(ipynb)
+    ),
+    "clear_outputs": lambda filename, ipynb, workdir: (
+        lambda copied=copy.deepcopy(ipynb): toolbox.clear_outputs(copied)
+    ),
+    "get_stream": lambda filename, ipynb, workdir: (
+        lambda: toolbox.get_stream(ipynb, stdout=True, stderr=True)
+    ),
+    "iter_stream(file)": lambda filename, ipynb, workdir: (
+        lambda: collections.deque(toolbox.iter_stream(filename, True, True), maxlen=0)
+    ),
+    "NotebookLoader.load": lambda filename, ipynb, workdir: (
+        notebook_v2.NotebookLoader(filename).load
+    ),
+    "Serializer.serialize": lambda filename, ipynb, workdir: (
+        notebook_v1.Serializer(notebook_v1.Notebook(ipynb)).serialize
+    ),
+    "file copy": lambda filename, ipynb, workdir: (
+        lambda: shutil.copyfile(filename, os.path.join(workdir, "copy.ipynb"))
+    ),
+    "Serializer.to_file(lazy edit)": lambda filename, ipynb, workdir: (
+        lambda: _lazy_edit(filename, os.path.join(workdir, "edited.ipynb"))
+    ),
+    "Outliner.outline": lambda filename, ipynb, workdir: (
+        notebook_v1.Outliner(notebook_v1.Notebook(ipynb)).outline
+    ),
+    "Outliner.outline(edited)": lambda filename, ipynb, workdir: (
+        _edited_outliner(ipynb).outline
+    ),
+    "PyPercentSerializer.to_file": lambda filename, ipynb, workdir: (
+        lambda: notebook_v1.PyPercentSerializer(notebook_v1.Notebook(ipynb)).to_file(
+            os.path.join(workdir, "percent.py")
+        )
+    ),
+    "transforms (chained)": lambda filename, ipynb, workdir: (
+        lambda: notebook_v1.PyPercentSerializer(
+            notebook_v2.MarkdownLesser(
+                notebook_v2.NotebookLoader(filename).load()
+            ).remove_markdown_cells()
+        ).to_py_percent()
+    ),
+    "transforms (Pipeline)": lambda filename, ipynb, workdir: (
+        lambda: _to_devnull(
+            notebook_pipeline.Pipeline(filename).remove_markdown_cells().clear_outputs().to_percent
+        )
+    ),
+    "PyPercentLoader.load": lambda filename, ipynb, workdir: (
+        _percent_loader(ipynb, workdir).load
+    ),
+    "py-percent round-trip": lambda filename, ipynb, workdir: (
+        lambda: notebook_v1.PyPercentSerializer(
+            _percent_loader(ipynb, workdir).load()
+        ).to_py_percent()
+    ),
+}
+
+
+_EDITS = itertools.count()
+
+
+def _edited_outliner(ipynb):
+    # Outline en cache, puis une cellule modifiée (comme dans un éditeur)
+    nb = notebook_v1.Notebook(ipynb)
+    outliner = notebook_v1.Outliner(nb)
+    outliner.outline()
+    nb.cells[len(nb.cells) // 2].source = [f"# edited {next(_EDITS)}\n"]
+    return outliner
+
+
+def _lazy_edit(filename, output):
+    # Une cellule modifiée, les sorties recopiées du fichier sans décodage
+    nb = notebook_v1.Notebook.from_file(filename, lazy=True)
+    nb.cells[0].source = ["# edited\n"]
+    notebook_v1.Serializer(nb).to_file(output, mode="nbformat-pretty")
+
+
+def _to_devnull(write):
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        write(out)
+
+
+def _percent_loader(ipynb, workdir):
+    percent = os.path.join(workdir, "percent.py")
+    notebook_v1.PyPercentSerializer(notebook_v1.Notebook(ipynb)).to_file(percent)
+    return notebook_v2.PyPercentLoader(percent)
+
+
+def measure(setup, repeat=3):
+    r"""Time the function returned by setup() (best of repeat runs), then
+    measure its peak memory allocation in a last run.
+
+    Returns:
+        dict: the "seconds" and "peak_bytes" of the function.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        function = setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    function = setup()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(cells=100, source_lines=10, outputs=1, image_bytes=0, repeat=3, only=None,
+        backend=None):
+    r"""Run the benchmarks on a synthetic notebook.
+
+    The JSON backend (see `notebook_json`) is selected during the run only;
+    by default, the fastest installed one is used.
+
+    Returns:
+        dict: the report (JSON-serializable).
+
+    Usage:
+
+        >>> report = run(cells=30, repeat=1, only=["to_percent"])
+        >>> sorted(report["results"]["to_percent"])
+        ['cells_per_s', 'mb_per_s', 'peak_bytes', 'seconds']
+        >>> run(cells=3, repeat=1, only=["load_ipynb"], backend="json")["json_backend"]
+        'json'
+    """
+    previous = notebook_json.get_backend()
+    notebook_json.set_backend(backend)
+    try:
+        return _run(cells, source_lines, outputs, image_bytes, repeat, only)
+    finally:
+        notebook_json.set_backend(previous)
+
+
+def _run(cells, source_lines, outputs, image_bytes, repeat, only):
+    names = list(BENCHMARKS) if only is None else list(only)
+    ipynb = make_notebook(cells, source_lines, outputs=outputs, image_bytes=image_bytes)
+    with tempfile.TemporaryDirectory() as workdir:
+        filename = os.path.join(workdir, "bench.ipynb")
+        write_notebook(ipynb, filename)
+        file_bytes = os.path.getsize(filename)
+        ipynb = toolbox.load_ipynb(filename)
+        results = {}
+        for name in names:
+            setup = BENCHMARKS[name]
+            result = measure(lambda: setup(filename, ipynb, workdir), repeat)
+            seconds = max(result["seconds"], 1e-9)
+            result["cells_per_s"] = cells / seconds
+            result["mb_per_s"] = file_bytes / seconds / 1e6
+            results[name] = result
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "json_backend": notebook_json.get_backend(),
+        "parameters": {
+            "cells": cells,
+            "source_lines": source_lines,
+            "outputs": outputs,
+            "image_bytes": image_bytes,
+            "repeat": repeat,
+        },
+        "file_bytes": file_bytes,
+        "results": results,
+    }
+
+
+def run_load_many(files=100, cells=100, latency=0.01, concurrency=16, repeat=3):
+    r"""Compare a loop of `NotebookLoader.load` with `notebook_async.load_many`
+    on notebook files read with a simulated latency (in seconds, per file).
+
+    Returns:
+        dict: the report (JSON-serializable).
+
+    Usage:
+
+        >>> report = run_load_many(files=4, cells=3, latency=0.001, repeat=1)
+        >>> sorted(report["results"])
+        ['NotebookLoader loop', 'load_many']
+        >>> sorted(report["results"]["load_many"])
+        ['mb_per_s', 'notebooks_per_s', 'seconds']
+    """
+
+    def slow_read(filename):
+        time.sleep(latency)  # stockage réseau simulé
+        return notebook_async.read_file(filename)
+
+    def sync_loop():
+        for path in paths:
+            time.sleep(latency)
+            notebook_v2.NotebookLoader(path).load()
+
+    async def consume():
+        async for _ in notebook_async.load_many(paths, concurrency, read=slow_read):
+            pass
+
+    ipynb = make_notebook(cells)
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for index in range(files):
+            paths.append(os.path.join(workdir, f"notebook-{index}.ipynb"))
+            write_notebook(ipynb, paths[-1])
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        results = {}
+        for name, function in [
+            ("NotebookLoader loop", sync_loop),
+            ("load_many", lambda: asyncio.run(consume())),
+        ]:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function()
+                best = min(best, time.perf_counter() - start)
+            results[name] = {
+                "seconds": best,
+                "notebooks_per_s": files / best,
+                "mb_per_s": total_bytes / best / 1e6,
+            }
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "json_backend": notebook_json.get_backend(),
+        "parameters": {
+            "files": files,
+            "cells": cells,
+            "latency": latency,
+            "concurrency": concurrency,
+            "repeat": repeat,
+        },
+        "file_bytes": total_bytes,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the notebook toolbox.")
+    parser.add_argument("--cells", type=int, default=1000)
+    parser.add_argument("--source-lines", type=int, default=10)
+    parser.add_argument("--outputs", type=int, default=1)
+    parser.add_argument("--image-bytes", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument(
+        "--backend", nargs="+", choices=notebook_json.BACKENDS,
+        help="JSON backends to compare (defaults to the fastest installed one)",
+    )
+    parser.add_argument(
+        "--load-many", type=int, metavar="FILES",
+        help="compare the sync and async loads of FILES notebooks of --cells cells",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="simulated read latency (s), with --load-many"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=notebook_async.DEFAULT_CONCURRENCY,
+        help="concurrent reads, with --load-many",
+    )
+    parser.add_argument("--output", help="JSON report file (defaults to stdout)")
+    args = parser.parse_args(argv)
+
+    if args.load_many:
+        report = run_load_many(
+            args.load_many, args.cells, args.latency, args.concurrency, args.repeat
+        )
+    else:
+        reports = [
+            run(
+                args.cells, args.source_lines, args.outputs, args.image_bytes,
+                args.repeat, args.only, backend,
+            )
+            for backend in (args.backend or [None])
+        ]
+        report = reports[0] if len(reports) == 1 else reports
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+import unittest
+
+import notebook_v0 as toolbox
+import notebook_bench
+
+
+class SyntheticNotebook(unittest.TestCase):
+    def test_make_notebook(self):
+        ipynb = notebook_bench.make_notebook(
+            cells=9, source_lines=4, outputs=3, image_bytes=400
+        )
+        cells = toolbox.get_cells(ipynb)
+        self.assertEqual(9, len(cells))
+        self.assertEqual(6, sum(cell["cell_type"] == "code" for cell in cells))
+        for cell in cells:
+            self.assertEqual(4, len(cell["source"]))
+        images = toolbox.get_images(ipynb)
+        self.assertEqual(6, len(images))
+        self.assertEqual((20, 20), images[0].shape)
+
+    def test_write_notebook(self):
+        ipynb = notebook_bench.make_notebook(cells=5)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "bench.ipynb")
+            notebook_bench.write_notebook(ipynb, filename)
+            self.assertEqual(ipynb, toolbox.load_ipynb(filename))
+
+
+class Report(unittest.TestCase):
+    def test_run(self):
+        report = notebook_bench.run(cells=12, image_bytes=100, repeat=1)
+        self.assertEqual(set(notebook_bench.BENCHMARKS), set(report["results"]))
+        for result in report["results"].values():
+            self.assertGreater(result["cells_per_s"], 0)
+            self.assertGreater(result["mb_per_s"], 0)
+            self.assertGreaterEqual(result["peak_bytes"], 0)
+        json.dumps(report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+images of notebooks moved to (and restored from) a content-addressed store
+
+Usage (command line):
+
+    python notebook_blobs.py externalize notebooks --store .blobs --workers 4
+    python notebook_blobs.py rehydrate notebooks --store .blobs
+
+Each image output (`image/png`, `image/jpeg`...) is decoded and stored once,
+under its SHA-256 digest (`<store>/ab/abcdef....png`): the same plot
+embedded in many notebooks takes the space of one file. In the notebook,
+the inline base64 data is replaced by a reference (`BLOB_REF_MIME`):
+
+    "data": {
+     "application/x-blob-ref+json": {
+      "image/png": {"sha256": "abcdef...", "size": 1234}
+     },
+     "text/plain": ["<Figure>"]
+    }
+
+which `rehydrate` replaces by the inline data again.
+"""
+
+# Python Standard Library
+import argparse
+import base64
+import collections
+import hashlib
+import json
+import os
+import sys
+import time
+
+# Local Libraries
+import notebook_batch
+import notebook_stream
+import notebook_v0 as toolbox
+
+
+BLOB_REF_MIME = "application/x-blob-ref+json"
+# The base64 encoded image types, and the extension of their blobs
+IMAGE_MIMES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+MIN_BYTES = 1024  # the smaller images stay inline (a reference is ~150 bytes)
+
+
+class BlobStore:
+    r"""A directory of files named after the SHA-256 digest of their content.
+
+    The files are written atomically: several processes may store the same
+    blob at the same time.
+
+    Args:
+        root (str): the directory of the store (created when needed).
+
+    Usage:
+
+        >>> import tempfile
+        >>> store = BlobStore(tempfile.mkdtemp())
+        >>> digest = store.put(b"not really a PNG")
+        >>> digest
+        '9d243875ccf8e0cf70d797323c36fd79dc5d0e4a369fa3d29940f598636f3fb5'
+        >>> os.path.relpath(store.path(digest), store.root) # doctest: +ELLIPSIS
+        '9d/9d243875...3fb5.png'
+        >>> store.get(digest)
+        b'not really a PNG'
+    """
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+
+    def __repr__(self):
+        return f"BlobStore({self.root!r})"
+
+    def path(self, digest, mime="image/png"):
+        r"""Return the name of the file of a blob."""
+        return os.path.join(self.root, digest[:2], digest + IMAGE_MIMES.get(mime, ""))
+
+    def put(self, data, mime="image/png"):
+        r"""Store data (bytes), unless it is already stored; return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest, mime)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with notebook_stream.atomic_open(path) as file:
+                file.write(data)
+        return digest
+
+    def get(self, digest, mime="image/png"):
+        r"""Return the content (bytes) of a blob, after checking its digest."""
+        with open(self.path(digest, mime), "rb") as file:
+            data = file.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"the blob {digest} of {self.root} is corrupted")
+        return data
+
+
+def decode_image(value):
+    r"""Decode the base64 data of an image output (bytes); value may be a
+    str, a list of str or a `notebook_stream.LazyValue` (lazy=True).
+    """
+    if isinstance(value, notebook_stream.LazyValue):
+        return value.to_bytes()
+    return base64.b64decode(''.join(value))
+
+
+def map_outputs(ipynb, function):
+    r"""Apply function to the outputs of the code cells of a notebook.
+
+    function(output) returns the new output (dict), or output itself when
+    it is unchanged; the cells changed are copied, the notebook is not
+    modified.
+
+    Returns:
+        dict: the new notebook.
+    """
+    cells = []
+    for cell in ipynb['cells']:
+        if cell['cell_type'] == 'code':
+            outputs = [function(output) for output in cell['outputs']]
+            if any(new is not old for new, old in zip(outputs, cell['outputs'])):
+                cell = dict(cell, outputs=outputs)
+        cells.append(cell)
+    return dict(ipynb, cells=cells)
+
+
+def _map_data(ipynb, function):
+    # function(data) -> data, pour les sorties qui ont des données
+    def replace(output):
+        if 'data' not in output:
+            return output
+        data = function(output['data'])
+        return output if data is output['data'] else dict(output, data=data)
+
+    return map_outputs(ipynb, replace)
+
+
+def externalize(ipynb, store, min_bytes=MIN_BYTES, counts=None):
+    r"""Move the images of a notebook to a store.
+
+    Args:
+        ipynb (dict): the notebook (it is not modified; its images may be
+            lazy, see `load_ipynb(lazy=True)`).
+        store (BlobStore): the store of the images.
+        min_bytes (int): the images smaller than this (decoded) stay inline.
+        counts (collections.Counter): if given, counts the "images" moved.
+
+    Returns:
+        dict: the notebook, with references to the stored images.
+
+    Usage:
+
+        >>> import tempfile
+        >>> store = BlobStore(tempfile.mkdtemp())
+        >>> ipynb = externalize(toolbox.load_ipynb("samples/images.ipynb"), store)
+        >>> data = ipynb['cells'][-1]['outputs'][0]['data']
+        >>> sorted(data)
+        ['application/x-blob-ref+json', 'text/plain']
+        >>> data[BLOB_REF_MIME] # doctest: +ELLIPSIS
+        {'image/png': {'sha256': 'c2b7f597...4934', 'size': 458338}}
+        >>> rehydrate(ipynb, store) == toolbox.load_ipynb("samples/images.ipynb")
+        True
+    """
+    counts = collections.Counter() if counts is None else counts
+
+    def replace(data):
+        references = {}
+        for mime in IMAGE_MIMES:
+            if mime in data:
+                blob = decode_image(data[mime])
+                if len(blob) >= min_bytes:
+                    references[mime] = {'sha256': store.put(blob, mime), 'size': len(blob)}
+        if not references:
+            return data
+        counts['images'] += len(references)
+        data = {mime: value for mime, value in data.items() if mime not in references}
+        data[BLOB_REF_MIME] = dict(data.get(BLOB_REF_MIME, {}), **references)
+        return data
+
+    return _map_data(ipynb, replace)
+
+
+def rehydrate(ipynb, store, counts=None):
+    r"""Restore the images of a notebook from a store (see `externalize`).
+
+    The images are restored as single base64 strings (the layout of the
+    notebooks written by Jupyter).
+
+    Args:
+        ipynb (dict): the notebook (it is not modified).
+        store (BlobStore): the store of the images.
+        counts (collections.Counter): if given, counts the "images" restored.
+
+    Returns:
+        dict: the notebook, with inline images.
+    """
+    counts = collections.Counter() if counts is None else counts
+
+    def restore(data):
+        references = data.get(BLOB_REF_MIME)
+        if references is None:
+            return data
+        if isinstance(references, notebook_stream.LazyValue):
+            references = references.load()
+        data = {mime: value for mime, value in data.items() if mime != BLOB_REF_MIME}
+        for mime, reference in references.items():
+            blob = store.get(reference['sha256'], mime)
+            data[mime] = base64.b64encode(blob).decode('ascii')
+        counts['images'] += len(references)
+        return data
+
+    return _map_data(ipynb, restore)
+
+
+BlobResult = collections.namedtuple(
+    "BlobResult", ["path", "images", "bytes_before", "bytes_after", "seconds", "error"]
+)
+BlobResult.__doc__ = r"""The outcome of the externalization (or rehydration)
+of a notebook file.
+
+    Attributes:
+        path (str): the notebook file.
+        images (int): the number of images moved to (or restored from) the
+            store; the file is only rewritten when it is not 0.
+        bytes_before (int): the size of the file before.
+        bytes_after (int): the size of the file after.
+        seconds (float): the time spent.
+        error (str): the error which stopped the processing (None on success).
+"""
+
+
+def _process_file(task):
+    action, path, root, min_bytes, mode = task
+    start = time.perf_counter()
+    bytes_before = bytes_after = None
+    counts = collections.Counter()
+    try:
+        bytes_before = bytes_after = os.path.getsize(path)
+        # Les images sont laissées dans le fichier (mmap) jusqu'à leur décodage
+        ipynb = toolbox.load_ipynb(path, lazy=True)
+        store = BlobStore(root)
+        if action == "externalize":
+            ipynb = externalize(ipynb, store, min_bytes, counts)
+        else:
+            ipynb = rehydrate(ipynb, store, counts)
+        if counts['images']:
+            toolbox.save_ipynb(ipynb, path, mode)
+            bytes_after = os.path.getsize(path)
+        error = None
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    return BlobResult(
+        path, counts['images'], bytes_before, bytes_after,
+        time.perf_counter() - start, error,
+    )
+
+
+def externalize_many(paths, store, workers=None, min_bytes=MIN_BYTES,
+                     mode="nbformat-pretty", chunksize=None):
+    r"""Move the images of many notebooks (rewritten in place) to a store,
+    in a pool of processes.
+
+    Args:
+        paths (list): notebook files or directories (searched recursively).
+        store (str): the directory of the store.
+        workers (int): the number of processes (defaults to the number of CPUs).
+        min_bytes (int): the images smaller than this stay inline.
+        mode (str): the `notebook_json` mode of the rewritten notebooks.
+        chunksize (int): the number of notebooks sent to a process at once.
+
+    Returns:
+        list: a `BlobResult` per notebook.
+
+    Usage:
+
+        >>> import shutil, tempfile
+        >>> directory = tempfile.mkdtemp()
+        >>> for name in ["a.ipynb", "b.ipynb"]:
+        ...     _ = shutil.copy("samples/images.ipynb", os.path.join(directory, name))
+        >>> store = os.path.join(directory, ".blobs")
+        >>> results = externalize_many([directory], store, workers=2)
+        >>> [(os.path.basename(result.path), result.images) for result in results]
+        [('a.ipynb', 1), ('b.ipynb', 1)]
+        >>> results[0].bytes_after < 10000 < results[0].bytes_before
+        True
+        >>> len(os.listdir(store))
+        1
+        >>> [result.images for result in rehydrate_many([directory], store)]
+        [1, 1]
+        >>> with open(os.path.join(directory, "a.ipynb"), "rb") as file:
+        ...     with open("samples/images.ipynb", "rb") as original:
+        ...         file.read() == original.read()
+        True
+        >>> shutil.rmtree(directory)
+    """
+    tasks = [
+        ("externalize", path, os.fspath(store), min_bytes, mode)
+        for path in notebook_batch.iter_notebooks(paths)
+    ]
+    return notebook_batch.run_many(_process_file, tasks, workers, chunksize)
+
+
+def rehydrate_many(paths, store, workers=None, mode="nbformat-pretty", chunksize=None):
+    r"""Restore the images of many notebooks (rewritten in place) from a
+    store, in a pool of processes (see `externalize_many`).
+
+    Returns:
+        list: a `BlobResult` per notebook.
+    """
+    tasks = [
+        ("rehydrate", path, os.fspath(store), None, mode)
+        for path in notebook_batch.iter_notebooks(paths)
+    ]
+    return notebook_batch.run_many(_process_file, tasks, workers, chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move the images of notebooks to a content-addressed store, "
+        "or restore them."
+    )
+    parser.add_argument("action", choices=["externalize", "rehydrate"])
+    parser.add_argument("paths", nargs="+", help="notebook files or directories")
+    parser.add_argument("--store", required=True, help="the directory of the images")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--min-bytes", type=int, default=MIN_BYTES)
+    parser.add_argument(
+        "--mode", choices=["nbformat-pretty", "compact"], default="nbformat-pretty"
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.action == "externalize":
+        results = externalize_many(
+            args.paths, args.store, args.workers, args.min_bytes, args.mode, args.chunksize
+        )
+    else:
+        results = rehydrate_many(
+            args.paths, args.store, args.workers, args.mode, args.chunksize
+        )
+    elapsed = time.perf_counter() - start
+    failures = [result for result in results if result.error]
+
+    if args.json:
+        report = {
+            "action": args.action,
+            "seconds": elapsed,
+            "results": [result._asdict() for result in results],
+        }
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        for result in failures:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+        done = [result for result in results if not result.error]
+        before = sum(result.bytes_before for result in done)
+        after = sum(result.bytes_after for result in done)
+        print(
+            f"{args.action}: {sum(result.images for result in done)} images in "
+            f"{len(done)}/{len(results)} notebooks, {before} -> {after} bytes "
+            f"in {elapsed:.2f}s"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
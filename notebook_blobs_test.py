@@ -0,0 +1,103 @@
+import collections
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+import notebook_v0 as toolbox
+import notebook_blobs
+import notebook_stream
+
+
+class Externalize(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = notebook_blobs.BlobStore(os.path.join(self.directory, "store"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for filename in ["samples/images.ipynb", "samples/hello-world.ipynb"]:
+            ipynb = toolbox.load_ipynb(filename)
+            original = copy.deepcopy(ipynb)
+            externalized = notebook_blobs.externalize(ipynb, self.store)
+            self.assertEqual(original, ipynb)
+            self.assertEqual(original, notebook_blobs.rehydrate(externalized, self.store))
+
+    def test_lazy(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb", lazy=True)
+        self.assertIsInstance(
+            ipynb["cells"][-1]["outputs"][0]["data"]["image/png"], notebook_stream.OutputBlob
+        )
+        externalized = notebook_blobs.externalize(ipynb, self.store)
+        self.assertEqual(
+            notebook_blobs.externalize(toolbox.load_ipynb("samples/images.ipynb"), self.store),
+            externalized,
+        )
+
+    def test_deduplication(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb")
+        ipynb["cells"].append(copy.deepcopy(ipynb["cells"][-1]))
+        counts = collections.Counter()
+        notebook_blobs.externalize(ipynb, self.store, counts=counts)
+        self.assertEqual(2, counts["images"])
+        (prefix,) = os.listdir(self.store.root)
+        self.assertEqual(1, len(os.listdir(os.path.join(self.store.root, prefix))))
+
+    def test_min_bytes(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb")
+        self.assertEqual(
+            ipynb, notebook_blobs.externalize(ipynb, self.store, min_bytes=10 ** 7)
+        )
+        self.assertFalse(os.path.exists(self.store.root))
+
+    def test_corrupted_blob(self):
+        digest = self.store.put(b"image")
+        with open(self.store.path(digest), "wb") as file:
+            file.write(b"other image")
+        with self.assertRaises(ValueError):
+            self.store.get(digest)
+
+
+class ExternalizeMany(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = os.path.join(self.directory, ".blobs")
+        for name in ["a.ipynb", "b.ipynb", "c.ipynb"]:
+            shutil.copy("samples/images.ipynb", os.path.join(self.directory, name))
+        shutil.copy("samples/hello-world.ipynb", self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        results = notebook_blobs.externalize_many([self.directory], self.store, workers=2)
+        self.assertEqual([1, 1, 1, 0], [result.images for result in results])
+        self.assertEqual([None] * 4, [result.error for result in results])
+        for result in results[:3]:
+            self.assertLess(result.bytes_after, result.bytes_before // 10)
+        results = notebook_blobs.rehydrate_many([self.directory], self.store, workers=2)
+        self.assertEqual([1, 1, 1, 0], [result.images for result in results])
+        for name in ["a.ipynb", "hello-world.ipynb"]:
+            with open(os.path.join(self.directory, name), "rb") as file:
+                with open(os.path.join("samples", name.replace("a.", "images.")), "rb") as original:
+                    self.assertEqual(original.read(), file.read())
+
+    def test_missing_blob(self):
+        notebook_blobs.externalize_many([self.directory], self.store, workers=1)
+        shutil.rmtree(self.store)
+        results = notebook_blobs.rehydrate_many([self.directory], self.store, workers=1)
+        self.assertTrue(results[0].error.startswith("FileNotFoundError"))
+        self.assertEqual(results[0].bytes_before, results[0].bytes_after)
+
+    def test_main(self):
+        self.assertEqual(
+            0, notebook_blobs.main(["externalize", self.directory, "--store", self.store])
+        )
+        self.assertEqual(1, len(os.listdir(self.store)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+a content-addressed, on-disk cache for the notebook conversions
+
+The cached results are keyed by a hash of the .ipynb bytes, the name of the
+converter and its version: an unchanged notebook is never parsed again.
+"""
+
+# Python Standard Library
+import hashlib
+import os
+import pickle
+import tempfile
+
+# Local Libraries
+import notebook_json
+import notebook_v0 as toolbox
+from notebook_v1 import Outliner, PyPercentSerializer
+from notebook_v2 import NotebookLoader
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# À incrémenter quand le résultat d'un convertisseur change
+CONVERTER_VERSIONS = {
+    "NotebookLoader.load": "2",
+    "PyPercentSerializer.to_py_percent": "1",
+    "to_starboard": "1",
+    "to_starboard(html)": "1",
+    "Outliner.outline": "1",
+}
+
+
+class ConversionCache:
+    r"""A size-bounded cache of conversion results, stored in a directory.
+
+    The entries are pickled in files named after their key; they are written
+    atomically (temporary file + rename), so several processes can share the
+    same cache. When the cache grows beyond max_bytes, the least recently
+    used entries are removed.
+
+    Args:
+        directory (str): the directory of the cache (created if needed).
+        max_bytes (int): the maximum size of the cache, in bytes.
+
+    Attributes:
+        hits (int): the number of results found in the cache.
+        misses (int): the number of results computed.
+
+    Usage:
+
+        >>> import tempfile
+        >>> cache = ConversionCache(tempfile.mkdtemp())
+        >>> print(cache.outline("samples/hello-world.ipynb")) # doctest: +NORMALIZE_WHITESPACE
+        Jupyter Notebook v4.5
+        └─▶ Markdown cell #a9541506
+            ┌ Hello world!
+            | ============
+            └ Print `Hello world!`:
+        └─▶ Code cell #b777420a (1)
+            | print("Hello world!")
+        └─▶ Markdown cell #a23ab5ac
+            | Goodbye! 👋
+        >>> nb = cache.load("samples/hello-world.ipynb")
+        >>> nb = cache.load("samples/hello-world.ipynb")
+        >>> [cell.id for cell in nb]
+        ['a9541506', 'b777420a', 'a23ab5ac']
+        >>> cache.hits, cache.misses
+        (1, 2)
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # taille estimée, calculée au premier ajout
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(data, converter, version=None):
+        r"""Return the key (str) of the conversion of data (bytes)."""
+        if version is None:
+            version = CONVERTER_VERSIONS[converter]
+        digest = hashlib.sha256()
+        digest.update(f"{converter}\0{version}\0".encode("utf-8"))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def get(self, key):
+        r"""Return the (found, value) pair stored under key."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return False, None
+        except Exception:
+            # Entrée illisible (tronquée, ancienne version...) : on l'ignore
+            return False, None
+        try:
+            os.utime(path)  # LRU: the modification time is the last access
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key, value):
+        r"""Store value under key, then evict the old entries if needed."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temporary)
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith(".pickle"):
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:  # removed by another process
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        r"""Return the total size of the entries, in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return sum(1 for _ in self._entries())
+
+    def evict(self, max_bytes=None):
+        r"""Remove the least recently used entries, until the cache is
+        smaller than max_bytes (defaults to 90% of the cache maximum size).
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes * 9 // 10
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        r"""Remove all the entries."""
+        self.evict(max_bytes=0)
+
+    def stats(self):
+        r"""Return the hit and miss counters and the size of the cache."""
+        entries = list(self._entries())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def cached(self, data, converter, compute, version=None):
+        r"""Return the result of compute() for the input data (bytes),
+        from the cache when the same conversion has already been done.
+        """
+        key = self.key(data, converter, version)
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def _cached_file(self, filename, converter, convert):
+        # Le notebook est décodé depuis les octets hachés : le fichier n'est
+        # lu qu'une fois, et le résultat correspond toujours à sa clé
+        with open(filename, "rb") as file:
+            data = file.read()
+        return self.cached(data, converter, lambda: convert(notebook_json.loads(data)))
+
+    def load(self, filename):
+        r"""Cached version of `NotebookLoader(filename).load()`."""
+        return self._cached_file(filename, "NotebookLoader.load", NotebookLoader.from_ipynb)
+
+    def to_py_percent(self, filename):
+        r"""Cached version of `PyPercentSerializer(notebook).to_py_percent()`."""
+        return self._cached_file(
+            filename,
+            "PyPercentSerializer.to_py_percent",
+            lambda ipynb: PyPercentSerializer(NotebookLoader.from_ipynb(ipynb)).to_py_percent(),
+        )
+
+    def to_starboard(self, filename, html=False):
+        r"""Cached version of `to_starboard(load_ipynb(filename), html)`."""
+        return self._cached_file(
+            filename,
+            "to_starboard(html)" if html else "to_starboard",
+            lambda ipynb: toolbox.to_starboard(ipynb, html),
+        )
+
+    def outline(self, filename):
+        r"""Cached version of `Outliner(notebook).outline()`."""
+        return self._cached_file(
+            filename,
+            "Outliner.outline",
+            lambda ipynb: Outliner(NotebookLoader.from_ipynb(ipynb)).outline(),
+        )
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import notebook_instrument
+import notebook_v0 as toolbox
+from notebook_cache import ConversionCache
+from notebook_v1 import Outliner, PyPercentSerializer
+from notebook_v2 import NotebookLoader
+
+
+class Cache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_converters(self):
+        cache = ConversionCache(self.directory)
+        for _ in range(2):
+            for filename in ("samples/hello-world.ipynb", "samples/errors.ipynb"):
+                nb = NotebookLoader(filename).load()
+                self.assertEqual(
+                    PyPercentSerializer(nb).to_py_percent(), cache.to_py_percent(filename)
+                )
+                self.assertEqual(Outliner(nb).outline(), cache.outline(filename))
+                ipynb = toolbox.load_ipynb(filename)
+                self.assertEqual(toolbox.to_starboard(ipynb), cache.to_starboard(filename))
+                self.assertEqual(
+                    toolbox.to_starboard(ipynb, html=True),
+                    cache.to_starboard(filename, html=True),
+                )
+        self.assertEqual(8, cache.misses)
+        self.assertEqual(8, cache.hits)
+        self.assertEqual(8, cache.stats()["entries"])
+
+    def test_notebook_loader(self):
+        cache = ConversionCache(self.directory)
+        for _ in range(2):
+            nb = NotebookLoader("samples/hello-world.ipynb", cache=cache).load()
+            self.assertEqual(["a9541506", "b777420a", "a23ab5ac"], [cell.id for cell in nb])
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_single_read(self):
+        # Le notebook est décodé depuis les octets hachés, sans relire le fichier
+        cache = ConversionCache(self.directory)
+        with notebook_instrument.recording():
+            for convert in (cache.load, cache.outline, cache.to_py_percent, cache.to_starboard):
+                convert("samples/hello-world.ipynb")
+        self.assertEqual(4, cache.misses)
+        self.assertNotIn("load_ipynb", notebook_instrument.report()["stages"])
+        self.assertIn("NotebookLoader.from_ipynb", notebook_instrument.report()["stages"])
+
+    def test_content_addressed(self):
+        cache = ConversionCache(self.directory)
+        copy = os.path.join(self.directory, "copy.ipynb")
+        shutil.copy("samples/hello-world.ipynb", copy)
+        cache.outline("samples/hello-world.ipynb")
+        cache.outline(copy)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        with open(copy, "a", encoding="utf-8") as file:
+            file.write("\n")
+        cache.outline(copy)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_version(self):
+        cache = ConversionCache(self.directory)
+        calls = []
+        compute = lambda: calls.append(1) or "result"
+        self.assertEqual("result", cache.cached(b"data", "test", compute, version="1"))
+        self.assertEqual("result", cache.cached(b"data", "test", compute, version="1"))
+        self.assertEqual("result", cache.cached(b"data", "test", compute, version="2"))
+        self.assertEqual(2, len(calls))
+
+    def test_eviction(self):
+        cache = ConversionCache(self.directory, max_bytes=3000)
+        keys = []
+        for index in range(10):
+            key = cache.key(str(index).encode(), "test", "1")
+            cache.put(key, b"x" * 1000)
+            keys.append(key)
+            os.utime(cache._path(key), (index, index))
+        self.assertLessEqual(cache.size(), 3000)
+        self.assertTrue(cache.get(keys[-1])[0])
+        self.assertFalse(cache.get(keys[0])[0])
+
+    def test_atomic_writes(self):
+        cache = ConversionCache(self.directory)
+        key = cache.key(b"data", "test", "1")
+        cache.put(key, "value")
+        leftovers = [
+            filename
+            for _, _, filenames in os.walk(self.directory)
+            for filename in filenames
+            if not filename.endswith(".pickle")
+        ]
+        self.assertEqual([], leftovers)
+        # une entrée corrompue est recalculée
+        with open(cache._path(key), "wb") as file:
+            file.write(b"garbage")
+        self.assertEqual((False, None), cache.get(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
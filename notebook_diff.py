@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+cell-level differences between two versions of a notebook
+
+Usage (command line):
+
+    python notebook_diff.py old.ipynb new.ipynb
+
+The cells are matched by id, then by content (cell type and source) when
+their ids are missing or changed; the remaining cells are paired by
+position between the matched ones. The matching runs in O(n log n).
+"""
+
+# Python Standard Library
+import argparse
+import bisect
+import collections
+import difflib
+import sys
+
+# Local Libraries
+import notebook_v0 as toolbox
+
+
+NO_ID = 'no documented id'
+_CELL_TYPES = {'CodeCell': 'code', 'MarkdownCell': 'markdown', 'RawCell': 'raw'}
+
+CellChange = collections.namedtuple("CellChange", ["old_index", "new_index", "cell_id"])
+NotebookDiff = collections.namedtuple(
+    "NotebookDiff", ["added", "removed", "moved", "modified", "outputs", "unchanged"]
+)
+NotebookDiff.__doc__ = r"""The differences between two notebooks.
+
+Attributes:
+    added (list): the `CellChange`s of the new cells (old_index is None).
+    removed (list): the `CellChange`s of the removed cells (new_index is None).
+    moved (list): the `CellChange`s of the cells moved relative to the others.
+    modified (list): the `CellChange`s of the cells whose type or source changed.
+    outputs (list): the `CellChange`s of the code cells whose outputs changed.
+    unchanged (int): the number of cells neither moved nor changed.
+"""
+
+_Cell = collections.namedtuple("_Cell", ["id", "cell_type", "source", "outputs"])
+
+
+def _text(source):
+    return source if isinstance(source, str) else ''.join(source)
+
+
+def _cells(notebook):
+    # Les cellules d'un notebook (dict, ou Notebook v1 / v2) au même format
+    if isinstance(notebook, dict):
+        return [
+            _Cell(
+                cell.get('id'),
+                cell['cell_type'],
+                _text(cell.get('source', '')),
+                cell.get('outputs'),
+            )
+            for cell in toolbox.get_cells(notebook)
+        ]
+    return [
+        _Cell(
+            None if cell.id == NO_ID else cell.id,
+            _CELL_TYPES.get(cell.type, cell.type),
+            _text(cell.source),
+            getattr(cell, 'outputs', None),
+        )
+        for cell in notebook
+    ]
+
+
+def _unique_ids(cells):
+    # id -> index, pour les ids présents une seule fois
+    indices, duplicated = {}, set()
+    for index, cell in enumerate(cells):
+        if cell.id is None:
+            continue
+        if cell.id in indices:
+            duplicated.add(cell.id)
+        indices[cell.id] = index
+    for cell_id in duplicated:
+        del indices[cell_id]
+    return indices
+
+
+def _longest_increasing(values):
+    r"""Return the indices of a longest increasing subsequence of values.
+
+    Usage:
+
+        >>> sorted(_longest_increasing([0, 3, 1, 2, 5, 4]))
+        [0, 2, 3, 5]
+    """
+    tails, tail_indices, previous = [], [], [None] * len(values)
+    for index, value in enumerate(values):
+        position = bisect.bisect_left(tails, value)
+        if position:
+            previous[index] = tail_indices[position - 1]
+        if position == len(tails):
+            tails.append(value)
+            tail_indices.append(index)
+        else:
+            tails[position] = value
+            tail_indices[position] = index
+    indices = set()
+    index = tail_indices[-1] if tail_indices else None
+    while index is not None:
+        indices.add(index)
+        index = previous[index]
+    return indices
+
+
+def _stable_pairs(pairs):
+    # Les paires (ancien, nouveau) qui ne sont pas déplacées, dans l'ordre
+    ordered = sorted(pairs.items())
+    stable = _longest_increasing([old_index for _, old_index in ordered])
+    return [
+        (old_index, new_index)
+        for position, (new_index, old_index) in enumerate(ordered)
+        if position in stable
+    ]
+
+
+def match_cells(old, new):
+    r"""Match the cells of two notebooks.
+
+    Args:
+        old (list): the cells of the old notebook (see `_cells`).
+        new (list): the cells of the new notebook.
+
+    Returns:
+        dict: the index of the matching old cell of each matched new cell.
+    """
+    pairs = {}
+    old_ids = _unique_ids(old)
+    for cell_id, new_index in _unique_ids(new).items():
+        if cell_id in old_ids:
+            pairs[new_index] = old_ids[cell_id]
+
+    # Puis par contenu (cellules sans id, ou dont l'id a changé)
+    matched = set(pairs.values())
+    by_content = collections.defaultdict(collections.deque)
+    for old_index, cell in enumerate(old):
+        if old_index not in matched:
+            by_content[cell.cell_type, cell.source].append(old_index)
+    for new_index, cell in enumerate(new):
+        if new_index not in pairs:
+            candidates = by_content.get((cell.cell_type, cell.source))
+            if candidates:
+                pairs[new_index] = candidates.popleft()
+
+    # Enfin par position (et par type) entre deux cellules appariées
+    matched = set(pairs.values())
+    bounds = _stable_pairs(pairs) + [(len(old), len(new))]
+    old_start = new_start = 0
+    for old_stop, new_stop in bounds:
+        free = collections.defaultdict(collections.deque)
+        for old_index in range(old_start, old_stop):
+            if old_index not in matched:
+                free[old[old_index].cell_type].append(old_index)
+        for new_index in range(new_start, new_stop):
+            if new_index not in pairs and free[new[new_index].cell_type]:
+                pairs[new_index] = free[new[new_index].cell_type].popleft()
+        old_start, new_start = old_stop + 1, new_stop + 1
+    return pairs
+
+
+def diff(nb_a, nb_b):
+    r"""Compare two notebooks, cell by cell.
+
+    Args:
+        nb_a: the old notebook (a dict, or a `notebook_v1` / `notebook_v2`
+            Notebook).
+        nb_b: the new notebook.
+
+    Returns:
+        NotebookDiff: the added, removed, moved and modified cells, and the
+            cells whose outputs changed.
+
+    Usage:
+
+        >>> old = toolbox.load_ipynb("samples/hello-world.ipynb")
+        >>> new = toolbox.load_ipynb("samples/hello-world.ipynb")
+        >>> new['cells'].reverse()
+        >>> new['cells'][0]['source'] = ['Bye!']
+        >>> del new['cells'][1]['outputs'][0]
+        >>> result = diff(old, new)
+        >>> result.moved
+        [CellChange(old_index=2, new_index=0, cell_id='a23ab5ac'), CellChange(old_index=1, new_index=1, cell_id='b777420a')]
+        >>> result.modified, result.outputs
+        ([CellChange(old_index=2, new_index=0, cell_id='a23ab5ac')], [CellChange(old_index=1, new_index=1, cell_id='b777420a')])
+    """
+    return _diff(_cells(nb_a), _cells(nb_b))
+
+
+def _diff(old, new):
+    pairs = match_cells(old, new)
+    stable = set(_stable_pairs(pairs))
+
+    result = NotebookDiff([], [], [], [], [], 0)
+    matched = set(pairs.values())
+    result.removed.extend(
+        CellChange(old_index, None, cell.id)
+        for old_index, cell in enumerate(old)
+        if old_index not in matched
+    )
+    unchanged = 0
+    for new_index, cell in enumerate(new):
+        old_index = pairs.get(new_index)
+        if old_index is None:
+            result.added.append(CellChange(None, new_index, cell.id))
+            continue
+        old_cell = old[old_index]
+        change = CellChange(old_index, new_index, cell.id or old_cell.id)
+        same = True
+        if (old_index, new_index) not in stable:
+            result.moved.append(change)
+            same = False
+        if (old_cell.cell_type, old_cell.source) != (cell.cell_type, cell.source):
+            result.modified.append(change)
+            same = False
+        if old_cell.outputs != cell.outputs:
+            result.outputs.append(change)
+            same = False
+        unchanged += same
+    return result._replace(unchanged=unchanged)
+
+
+def format_diff(nb_a, nb_b, names=("old", "new")):
+    r"""Describe the differences between two notebooks (str).
+
+    The sources of the modified cells are compared line by line (unified
+    diff).
+
+    Usage:
+
+        >>> old = toolbox.load_ipynb("samples/hello-world.ipynb")
+        >>> new = toolbox.load_ipynb("samples/hello-world.ipynb")
+        >>> new['cells'][1]['source'] = ['print("Hello diff!")']
+        >>> del new['cells'][2]
+        >>> print(format_diff(old, new))
+        - removed markdown cell #a23ab5ac (2)
+        ~ modified code cell #b777420a (1 -> 1)
+          --- old
+          +++ new
+          @@ -1 +1 @@
+          -print("Hello world!")
+          +print("Hello diff!")
+        1 unchanged, 0 added, 1 removed, 0 moved, 1 modified, 0 with new outputs
+    """
+    old, new = _cells(nb_a), _cells(nb_b)
+    result = _diff(old, new)
+
+    def name(cell):
+        return f"{cell.cell_type} cell" + (f" #{cell.id}" if cell.id else "")
+
+    lines = []
+    for change in result.removed:
+        lines.append(f"- removed {name(old[change.old_index])} ({change.old_index})")
+    for change in result.added:
+        lines.append(f"+ added {name(new[change.new_index])} ({change.new_index})")
+    for change in result.moved:
+        lines.append(
+            f"> moved {name(new[change.new_index])} ({change.old_index} -> {change.new_index})"
+        )
+    for change in result.modified:
+        old_cell, new_cell = old[change.old_index], new[change.new_index]
+        lines.append(
+            f"~ modified {name(new_cell)} ({change.old_index} -> {change.new_index})"
+        )
+        lines.extend(
+            "  " + line.rstrip("\n")
+            for line in difflib.unified_diff(
+                old_cell.source.splitlines(True), new_cell.source.splitlines(True),
+                *names, n=1,
+            )
+        )
+    for change in result.outputs:
+        lines.append(
+            f"o outputs of {name(new[change.new_index])} ({change.old_index} -> {change.new_index})"
+        )
+    lines.append(
+        f"{result.unchanged} unchanged, {len(result.added)} added, "
+        f"{len(result.removed)} removed, {len(result.moved)} moved, "
+        f"{len(result.modified)} modified, {len(result.outputs)} with new outputs"
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two notebooks, cell by cell.")
+    parser.add_argument("old", help="the old notebook (.ipynb)")
+    parser.add_argument("new", help="the new notebook (.ipynb)")
+    args = parser.parse_args(argv)
+
+    print(format_diff(
+        toolbox.load_ipynb(args.old), toolbox.load_ipynb(args.new), (args.old, args.new)
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
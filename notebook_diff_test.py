@@ -0,0 +1,74 @@
+import copy
+import random
+import unittest
+
+import notebook_v0 as toolbox
+import notebook_bench
+import notebook_diff
+from notebook_v2 import NotebookLoader
+
+
+class Diff(unittest.TestCase):
+    def test_identical(self):
+        for filename in ["samples/hello-world.ipynb", "samples/errors.ipynb", "samples/streams.ipynb"]:
+            ipynb = toolbox.load_ipynb(filename)
+            result = notebook_diff.diff(ipynb, NotebookLoader(filename).load())
+            self.assertEqual(
+                notebook_diff.NotebookDiff([], [], [], [], [], len(ipynb["cells"])), result
+            )
+
+    def test_changes_with_ids(self):
+        old = notebook_bench.make_notebook(cells=30, source_lines=2)
+        new = copy.deepcopy(old)
+        cells = new["cells"]
+        cells[4]["source"] = ["edited"]
+        cells[5]["outputs"] = []
+        cells.insert(20, cells.pop(2))
+        del cells[10]
+        cells.insert(0, {"cell_type": "markdown", "id": "new-cell", "metadata": {}, "source": []})
+        result = notebook_diff.diff(old, new)
+        self.assertEqual([notebook_diff.CellChange(None, 0, "new-cell")], result.added)
+        self.assertEqual([notebook_diff.CellChange(11, None, "0000000b")], result.removed)
+        self.assertEqual([notebook_diff.CellChange(2, 20, "00000002")], result.moved)
+        self.assertEqual([notebook_diff.CellChange(4, 4, "00000004")], result.modified)
+        self.assertEqual([notebook_diff.CellChange(5, 5, "00000005")], result.outputs)
+        self.assertEqual(26, result.unchanged)
+
+    def test_changes_without_ids(self):
+        old = notebook_bench.make_notebook(cells=30, source_lines=2)
+        for cell in old["cells"]:
+            del cell["id"]
+        new = copy.deepcopy(old)
+        cells = new["cells"]
+        cells[4]["source"] = ["edited"]
+        cells.insert(20, cells.pop(2))
+        del cells[10]
+        result = notebook_diff.diff(old, new)
+        self.assertEqual([], result.added)
+        self.assertEqual([notebook_diff.CellChange(11, None, None)], result.removed)
+        self.assertEqual([notebook_diff.CellChange(2, 19, None)], result.moved)
+        self.assertEqual([notebook_diff.CellChange(4, 3, None)], result.modified)
+
+    def test_large_notebook(self):
+        old = notebook_bench.make_notebook(cells=5000, source_lines=2)
+        new = copy.deepcopy(old)
+        rng = random.Random(0)
+        edited = sorted(rng.sample(range(5000), 50))
+        for index in edited:
+            new["cells"][index]["source"] = [f"edited {index}"]
+        result = notebook_diff.diff(old, new)
+        self.assertEqual(edited, [change.new_index for change in result.modified])
+        self.assertEqual([], result.moved)
+        self.assertEqual(5000 - 50, result.unchanged)
+
+    def test_format_diff(self):
+        old = toolbox.load_ipynb("samples/hello-world.ipynb")
+        new = copy.deepcopy(old)
+        new["cells"].append(new["cells"].pop(0))
+        text = notebook_diff.format_diff(old, new)
+        self.assertIn("> moved markdown cell #a9541506 (0 -> 2)", text)
+        self.assertTrue(text.endswith("0 modified, 0 with new outputs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+a SQLite index of the cells, outputs and errors of a tree of notebooks
+
+Usage (command line):
+
+    python notebook_index.py index.sqlite samples --workers 4
+
+The index is updated incrementally: a notebook is only parsed again when
+its modification time or size changed and its content hash is new.
+"""
+
+# Python Standard Library
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+
+# Local Libraries
+import notebook_json
+import notebook_v0 as toolbox
+from notebook_batch import iter_notebooks, run_many
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notebooks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    version TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS cells (
+    notebook_id INTEGER NOT NULL REFERENCES notebooks (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    cell_id TEXT,
+    cell_type TEXT NOT NULL,
+    execution_count INTEGER,
+    source TEXT NOT NULL,
+    PRIMARY KEY (notebook_id, position)
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    notebook_id INTEGER NOT NULL REFERENCES notebooks (id) ON DELETE CASCADE,
+    cell_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    output_type TEXT NOT NULL,
+    name TEXT,
+    mime TEXT,
+    size INTEGER NOT NULL,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS errors (
+    notebook_id INTEGER NOT NULL REFERENCES notebooks (id) ON DELETE CASCADE,
+    cell_position INTEGER NOT NULL,
+    ename TEXT NOT NULL,
+    evalue TEXT NOT NULL,
+    traceback TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outputs_notebook ON outputs (notebook_id);
+CREATE INDEX IF NOT EXISTS outputs_size ON outputs (size);
+CREATE INDEX IF NOT EXISTS errors_notebook ON errors (notebook_id);
+CREATE INDEX IF NOT EXISTS errors_ename ON errors (ename);
+"""
+
+
+def _text(value):
+    return value if isinstance(value, str) else "".join(value)
+
+
+def _rows(ipynb):
+    # (cells, outputs, errors) rows of a notebook, without the notebook id
+    cells, outputs, errors = [], [], []
+    for position, cell in enumerate(toolbox.get_cells(ipynb)):
+        cells.append((
+            position,
+            cell.get("id"),
+            cell["cell_type"],
+            cell.get("execution_count"),
+            _text(cell.get("source", "")),
+        ))
+        if cell["cell_type"] != "code":
+            continue
+        for index, output in enumerate(cell.get("outputs", ())):
+            output_type = output.get("output_type")
+            if output_type == "stream":
+                text = _text(output.get("text", ""))
+                outputs.append(
+                    (position, index, output_type, output.get("name"), None, len(text), text)
+                )
+            elif output_type == "error":
+                outputs.append((position, index, output_type, None, None, 0, None))
+            for mime, value in output.get("data", {}).items():
+                size = len(_text(value)) if isinstance(value, (str, list)) else 0
+                outputs.append((position, index, output_type, None, mime, size, None))
+        for error in toolbox.iter_errors({"cells": [cell]}):
+            errors.append((position, error.ename, error.evalue, error.traceback))
+    return cells, outputs, errors
+
+
+def _extract(task):
+    # Exécuté dans les processus : lecture, hachage, puis analyse si besoin
+    path, known_sha256 = task
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError as exception:
+        return path, None, None, None, f"{type(exception).__name__}: {exception}"
+    sha256 = hashlib.sha256(data).hexdigest()
+    signature = (stat.st_mtime_ns, stat.st_size, sha256)
+    if sha256 == known_sha256:
+        return path, signature, None, None, None
+    try:
+        ipynb = notebook_json.loads(data)
+        return path, signature, toolbox.get_format_version(ipynb), _rows(ipynb), None
+    except Exception as exception:
+        return path, signature, None, None, f"{type(exception).__name__}: {exception}"
+
+
+class NotebookIndex:
+    r"""A SQLite database of the cells, outputs and errors of notebooks.
+
+    Tables:
+        notebooks: path (absolute), mtime_ns, size, sha256, version and
+            error (the reason why the notebook could not be parsed, if any).
+        cells: notebook_id, position, cell_id, cell_type, execution_count
+            and source (str).
+        outputs: notebook_id, cell_position, position, output_type, name
+            (of the streams), mime, size (of the value, in characters)
+            and text (of the streams).
+        errors: notebook_id, cell_position, ename, evalue and traceback.
+
+    Args:
+        database (str): the SQLite database file (":memory:" by default).
+
+    Usage:
+
+        >>> index = NotebookIndex()
+        >>> index.update(["samples/hello-world.ipynb", "samples/errors.ipynb"], workers=1)
+        {'added': 2, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        >>> index.update(["samples/hello-world.ipynb", "samples/errors.ipynb"], workers=1)
+        {'added': 0, 'updated': 0, 'unchanged': 2, 'removed': 0}
+        >>> index.update(["./samples/errors.ipynb"], workers=1)["unchanged"]
+        1
+        >>> [(os.path.relpath(path), *rest) for path, *rest in index.find_errors("TypeError")]
+        [('samples/errors.ipynb', 0, 'TypeError', "unsupported operand type(s) for +: 'int' and 'str'")]
+        >>> [(os.path.relpath(path), *rest) for path, *rest in index.find_cells('print(')]
+        [('samples/hello-world.ipynb', 1, 'b777420a')]
+        >>> index.close()
+    """
+
+    def __init__(self, database=":memory:"):
+        self.database = database
+        self.connection = sqlite3.connect(database)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if database != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.create_function(
+            "regexp", 2,
+            lambda pattern, text: text is not None and re.search(pattern, text) is not None,
+            deterministic=True,
+        )
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, paths, workers=None, chunksize=None):
+        r"""Index the notebooks of paths (files or directories).
+
+        The notebooks whose modification time and size are unchanged are
+        skipped without being read; the others are read and hashed, and
+        only parsed (in a pool of processes) when their content changed.
+        The indexed notebooks that are no longer found under paths are
+        removed from the index. The notebooks are stored by absolute path,
+        so that "./samples", "samples/." and "/.../samples" name the same
+        notebooks.
+
+        Returns:
+            dict: the number of notebooks "added", "updated", "unchanged"
+                and "removed".
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        known = {
+            path: (notebook_id, mtime_ns, size, sha256)
+            for notebook_id, path, mtime_ns, size, sha256 in self.connection.execute(
+                "SELECT id, path, mtime_ns, size, sha256 FROM notebooks"
+            )
+        }
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        found, tasks = set(), []
+        for path in map(os.path.abspath, iter_notebooks(paths)):
+            if path in found:  # sous plusieurs des chemins donnés
+                continue
+            found.add(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if path in known and known[path][1:3] == (stat.st_mtime_ns, stat.st_size):
+                counts["unchanged"] += 1
+            else:
+                tasks.append((path, known[path][3] if path in known else None))
+
+        roots = [os.path.join(path, "") for path in paths]
+        removed = [
+            path for path in known
+            if path not in found
+            and (path in paths or any(path.startswith(root) for root in roots))
+        ]
+
+        results = run_many(_extract, tasks, workers, chunksize)
+        with self.connection:
+            for path in removed:
+                self.connection.execute("DELETE FROM notebooks WHERE path = ?", (path,))
+                counts["removed"] += 1
+            for path, signature, version, rows, error in results:
+                if signature is None:  # unreadable (removed meanwhile...)
+                    continue
+                if path in known and rows is None and error is None:
+                    counts["unchanged"] += 1
+                    self.connection.execute(
+                        "UPDATE notebooks SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (signature[0], signature[1], path),
+                    )
+                    continue
+                counts["updated" if path in known else "added"] += 1
+                self._store(path, signature, version, rows, error)
+        return counts
+
+    def _store(self, path, signature, version, rows, error):
+        execute = self.connection.execute
+        execute("DELETE FROM notebooks WHERE path = ?", (path,))
+        notebook_id = execute(
+            "INSERT INTO notebooks (path, mtime_ns, size, sha256, version, error)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (path, *signature, version, error),
+        ).lastrowid
+        if rows is None:
+            return
+        cells, outputs, errors = rows
+        executemany = self.connection.executemany
+        executemany(
+            "INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?)",
+            [(notebook_id, *row) for row in cells],
+        )
+        executemany(
+            "INSERT INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(notebook_id, *row) for row in outputs],
+        )
+        executemany(
+            "INSERT INTO errors VALUES (?, ?, ?, ?, ?)",
+            [(notebook_id, *row) for row in errors],
+        )
+
+    def execute(self, sql, parameters=()):
+        r"""Run a SQL query on the index; return the list of the rows."""
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def find_errors(self, ename=None):
+        r"""Return the (path, cell position, ename, evalue) of the errors
+        (of type ename only, when given).
+        """
+        sql = (
+            "SELECT path, cell_position, ename, evalue FROM errors"
+            " JOIN notebooks ON notebooks.id = errors.notebook_id"
+        )
+        if ename is None:
+            return self.execute(sql + " ORDER BY path, cell_position")
+        return self.execute(sql + " WHERE ename = ? ORDER BY path, cell_position", (ename,))
+
+    def error_counts(self):
+        r"""Return the number of errors per exception name (dict)."""
+        return dict(self.execute(
+            "SELECT ename, COUNT(*) FROM errors GROUP BY ename ORDER BY COUNT(*) DESC, ename"
+        ))
+
+    def find_cells(self, text, cell_type=None, regexp=False):
+        r"""Return the (path, position, cell id) of the cells whose source
+        contains text (a regular expression with regexp=True).
+
+        Usage:
+
+            >>> with NotebookIndex() as index:
+            ...     _ = index.update(["samples"], workers=1)
+            ...     [(os.path.relpath(path), *rest)
+            ...      for path, *rest in index.find_cells(r"^raise \w+", regexp=True)]
+            [('samples/errors.ipynb', 1, None)]
+        """
+        condition = "source REGEXP ?" if regexp else "instr(source, ?) > 0"
+        parameters = [text]
+        if cell_type is not None:
+            condition += " AND cell_type = ?"
+            parameters.append(cell_type)
+        return self.execute(
+            "SELECT path, position, cell_id FROM cells"
+            " JOIN notebooks ON notebooks.id = cells.notebook_id"
+            f" WHERE {condition} ORDER BY path, position",
+            parameters,
+        )
+
+    def largest_outputs(self, limit=10, mime=None):
+        r"""Return the (path, cell position, output position, mime, size)
+        of the largest outputs (of the given MIME type only, when given).
+
+        Usage:
+
+            >>> with NotebookIndex() as index:
+            ...     _ = index.update(["samples/images.ipynb"], workers=1)
+            ...     [(os.path.relpath(path), *rest[:3])
+            ...      for path, *rest in index.largest_outputs(2, mime="image/png")]
+            [('samples/images.ipynb', 3, 0, 'image/png')]
+        """
+        sql = (
+            "SELECT path, cell_position, position, mime, outputs.size FROM outputs"
+            " JOIN notebooks ON notebooks.id = outputs.notebook_id"
+        )
+        parameters = []
+        if mime is not None:
+            sql += " WHERE mime = ?"
+            parameters.append(mime)
+        sql += " ORDER BY outputs.size DESC LIMIT ?"
+        parameters.append(limit)
+        return self.execute(sql, parameters)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build or update a SQLite index of notebooks."
+    )
+    parser.add_argument("database", help="the SQLite database file")
+    parser.add_argument("paths", nargs="+", help="notebook files or directories")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with NotebookIndex(args.database) as index:
+        counts = index.update(args.paths, args.workers, args.chunksize)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
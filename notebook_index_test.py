@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import notebook_v0 as toolbox
+from notebook_index import NotebookIndex
+
+
+class Index(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tree = os.path.join(self.directory, "tree")
+        os.makedirs(os.path.join(self.tree, "sub"))
+        for name in ("hello-world", "errors", "streams", "images"):
+            shutil.copy(f"samples/{name}.ipynb", self.tree)
+        shutil.copy("samples/errors.ipynb", os.path.join(self.tree, "sub", "copy.ipynb"))
+        self.index = NotebookIndex(os.path.join(self.directory, "index.sqlite"))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def path(self, *names):
+        return os.path.join(self.tree, *names)
+
+    def test_tables(self):
+        self.assertEqual(
+            {"added": 5, "updated": 0, "unchanged": 0, "removed": 0},
+            self.index.update([self.tree], workers=2),
+        )
+        ipynb = toolbox.load_ipynb("samples/hello-world.ipynb")
+        self.assertEqual(
+            [(cell["cell_type"], "".join(cell["source"])) for cell in ipynb["cells"]],
+            self.index.execute(
+                "SELECT cell_type, source FROM cells JOIN notebooks ON id = notebook_id"
+                " WHERE path = ? ORDER BY position",
+                (self.path("hello-world.ipynb"),),
+            ),
+        )
+        ipynb = toolbox.load_ipynb("samples/streams.ipynb")
+        self.assertEqual(
+            [("stdout", toolbox.get_stream(ipynb)),
+             ("stderr", toolbox.get_stream(ipynb, stdout=False, stderr=True))],
+            self.index.execute(
+                "SELECT name, text FROM outputs JOIN notebooks ON id = notebook_id"
+                " WHERE path = ? ORDER BY cell_position",
+                (self.path("streams.ipynb"),),
+            ),
+        )
+
+    def test_queries(self):
+        self.index.update([self.tree], workers=1)
+        self.assertEqual(
+            [self.path("errors.ipynb"), self.path("sub", "copy.ipynb")],
+            [row[0] for row in self.index.find_errors("TypeError")],
+        )
+        self.assertEqual({"TypeError": 2, "Warning": 2}, self.index.error_counts())
+        self.assertEqual(
+            [(self.path("hello-world.ipynb"), 1, "b777420a")],
+            self.index.find_cells("print(\"Hello", cell_type="code"),
+        )
+        self.assertEqual([], self.index.find_cells("print(", cell_type="markdown"))
+        self.assertEqual(
+            [self.path("hello-world.ipynb")],
+            [row[0] for row in self.index.find_cells(r"^Goodbye", regexp=True)],
+        )
+        (largest,) = self.index.largest_outputs(1)
+        self.assertEqual((self.path("images.ipynb"), 3, 0, "image/png"), largest[:4])
+
+    def test_incremental(self):
+        self.index.update([self.tree], workers=1)
+        # même contenu, nouvelle date : relu et haché, mais pas analysé
+        os.utime(self.path("errors.ipynb"), ns=(0, 0))
+        self.assertEqual(
+            {"added": 0, "updated": 0, "unchanged": 5, "removed": 0},
+            self.index.update([self.tree], workers=1),
+        )
+        ipynb = toolbox.clear_outputs(toolbox.load_ipynb(self.path("errors.ipynb")))
+        toolbox.save_ipynb(ipynb, self.path("errors.ipynb"))
+        os.remove(self.path("sub", "copy.ipynb"))
+        with open(self.path("broken.ipynb"), "w", encoding="utf-8") as file:
+            file.write("{")
+        self.assertEqual(
+            {"added": 1, "updated": 1, "unchanged": 3, "removed": 1},
+            self.index.update([self.tree], workers=1),
+        )
+        self.assertEqual({}, self.index.error_counts())
+        self.assertEqual(
+            [("JSONDecodeError",)],
+            self.index.execute(
+                "SELECT substr(error, 1, 15) FROM notebooks WHERE error IS NOT NULL"
+            ),
+        )
+        # les autres arbres indexés ne sont pas touchés
+        self.index.update(["samples/hello-world.ipynb"], workers=1)
+        self.assertEqual(
+            {"added": 0, "updated": 0, "unchanged": 5, "removed": 0},
+            self.index.update([self.tree], workers=1),
+        )
+        self.assertEqual(6, self.index.execute("SELECT COUNT(*) FROM notebooks")[0][0])
+
+    def test_relative_paths(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            self.assertEqual(
+                {"added": 5, "updated": 0, "unchanged": 0, "removed": 0},
+                self.index.update(["./tree"], workers=1),
+            )
+            # le même fichier sous d'autres noms n'est indexé qu'une fois
+            self.assertEqual(
+                {"added": 0, "updated": 0, "unchanged": 5, "removed": 0},
+                self.index.update(
+                    [self.tree, "tree/.", os.path.join(".", "tree", "errors.ipynb")], workers=1
+                ),
+            )
+            os.remove(self.path("sub", "copy.ipynb"))
+            self.assertEqual(
+                {"added": 0, "updated": 0, "unchanged": 4, "removed": 1},
+                self.index.update(["./tree"], workers=1),
+            )
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(
+            [(self.path("errors.ipynb"),)],
+            self.index.execute("SELECT path FROM notebooks WHERE path LIKE '%errors.ipynb'"),
+        )
+        self.assertEqual(4, self.index.execute("SELECT COUNT(*) FROM notebooks")[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+opt-in instrumentation of the notebook toolbox: stage timers and counters
+
+Usage:
+
+    import notebook_instrument as instrument
+
+    instrument.enable(trace_memory=True)
+    ...  # load_ipynb, NotebookLoader.load, to_percent, Outliner.outline...
+    instrument.write_report("metrics.prom")  # or .json
+
+The functions of the toolbox time their stages with `stage(name)` and
+count what they process with `count(name, value)`. While the
+instrumentation is disabled (the default), `stage` returns a shared no-op
+context manager and `count` returns at once: the cost is a function call
+(and an empty with block), well under a microsecond.
+
+The stages are timed inclusively: "NotebookLoader.load" includes the
+"load_ipynb" (JSON parsing) and "NotebookLoader.from_ipynb" (object
+building) stages it runs. With trace_memory=True, the peak of the memory
+allocated (tracemalloc) during each stage is recorded too.
+"""
+
+# Python Standard Library
+import contextlib
+import json
+import re
+import threading
+import time
+import tracemalloc
+
+
+_enabled = False
+_trace_memory = False
+_started_tracemalloc = False
+_lock = threading.Lock()
+_local = threading.local()  # the stack of the tracemalloc peaks of the stages
+_stages = {}  # name -> [calls, seconds, max_seconds, peak_bytes]
+_counters = {}  # name -> value
+_hooks = []
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def enable(trace_memory=False):
+    r"""Enable the instrumentation (the records are kept, see `reset`).
+
+    Args:
+        trace_memory (bool): also record the peak of the memory allocated
+            during each stage (starts tracemalloc, which slows Python down).
+    """
+    global _enabled, _trace_memory, _started_tracemalloc
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _trace_memory = trace_memory
+    _enabled = True
+
+
+def disable():
+    r"""Disable the instrumentation (the records are kept)."""
+    global _enabled, _trace_memory, _started_tracemalloc
+    _enabled = _trace_memory = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def is_enabled():
+    r"""Is the instrumentation enabled?"""
+    return _enabled
+
+
+def reset():
+    r"""Forget the stages and counters recorded."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+@contextlib.contextmanager
+def recording(trace_memory=False):
+    r"""Enable the instrumentation, from a reset, within a with block.
+
+    Usage:
+
+        >>> import notebook_v0 as toolbox
+        >>> with recording():
+        ...     _ = toolbox.to_percent(toolbox.load_ipynb("samples/hello-world.ipynb"))
+        >>> sorted(report()["stages"])
+        ['load_ipynb', 'to_percent']
+        >>> report()["stages"]["load_ipynb"]["calls"], report()["counters"]
+        (1, {'bytes': 639})
+    """
+    reset()
+    enable(trace_memory)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def add_hook(hook):
+    r"""Call hook(kind, name, value) on each record: kind is "stage" (value
+    is the time spent, in seconds) or "counter" (value is the increment).
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    r"""Stop calling a hook added by `add_hook`."""
+    _hooks.remove(hook)
+
+
+class _Stage:
+    __slots__ = ("name", "start", "traced")
+
+    def __init__(self, name):
+        self.name = name
+        self.traced = False
+
+    def __enter__(self):
+        self.traced = _trace_memory
+        if self.traced:
+            # Le pic de l'étape englobante est conservé avant la remise à zéro
+            stack = _peaks()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = 0
+        if self.traced:
+            stack = _peaks()
+            start, previous = stack.pop()
+            # tracemalloc arrêté (disable) pendant l'étape : pas de pic
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, previous)
+                peak_bytes = peak - start
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+        with _lock:
+            record = _stages.get(self.name)
+            if record is None:
+                record = _stages[self.name] = [0, 0.0, 0.0, 0]
+            record[0] += 1
+            record[1] += seconds
+            record[2] = max(record[2], seconds)
+            record[3] = max(record[3], peak_bytes)
+        for hook in _hooks:
+            hook("stage", self.name, seconds)
+        return False
+
+
+def _peaks():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def stage(name):
+    r"""A context manager timing a stage (a no-op when disabled).
+
+    Usage:
+
+        >>> with recording():
+        ...     with stage("outer"):
+        ...         with stage("inner"):
+        ...             pass
+        >>> [(name, record["calls"]) for name, record in sorted(report()["stages"].items())]
+        [('inner', 1), ('outer', 1)]
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def count(name, value=1):
+    r"""Add value to a counter (nothing happens when disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+    for hook in _hooks:
+        hook("counter", name, value)
+
+
+def report():
+    r"""Return the stages and counters recorded (dict, JSON-serializable).
+
+    Returns:
+        dict: {"stages": {name: {"calls", "seconds", "max_seconds",
+            "peak_bytes"}}, "counters": {name: value}}; peak_bytes is 0
+            without trace_memory.
+    """
+    with _lock:
+        return {
+            "stages": {
+                name: {
+                    "calls": calls,
+                    "seconds": seconds,
+                    "max_seconds": max_seconds,
+                    "peak_bytes": peak_bytes,
+                }
+                for name, (calls, seconds, max_seconds, peak_bytes) in _stages.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+def merge(reports):
+    r"""Merge reports (of several processes, for instance) into one.
+
+    Usage:
+
+        >>> first = {"stages": {"a": {"calls": 1, "seconds": 1.0, "max_seconds": 1.0, "peak_bytes": 10}},
+        ...          "counters": {"cells": 3}}
+        >>> merge([first, first])
+        {'stages': {'a': {'calls': 2, 'seconds': 2.0, 'max_seconds': 1.0, 'peak_bytes': 10}}, 'counters': {'cells': 6}}
+    """
+    merged = {"stages": {}, "counters": {}}
+    for one in reports:
+        for name, record in one["stages"].items():
+            total = merged["stages"].setdefault(
+                name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_bytes": 0}
+            )
+            total["calls"] += record["calls"]
+            total["seconds"] += record["seconds"]
+            total["max_seconds"] = max(total["max_seconds"], record["max_seconds"])
+            total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+        for name, value in one["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+    return merged
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(data=None, prefix="notebook"):
+    r"""Format a report (defaults to the current one) in the Prometheus text
+    exposition format.
+
+    Usage:
+
+        >>> data = {"stages": {"to_percent": {"calls": 2, "seconds": 0.5, "max_seconds": 0.3, "peak_bytes": 0}},
+        ...         "counters": {"cells": 12}}
+        >>> print(to_prometheus(data))
+        # HELP notebook_stage_calls_total Number of runs of each stage.
+        # TYPE notebook_stage_calls_total counter
+        notebook_stage_calls_total{stage="to_percent"} 2
+        # HELP notebook_stage_seconds_total Time spent in each stage.
+        # TYPE notebook_stage_seconds_total counter
+        notebook_stage_seconds_total{stage="to_percent"} 0.5
+        # HELP notebook_stage_max_seconds Longest run of each stage.
+        # TYPE notebook_stage_max_seconds gauge
+        notebook_stage_max_seconds{stage="to_percent"} 0.3
+        # HELP notebook_stage_peak_bytes Peak of the memory allocated during each stage.
+        # TYPE notebook_stage_peak_bytes gauge
+        notebook_stage_peak_bytes{stage="to_percent"} 0
+        # TYPE notebook_cells_total counter
+        notebook_cells_total 12
+        <BLANKLINE>
+    """
+    data = report() if data is None else data
+    lines = []
+    metrics = [
+        ("stage_calls_total", "calls", "counter", "Number of runs of each stage."),
+        ("stage_seconds_total", "seconds", "counter", "Time spent in each stage."),
+        ("stage_max_seconds", "max_seconds", "gauge", "Longest run of each stage."),
+        ("stage_peak_bytes", "peak_bytes", "gauge",
+         "Peak of the memory allocated during each stage."),
+    ]
+    if data["stages"]:
+        for metric, key, kind, help_text in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, record in sorted(data["stages"].items()):
+                lines.append(f'{prefix}_{metric}{{stage="{_label(name)}"}} {record[key]!r}')
+    for name, value in sorted(data["counters"].items()):
+        metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(filename, data=None, format=None):
+    r"""Write a report (defaults to the current one) to a file.
+
+    Args:
+        filename (str): the file.
+        data (dict): the report (see `report` and `merge`).
+        format (str): "json" or "prometheus" (defaults to "prometheus" for
+            the .prom and .txt files, "json" otherwise).
+    """
+    data = report() if data is None else data
+    if format is None:
+        format = "prometheus" if str(filename).endswith((".prom", ".txt")) else "json"
+    if format not in ("json", "prometheus"):
+        raise ValueError(f"unknown format {format!r} (expected 'json' or 'prometheus')")
+    with open(filename, "w", encoding="utf-8") as file:
+        if format == "json":
+            json.dump(data, file, indent=1)
+            file.write("\n")
+        else:
+            file.write(to_prometheus(data))
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+
+import notebook_instrument as instrument
+import notebook_v0 as toolbox
+from notebook_v1 import Outliner
+from notebook_v2 import NotebookLoader
+
+
+class Disabled(unittest.TestCase):
+    def test_nothing_recorded(self):
+        instrument.reset()
+        self.assertFalse(instrument.is_enabled())
+        toolbox.to_percent(toolbox.load_ipynb("samples/streams.ipynb"))
+        instrument.count("cells", 3)
+        self.assertEqual({"stages": {}, "counters": {}}, instrument.report())
+
+
+class Recording(unittest.TestCase):
+    def test_stages_and_counters(self):
+        with instrument.recording():
+            nb = NotebookLoader("samples/images.ipynb").load()
+            Outliner(nb).outline()
+            toolbox.get_images(toolbox.load_ipynb("samples/images.ipynb"))
+        report = instrument.report()
+        self.assertEqual(
+            ["NotebookLoader.from_ipynb", "NotebookLoader.load", "Outliner.outline", "load_ipynb"],
+            sorted(report["stages"]),
+        )
+        self.assertEqual(2, report["stages"]["load_ipynb"]["calls"])
+        stages = report["stages"]
+        self.assertGreaterEqual(
+            stages["NotebookLoader.load"]["seconds"],
+            stages["NotebookLoader.from_ipynb"]["seconds"],
+        )
+        self.assertEqual(
+            {"bytes": 2 * os.path.getsize("samples/images.ipynb"), "cells": 4, "outputs": 2,
+             "images": 1},
+            report["counters"],
+        )
+        self.assertFalse(instrument.is_enabled())
+
+    def test_hooks(self):
+        events = []
+        hook = lambda kind, name, value: events.append((kind, name))
+        instrument.add_hook(hook)
+        try:
+            with instrument.recording():
+                toolbox.load_ipynb("samples/minimal.ipynb")
+        finally:
+            instrument.remove_hook(hook)
+        self.assertEqual([("counter", "bytes"), ("stage", "load_ipynb")], events)
+
+    def test_trace_memory(self):
+        with instrument.recording(trace_memory=True):
+            with instrument.stage("outer"):
+                with instrument.stage("inner"):
+                    data = bytearray(10 ** 6)
+                    del data
+        stages = instrument.report()["stages"]
+        self.assertGreaterEqual(stages["inner"]["peak_bytes"], 10 ** 6)
+        self.assertGreaterEqual(stages["outer"]["peak_bytes"], stages["inner"]["peak_bytes"])
+
+    def test_error(self):
+        with instrument.recording():
+            with self.assertRaises(FileNotFoundError):
+                toolbox.load_ipynb("samples/missing.ipynb")
+        self.assertEqual(1, instrument.report()["stages"]["load_ipynb"]["calls"])
+
+
+class Export(unittest.TestCase):
+    def setUp(self):
+        with instrument.recording():
+            toolbox.to_percent(toolbox.load_ipynb("samples/hello-world.ipynb"))
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_json(self):
+        filename = os.path.join(self.directory, "metrics.json")
+        instrument.write_report(filename)
+        with open(filename, encoding="utf-8") as file:
+            self.assertEqual(instrument.report(), json.load(file))
+
+    def test_prometheus(self):
+        filename = os.path.join(self.directory, "metrics.prom")
+        instrument.write_report(filename)
+        with open(filename, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertIn('notebook_stage_calls_total{stage="to_percent"} 1', lines)
+        self.assertIn("notebook_bytes_total 639", lines)
+        for line in lines:
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                float(value)
+
+    def test_merge(self):
+        merged = instrument.merge([instrument.report()] * 3)
+        self.assertEqual(3, merged["stages"]["load_ipynb"]["calls"])
+        self.assertEqual(3 * 639, merged["counters"]["bytes"])
+
+    def test_bad_format(self):
+        with self.assertRaises(ValueError):
+            instrument.write_report(os.path.join(self.directory, "metrics"), format="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+pluggable JSON backends for the .ipynb files
+
+The fastest installed library among orjson, ujson and simdjson is used to
+parse and write the notebooks (as UTF-8 bytes); the standard library `json`
+module is the fallback.
+"""
+
+# Python Standard Library
+import importlib
+import json
+import math
+
+
+BACKENDS = ("orjson", "ujson", "simdjson", "json")
+MODES = ("compact", "nbformat-pretty")
+
+_backend = None  # (name, loads, dumps), choisi au premier usage
+_SCALARS = {str, int, bool, type(None)}
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _stdlib_dumps(value, default=None):
+    return json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=default
+    ).encode("utf-8")
+
+
+def _make_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown JSON backend {name!r} (expected one of {BACKENDS})")
+    if name == "json":
+        return name, _stdlib_loads, _stdlib_dumps
+    module = importlib.import_module(name)
+    if name == "orjson":
+        return name, module.loads, module.dumps
+    if name == "ujson":
+        def dumps(value, default=None):
+            return module.dumps(
+                value, ensure_ascii=False, escape_forward_slashes=False, default=default
+            ).encode("utf-8")
+        return name, module.loads, dumps
+    return name, module.loads, _stdlib_dumps  # simdjson
+
+
+def available_backends():
+    r"""Return the names of the installed JSON backends, fastest first.
+
+    Usage:
+
+        >>> available_backends()[-1]
+        'json'
+    """
+    names = []
+    for name in BACKENDS:
+        try:
+            _make_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_backend(name=None):
+    r"""Select the JSON backend (by default, the fastest installed one).
+
+    Usage:
+
+        >>> previous = get_backend()
+        >>> set_backend("json")
+        >>> get_backend()
+        'json'
+        >>> set_backend(previous)
+    """
+    global _backend
+    if name is None:
+        name = available_backends()[0]
+    _backend = _make_backend(name)
+
+
+def get_backend():
+    r"""Return the name of the selected JSON backend."""
+    if _backend is None:
+        set_backend()
+    return _backend[0]
+
+
+def loads(data):
+    r"""Parse a JSON document (bytes or str).
+
+    Usage:
+
+        >>> loads(b'{"nbformat": 4, "source": ["\xc3\xa9"]}')
+        {'nbformat': 4, 'source': ['é']}
+    """
+    if _backend is None:
+        set_backend()
+    name, backend_loads, _ = _backend
+    try:
+        return backend_loads(data)
+    except ValueError:
+        if name == "json":
+            raise
+        # NaN, Infinity...: only the standard library accepts them
+        return _stdlib_loads(data)
+
+
+def dumps(value, mode="compact", default=None):
+    r"""Encode a value as a JSON document (UTF-8 bytes).
+
+    Args:
+        value: the value to encode.
+        mode (str): "compact" (no whitespace) or "nbformat-pretty" (the
+            layout of the files written by Jupyter: one space indentation,
+            sorted keys and a final newline).
+        default (callable): called with the objects that can't be encoded
+            otherwise; returns an encodable value (or raises TypeError).
+
+    Usage:
+
+        >>> dumps({"source": ["é"], "nbformat": 4})
+        b'{"source":["\xc3\xa9"],"nbformat":4}'
+        >>> dumps(loads(b'{"a": NaN}'))
+        b'{"a":NaN}'
+        >>> print(dumps({"source": ["é"], "nbformat": 4}, "nbformat-pretty").decode("utf-8"))
+        {
+         "nbformat": 4,
+         "source": [
+          "é"
+         ]
+        }
+        <BLANKLINE>
+    """
+    if mode == "nbformat-pretty":
+        text = json.dumps(
+            value, indent=1, sort_keys=True, ensure_ascii=False, default=default
+        )
+        return text.encode("utf-8") + b"\n"
+    if mode != "compact":
+        raise ValueError(f"unknown JSON mode {mode!r} (expected one of {MODES})")
+    if _backend is None:
+        set_backend()
+    name, _, backend_dumps = _backend
+    try:
+        data = backend_dumps(value, default=default)
+    except (TypeError, ValueError, OverflowError):
+        if name == "json":
+            raise
+        # big integers...: the standard library handles them
+        return _stdlib_dumps(value, default)
+    # orjson writes NaN and ±Infinity as null, without an error: the values
+    # are only searched for when there is a null in the document
+    if name == "orjson" and b"null" in data and _has_non_finite(value):
+        return _stdlib_dumps(value, default)
+    return data
+
+
+def _has_non_finite(value):
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        items = value.values() if isinstance(value, dict) else value
+        # Les listes de str (les sources) sont écartées sans boucle Python
+        if _SCALARS.issuperset(map(type, items)):
+            continue
+        for item in items:
+            if isinstance(item, float):
+                if not math.isfinite(item):
+                    return True
+            elif isinstance(item, (dict, list, tuple)):
+                stack.append(item)
+    return False
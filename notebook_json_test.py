@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+import notebook_json
+import notebook_v0 as toolbox
+
+
+SAMPLES = [
+    "samples/minimal.ipynb",
+    "samples/hello-world.ipynb",
+    "samples/metadata.ipynb",
+    "samples/streams.ipynb",
+    "samples/errors.ipynb",
+    "samples/images.ipynb",
+]
+
+
+class Backends(unittest.TestCase):
+    def setUp(self):
+        self.previous = notebook_json.get_backend()
+
+    def tearDown(self):
+        notebook_json.set_backend(self.previous)
+
+    def test_same_content(self):
+        for backend in notebook_json.available_backends():
+            notebook_json.set_backend(backend)
+            for filename in SAMPLES:
+                with open(filename, "rb") as file:
+                    data = file.read()
+                ipynb = notebook_json.loads(data)
+                self.assertEqual(json.loads(data), ipynb)
+                self.assertEqual(ipynb, json.loads(notebook_json.dumps(ipynb)))
+
+    def test_nbformat_pretty(self):
+        for filename in SAMPLES:
+            with open(filename, "rb") as file:
+                data = file.read()
+            self.assertEqual(
+                data, notebook_json.dumps(notebook_json.loads(data), "nbformat-pretty")
+            )
+
+    def test_fallback(self):
+        for backend in notebook_json.available_backends():
+            notebook_json.set_backend(backend)
+            value = {"big": 2 ** 70, "nan": float("nan")}
+            data = notebook_json.dumps(value)
+            self.assertEqual(2 ** 70, notebook_json.loads(data)["big"])
+            with self.assertRaises(json.JSONDecodeError):
+                notebook_json.loads(b"{")
+
+    def test_non_finite(self):
+        data = b'{"a":NaN,"b":[null,Infinity,{"c":-Infinity}],"d":1.5}'
+        for backend in notebook_json.available_backends():
+            notebook_json.set_backend(backend)
+            self.assertEqual(data, notebook_json.dumps(notebook_json.loads(data)))
+            self.assertEqual(b'{"a":null,"b":1.5}', notebook_json.dumps({"a": None, "b": 1.5}))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            notebook_json.dumps({}, "indented")
+        with self.assertRaises(ValueError):
+            notebook_json.set_backend("yaml")
+
+
+class SaveModes(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, "save-load.ipynb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_modes(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename)
+            for mode in notebook_json.MODES:
+                toolbox.save_ipynb(ipynb, self.output, mode)
+                self.assertEqual(ipynb, toolbox.load_ipynb(self.output))
+            with open(filename, "rb") as file:
+                original = file.read()
+            with open(self.output, "rb") as file:
+                self.assertEqual(original, file.read())
+
+    def test_stream_modes(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename)
+            for mode in notebook_json.MODES:
+                for options in ({"stream": True}, {"lazy": True}):
+                    toolbox.save_ipynb(
+                        toolbox.load_ipynb(filename, threshold=100, **options),
+                        self.output,
+                        mode,
+                    )
+                    with open(self.output, "rb") as file:
+                        self.assertEqual(notebook_json.dumps(ipynb, mode), file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
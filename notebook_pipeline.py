@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+lazy transforms of the cells of a notebook, fused in a single pass
+
+Usage:
+
+    Pipeline("notebook.ipynb").filter(code_only).clear_outputs().to_percent(out)
+
+The stages are applied to each cell in turn, as the cells are read from the
+file (see `notebook_stream`): no intermediate notebook, nor list of cells,
+is ever built.
+"""
+
+# Python Standard Library
+import os
+
+# Local Libraries
+import notebook_v0 as toolbox
+from notebook_v2 import CodeCell, Notebook, NotebookLoader, cell_from_dict, markdownize_cell
+
+
+markdownize = markdownize_cell
+
+
+def code_only(cell):
+    r"""Is the cell a code cell? (a predicate for `Pipeline.filter`)"""
+    return cell.type == 'CodeCell'
+
+
+def clear_outputs(cell):
+    r"""Return the cell without its outputs and execution count (a new
+    cell for the code cells, see `notebook_v2.CodeCell.replace`).
+    """
+    if isinstance(cell, CodeCell) and (cell.outputs or cell.execution_count is not None):
+        return cell.replace(outputs=[], execution_count=None)
+    return cell
+
+
+class Pipeline:
+    r"""A chain of transforms of the cells of a notebook, applied lazily.
+
+    Each method returns a new pipeline (the pipelines can be shared); the
+    cells only go through the stages when the pipeline is iterated or
+    written, one cell at a time.
+
+    Args:
+        source: the notebook: an .ipynb file (its cells are streamed from
+            the file), a `notebook_v2.NotebookLoader` (idem), a
+            `notebook_v2.Notebook` or a notebook (dict).
+        stages (tuple): the functions applied to each cell (see `map`).
+
+    Usage:
+
+        >>> pipeline = Pipeline("samples/hello-world.ipynb").map(markdownize)
+        >>> [cell.type for cell in pipeline]
+        ['MarkdownCell', 'MarkdownCell', 'MarkdownCell']
+        >>> print(Pipeline("samples/hello-world.ipynb").filter(code_only).to_percent())
+        # %%
+        print("Hello world!")
+        <BLANKLINE>
+    """
+
+    def __init__(self, source, stages=()):
+        self.source = source
+        self.stages = tuple(stages)
+
+    def __repr__(self):
+        return f"Pipeline({self.source!r}, {len(self.stages)} stages)"
+
+    def map(self, function):
+        r"""Apply function to each cell; function returns the new cell (or
+        None to drop the cell) and must not modify its argument.
+        """
+        return Pipeline(self.source, self.stages + (function,))
+
+    def filter(self, predicate):
+        r"""Keep the cells for which predicate(cell) is true."""
+        return self.map(lambda cell: cell if predicate(cell) else None)
+
+    def clear_outputs(self):
+        r"""Remove the outputs and execution counts of the code cells."""
+        return self.map(clear_outputs)
+
+    def markdownize(self):
+        r"""Transform the code cells into markdown cells (see `notebook_v2.Markdownizer`)."""
+        return self.map(markdownize)
+
+    def remove_markdown_cells(self):
+        r"""Keep the code cells only (see `notebook_v2.MarkdownLesser`)."""
+        return self.filter(code_only)
+
+    def _open(self):
+        # La version du notebook, ses métadonnées et ses cellules (un itérateur)
+        source = self.source
+        if isinstance(source, NotebookLoader):
+            source = source.filename
+        if isinstance(source, (str, os.PathLike)):
+            source = toolbox.load_ipynb(source, stream=True)
+        if isinstance(source, dict):
+            cells = (cell_from_dict(cell) for cell in toolbox.get_cells(source))
+            return toolbox.get_format_version(source), source.get('metadata'), cells
+        return source.version, getattr(source, 'metadata', None), iter(source)
+
+    def _run(self, cells):
+        stages = self.stages
+        for cell in cells:
+            for stage in stages:
+                if cell is None:
+                    break
+                cell = stage(cell)
+            if cell is not None:
+                yield cell
+
+    def __iter__(self):
+        r"""Iterate the transformed cells."""
+        _, _, cells = self._open()
+        return self._run(cells)
+
+    def to_notebook(self):
+        r"""Return the transformed notebook (a `notebook_v2.Notebook`)."""
+        version, metadata, cells = self._open()
+        return Notebook(version, list(self._run(cells)), metadata)
+
+    def to_percent(self, out=None):
+        r"""Convert the transformed notebook to the percent format (see
+        `notebook_v0.to_percent`); with out (a text file), the cells are
+        written as they go and nothing is returned.
+
+        Usage:
+
+            >>> import io
+            >>> out = io.StringIO()
+            >>> Pipeline("samples/hello-world.ipynb").remove_markdown_cells().to_percent(out)
+            >>> out.getvalue()
+            '# %%\nprint("Hello world!")\n'
+        """
+        _, _, cells = self._open()
+        ipynb_cells = (
+            {
+                'cell_type': 'code' if cell.type == 'CodeCell' else 'markdown',
+                'source': cell.source,
+            }
+            for cell in self._run(cells)
+        )
+        return toolbox.to_percent({'cells': ipynb_cells}, out)
@@ -0,0 +1,74 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import notebook_v0 as toolbox
+import notebook_bench
+from notebook_pipeline import Pipeline, clear_outputs, code_only, markdownize
+from notebook_v1 import Serializer
+from notebook_v2 import Markdownizer, MarkdownLesser, NotebookLoader
+
+SAMPLES = [
+    "samples/hello-world.ipynb",
+    "samples/errors.ipynb",
+    "samples/images.ipynb",
+    "samples/streams.ipynb",
+    "samples/minimal.ipynb",
+]
+
+
+class Transforms(unittest.TestCase):
+    def test_same_as_classes(self):
+        for filename in SAMPLES:
+            nb = NotebookLoader(filename).load()
+            for pipeline, expected in [
+                (Pipeline(filename).markdownize(), Markdownizer(nb).markdownize()),
+                (Pipeline(nb).remove_markdown_cells(), MarkdownLesser(nb).remove_markdown_cells()),
+                (Pipeline(NotebookLoader(filename)).map(markdownize), Markdownizer(nb).markdownize()),
+            ]:
+                self.assertEqual(
+                    Serializer(expected).serialize(), Serializer(pipeline.to_notebook()).serialize()
+                )
+
+    def test_to_percent(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename)
+            self.assertEqual(toolbox.to_percent(ipynb), Pipeline(filename).to_percent())
+            out = io.StringIO()
+            self.assertIsNone(Pipeline(ipynb).to_percent(out))
+            self.assertEqual(toolbox.to_percent(ipynb), out.getvalue())
+
+    def test_stages(self):
+        nb = NotebookLoader("samples/streams.ipynb").load()
+        pipeline = Pipeline(nb).filter(code_only)
+        cleared = pipeline.clear_outputs()
+        self.assertEqual(1, len(pipeline.stages))
+        for cell, cleared_cell in zip(pipeline, cleared):
+            self.assertEqual(([], None), (cleared_cell.outputs, cleared_cell.execution_count))
+            self.assertIs(cell.source, cleared_cell.source)
+        self.assertTrue(any(cell.outputs for cell in nb))  # non modifié
+        self.assertEqual([], list(Pipeline(nb).filter(lambda cell: False)))
+        cleared_cell = clear_outputs(nb.cells[0])
+        self.assertIs(cleared_cell, clear_outputs(cleared_cell))
+
+    def test_peak_memory(self):
+        ipynb = notebook_bench.make_notebook(cells=300, image_bytes=20000)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "large.ipynb")
+            notebook_bench.write_notebook(ipynb, filename)
+            pipeline = Pipeline(filename).remove_markdown_cells().clear_outputs()
+            pipeline.to_percent(io.StringIO())  # imports, caches...
+            tracemalloc.start()
+            try:
+                with open(os.devnull, "w", encoding="utf-8") as out:
+                    pipeline.to_percent(out)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, os.path.getsize(filename) / 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+smaller notebooks: the oversized image outputs downscaled and re-encoded
+
+Usage (command line):
+
+    python notebook_slim.py notebooks --max-pixels 1000000 --format webp --quality 80
+    python notebook_slim.py big.ipynb --in-place --json
+
+The images larger than `max_pixels` are downscaled (aspect ratio kept), and
+re-encoded in the given format; an image is only replaced when the new one
+is smaller. The images are decoded, resized and encoded with Pillow, in a
+pool of processes.
+"""
+
+# Python Standard Library
+import argparse
+import base64
+import collections
+import io
+import itertools
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Local Libraries
+import notebook_batch
+import notebook_v0 as toolbox
+from notebook_blobs import decode_image, map_outputs
+
+
+DEFAULT_MAX_PIXELS = 1024 * 1024
+DEFAULT_QUALITY = 85  # jpeg and webp
+SUFFIX = "-slim.ipynb"  # the slimmed files (see `output_path`)
+# format: mime type of the re-encoded images
+FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def slim_image(data, max_pixels=DEFAULT_MAX_PIXELS, format="png", quality=DEFAULT_QUALITY):
+    r"""Downscale an image to at most max_pixels and re-encode it.
+
+    Args:
+        data (bytes): the encoded image (PNG, JPEG or WebP).
+        max_pixels (int): the maximal number of pixels (width * height).
+        format (str): "png", "jpeg" or "webp".
+        quality (int): the quality of the jpeg and webp images (1 to 100).
+
+    Returns:
+        bytes: the new image, or None when the image is small enough and
+            already in the format, or when the new image is not smaller.
+
+    Usage:
+
+        >>> import PIL.Image
+        >>> png = decode_image(toolbox.load_ipynb("samples/images.ipynb")['cells'][-1]['outputs'][0]['data']['image/png'])
+        >>> slimmed = slim_image(png, max_pixels=100 * 100)
+        >>> len(png), len(slimmed) < len(png) // 10
+        (458338, True)
+        >>> PIL.Image.open(io.BytesIO(slimmed)).size
+        (92, 108)
+        >>> slim_image(png) is None
+        True
+    """
+    import PIL.Image  # pillow
+
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r} (expected one of {list(FORMATS)})")
+    with PIL.Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+        if width * height <= max_pixels and (image.format or "").lower() == format:
+            return None
+        if width * height > max_pixels:
+            scale = math.sqrt(max_pixels / (width * height))
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            # reducing_gap : réduction entière rapide, puis filtre Lanczos
+            image = image.resize(size, PIL.Image.LANCZOS, reducing_gap=3.0)
+        if format == "jpeg" and image.mode not in ("RGB", "L"):
+            # Pas de transparence en JPEG : fond blanc
+            rgba = image.convert("RGBA")
+            image = PIL.Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        output = io.BytesIO()
+        if format == "png":
+            image.save(output, format="PNG")
+        else:
+            image.save(output, format=format.upper(), quality=quality)
+    encoded = output.getvalue()
+    return encoded if len(encoded) < len(data) else None
+
+
+def _slim_image(task):
+    return slim_image(*task)
+
+
+def _iter_tasks(ipynb, max_pixels, format, quality):
+    # Les images dans l'ordre de map_outputs, décodées une à une à la demande
+    for cell in ipynb['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        for output in cell['outputs']:
+            data = output.get('data', {})
+            for image_mime in FORMATS.values():
+                if image_mime in data:
+                    yield decode_image(data[image_mime]), max_pixels, format, quality
+
+
+def _imap_bounded(function, tasks, workers, in_flight):
+    # Les résultats dans l'ordre, sans jamais plus de in_flight tâches
+    # soumises au pool (ni décodées) à la fois
+    tasks = iter(tasks)
+    first = list(itertools.islice(tasks, 2))
+    if workers == 1 or len(first) <= 1:
+        yield from map(function, itertools.chain(first, tasks))
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for task in itertools.chain(first, tasks):
+            if len(pending) >= in_flight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(function, task))
+        while pending:
+            yield pending.popleft().result()
+
+
+def slim(ipynb, max_pixels=DEFAULT_MAX_PIXELS, format="png", quality=DEFAULT_QUALITY,
+         workers=None, counts=None):
+    r"""Downscale and re-encode the oversized images of a notebook.
+
+    The `image/png`, `image/jpeg` and `image/webp` outputs are processed
+    by `slim_image` in a pool of processes. The images are decoded as they
+    are sent to the pool, two per process at most at a time: a lazily
+    loaded notebook is never decoded as a whole. A re-encoded image gets
+    the mime type of its new format; its display metadata (width and
+    height) is kept, so it is displayed at the same size.
+
+    Args:
+        ipynb (dict): the notebook (it is not modified; its images may be
+            lazy, see `load_ipynb(lazy=True)`).
+        max_pixels (int): the maximal number of pixels of the images.
+        format (str): "png", "jpeg" or "webp".
+        quality (int): the quality of the jpeg and webp images.
+        workers (int): the number of processes (defaults to the number of
+            CPUs; with workers=1 everything runs in the current process).
+        counts (collections.Counter): if given, counts the "images" replaced.
+
+    Returns:
+        dict: the new notebook.
+
+    Usage:
+
+        >>> ipynb = slim(toolbox.load_ipynb("samples/images.ipynb"), format="jpeg", workers=1)
+        >>> data = ipynb['cells'][-1]['outputs'][0]['data']
+        >>> sorted(data), len(data['image/jpeg']) < 100000
+        (['image/jpeg', 'text/plain'], True)
+    """
+    mime = FORMATS.get(format)
+    if mime is None:
+        raise ValueError(f"unknown format {format!r} (expected one of {list(FORMATS)})")
+    counts = collections.Counter() if counts is None else counts
+    workers = workers or os.cpu_count() or 1
+
+    # Les images sont remplacées au fil des résultats, dans l'ordre des tâches
+    results = _imap_bounded(
+        _slim_image, _iter_tasks(ipynb, max_pixels, format, quality), workers, 2 * workers
+    )
+
+    def replace(output):
+        original = data = output.get('data', {})
+        metadata = output.get('metadata', {})
+        for image_mime in FORMATS.values():
+            if image_mime not in original:
+                continue
+            slimmed = next(results)
+            if slimmed is None or (image_mime != mime and mime in data):
+                continue
+            counts['images'] += 1
+            data = {key: value for key, value in data.items() if key != image_mime}
+            data[mime] = base64.b64encode(slimmed).decode('ascii')
+            if image_mime in metadata and image_mime != mime:
+                metadata = dict(metadata)
+                metadata[mime] = metadata.pop(image_mime)
+            output = dict(output, data=data, metadata=metadata)
+        return output
+
+    try:
+        return map_outputs(ipynb, replace)
+    finally:
+        results.close()
+
+
+SlimResult = collections.namedtuple(
+    "SlimResult",
+    ["path", "output", "images", "bytes_before", "bytes_after", "seconds", "error"],
+)
+SlimResult.__doc__ = r"""The outcome of the slimming of a notebook file.
+
+    Attributes:
+        path (str): the notebook file.
+        output (str): the slimmed notebook file (path itself, in place).
+        images (int): the number of images replaced.
+        bytes_before (int): the size of the notebook file.
+        bytes_after (int): the size of the slimmed file; the bytes saved are
+            bytes_before - bytes_after.
+        seconds (float): the time spent.
+        error (str): the error which stopped the slimming (None on success).
+"""
+
+
+def slim_file(path, output=None, max_pixels=DEFAULT_MAX_PIXELS, format="png",
+              quality=DEFAULT_QUALITY, workers=None, mode="nbformat-pretty"):
+    r"""Slim (see `slim`) a notebook file.
+
+    Args:
+        path (str): the notebook file.
+        output (str): the slimmed notebook file (defaults to path: the file
+            is replaced, only when an image was slimmed).
+        mode (str): the `notebook_json` mode of the slimmed file.
+
+    Returns:
+        SlimResult: the images replaced and the bytes saved.
+    """
+    output = path if output is None else output
+    start = time.perf_counter()
+    bytes_before = bytes_after = None
+    counts = collections.Counter()
+    try:
+        bytes_before = os.path.getsize(path)
+        # Les images sont décodées directement depuis le fichier (mmap)
+        ipynb = toolbox.load_ipynb(path, lazy=True)
+        ipynb = slim(ipynb, max_pixels, format, quality, workers, counts)
+        if counts['images']:
+            toolbox.save_ipynb(ipynb, output, mode)
+        elif not os.path.exists(output) or not os.path.samefile(path, output):
+            shutil.copyfile(path, output)
+        bytes_after = os.path.getsize(output)
+        error = None
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    return SlimResult(
+        str(path), str(output), counts['images'], bytes_before, bytes_after,
+        time.perf_counter() - start, error,
+    )
+
+
+def _slim_file(task):
+    path, output, max_pixels, format, quality, mode = task
+    return slim_file(path, output, max_pixels, format, quality, 1, mode)
+
+
+def output_path(path, output_dir=None, relative=None):
+    r"""Return the name of the slimmed file of a notebook.
+
+    In output_dir, the subdirectories of relative (the path of the notebook
+    relative to the directory it was found in, see
+    `notebook_batch.walk_notebooks`) are kept.
+
+    Usage:
+
+        >>> output_path("samples/images.ipynb")
+        'samples/images-slim.ipynb'
+        >>> output_path("samples/images.ipynb", "build")
+        'build/images-slim.ipynb'
+        >>> output_path("t/a/images.ipynb", "build", "a/images.ipynb")
+        'build/a/images-slim.ipynb'
+    """
+    path = Path(path)
+    if output_dir is None:
+        directory = path.parent
+    else:
+        directory = Path(output_dir) / Path(relative or path.name).parent
+    return str(directory / (path.stem + SUFFIX))
+
+
+def slim_many(paths, output_dir=None, in_place=False, max_pixels=DEFAULT_MAX_PIXELS,
+              format="png", quality=DEFAULT_QUALITY, workers=None,
+              mode="nbformat-pretty", chunksize=None):
+    r"""Slim many notebooks in a pool of processes (one notebook per process).
+
+    Args:
+        paths (list): notebook files or directories (searched recursively;
+            the slimmed files of previous runs are skipped).
+        output_dir (str): the directory of the slimmed files (defaults to the
+            directory of each notebook; the subdirectories of the notebooks
+            found in a directory are kept, see `output_path`).
+        in_place (bool): replace the notebooks instead.
+        max_pixels, format, quality: see `slim`.
+        workers (int): the number of processes (defaults to the number of CPUs).
+        mode (str): the `notebook_json` mode of the slimmed files.
+        chunksize (int): the number of notebooks sent to a process at once.
+
+    Returns:
+        list: a `SlimResult` per notebook.
+
+    Raises:
+        ValueError: when two notebooks would be slimmed to the same file.
+
+    Usage:
+
+        >>> import tempfile
+        >>> output_dir = tempfile.mkdtemp()
+        >>> (result,) = slim_many(["samples/images.ipynb"], output_dir, max_pixels=100 * 100)
+        >>> result.images, result.bytes_before - result.bytes_after > 500000
+        (1, True)
+        >>> shutil.rmtree(output_dir)
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r} (expected one of {list(FORMATS)})")
+    tasks = [
+        (path, path if in_place else output_path(path, output_dir, relative),
+         max_pixels, format, quality, mode)
+        for path, relative in notebook_batch.walk_notebooks(
+            paths, notebook_batch.GENERATED_SUFFIXES + (SUFFIX,)
+        )
+    ]
+    notebook_batch.check_outputs(tasks)
+    if output_dir is not None and not in_place:
+        for directory in {os.path.dirname(task[1]) for task in tasks}:
+            os.makedirs(directory, exist_ok=True)
+    return notebook_batch.run_many(_slim_file, tasks, workers, chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Downscale and re-encode the oversized images of notebooks."
+    )
+    parser.add_argument("paths", nargs="+", help="notebook files or directories")
+    parser.add_argument("--max-pixels", type=int, default=DEFAULT_MAX_PIXELS)
+    parser.add_argument("--format", choices=list(FORMATS), default="png")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--in-place", action="store_true", help="replace the notebooks")
+    parser.add_argument(
+        "--mode", choices=["nbformat-pretty", "compact"], default="nbformat-pretty"
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = slim_many(
+        args.paths, args.output_dir, args.in_place, args.max_pixels, args.format,
+        args.quality, args.workers, args.mode, args.chunksize,
+    )
+    elapsed = time.perf_counter() - start
+    failures = [result for result in results if result.error]
+    done = [result for result in results if not result.error]
+
+    if args.json:
+        report = {
+            "seconds": elapsed,
+            "bytes_saved": sum(r.bytes_before - r.bytes_after for r in done),
+            "results": [
+                dict(result._asdict(), bytes_saved=None if result.error
+                     else result.bytes_before - result.bytes_after)
+                for result in results
+            ],
+        }
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        for result in failures:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+        for result in done:
+            saved = result.bytes_before - result.bytes_after
+            print(
+                f"{result.path}: {result.images} images, {result.bytes_before} -> "
+                f"{result.bytes_after} bytes ({saved} saved)"
+            )
+        before = sum(result.bytes_before for result in done)
+        after = sum(result.bytes_after for result in done)
+        print(
+            f"{len(done)}/{len(results)} notebooks slimmed, {before} -> {after} bytes "
+            f"({before - after} saved) in {elapsed:.2f}s"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
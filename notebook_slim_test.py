@@ -0,0 +1,153 @@
+import base64
+import copy
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import PIL.Image
+
+import notebook_v0 as toolbox
+import notebook_slim
+
+
+def make_png(width, height, mode="RGB"):
+    rng = np.random.default_rng(0)
+    channels = {"RGB": 3, "RGBA": 4}[mode]
+    pixels = rng.integers(0, 256, (height, width, channels), dtype=np.uint8)
+    output = io.BytesIO()
+    PIL.Image.fromarray(pixels).save(output, format="PNG")
+    return output.getvalue()
+
+
+def size(data):
+    with PIL.Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+class SlimImage(unittest.TestCase):
+    def test_downscale(self):
+        slimmed = notebook_slim.slim_image(make_png(400, 200), max_pixels=20000)
+        self.assertEqual((200, 100), size(slimmed))
+
+    def test_small_enough(self):
+        self.assertIsNone(notebook_slim.slim_image(make_png(100, 100), max_pixels=20000))
+
+    def test_jpeg_transparency(self):
+        slimmed = notebook_slim.slim_image(make_png(300, 300, "RGBA"), 20000, "jpeg", 50)
+        with PIL.Image.open(io.BytesIO(slimmed)) as image:
+            self.assertEqual(("JPEG", "RGB"), (image.format, image.mode))
+
+    def test_bad_format(self):
+        with self.assertRaises(ValueError):
+            notebook_slim.slim_image(make_png(10, 10), format="bmp")
+
+
+class Slim(unittest.TestCase):
+    def setUp(self):
+        self.ipynb = toolbox.load_ipynb("samples/images.ipynb")
+        output = self.ipynb["cells"][-1]["outputs"][0]
+        output["metadata"] = {"image/png": {"width": 512}}
+        self.ipynb["cells"].append(copy.deepcopy(self.ipynb["cells"][-1]))
+        output = self.ipynb["cells"][-1]["outputs"][0]
+        output["data"]["image/png"] = base64.b64encode(make_png(50, 50)).decode("ascii")
+
+    def test_not_modified(self):
+        original = copy.deepcopy(self.ipynb)
+        notebook_slim.slim(self.ipynb, max_pixels=10000, workers=2)
+        self.assertEqual(original, self.ipynb)
+
+    def test_mime_and_metadata(self):
+        ipynb = notebook_slim.slim(self.ipynb, max_pixels=10000, format="webp", workers=2)
+        output = ipynb["cells"][-2]["outputs"][0]
+        self.assertEqual(["image/webp", "text/plain"], sorted(output["data"]))
+        self.assertEqual({"image/webp": {"width": 512}}, output["metadata"])
+        # Une seule image par sortie, convertie ou non
+        small = ipynb["cells"][-1]["outputs"][0]["data"]
+        self.assertEqual(1, len([mime for mime in small if mime.startswith("image/")]))
+
+    def test_same_as_one_worker(self):
+        self.assertEqual(
+            notebook_slim.slim(self.ipynb, max_pixels=10000, workers=1),
+            notebook_slim.slim(self.ipynb, max_pixels=10000, workers=2),
+        )
+
+    def test_bounded(self):
+        pulled = []
+
+        def tasks():
+            for task in range(-20, 0):
+                pulled.append(task)
+                yield task
+
+        results = notebook_slim._imap_bounded(abs, tasks(), workers=2, in_flight=3)
+        for consumed, result in enumerate(results, 1):
+            self.assertEqual(21 - consumed, result)
+            self.assertLessEqual(len(pulled) - consumed, 3)
+        self.assertEqual(20, consumed)
+
+
+class SlimMany(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ["a.ipynb", "b.ipynb"]:
+            shutil.copy("samples/images.ipynb", os.path.join(self.directory, name))
+        shutil.copy("samples/hello-world.ipynb", self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_output_dir(self):
+        output_dir = os.path.join(self.directory, "slim")
+        results = notebook_slim.slim_many(
+            [self.directory], output_dir, max_pixels=10000, workers=2
+        )
+        self.assertEqual([1, 1, 0], [result.images for result in results])
+        self.assertEqual(
+            ["a-slim.ipynb", "b-slim.ipynb", "hello-world-slim.ipynb"], sorted(os.listdir(output_dir))
+        )
+        self.assertGreater(results[0].bytes_before - results[0].bytes_after, 500000)
+        self.assertEqual(results[2].bytes_before, results[2].bytes_after)
+        slimmed = toolbox.load_ipynb(results[0].output)
+        self.assertEqual((92, 108), toolbox.get_images(slimmed)[0].shape[1::-1])
+
+    def test_same_names(self):
+        os.makedirs(os.path.join(self.directory, "sub"))
+        shutil.copy("samples/hello-world.ipynb", os.path.join(self.directory, "sub", "a.ipynb"))
+        output_dir = os.path.join(self.directory, "slim")
+        results = notebook_slim.slim_many([self.directory], output_dir, max_pixels=10000, workers=2)
+        self.assertEqual([1, 1, 0, 0], [result.images for result in results])
+        self.assertEqual(
+            toolbox.load_ipynb("samples/hello-world.ipynb"),
+            toolbox.load_ipynb(os.path.join(output_dir, "sub", "a-slim.ipynb")),
+        )
+
+    def test_in_place(self):
+        path = os.path.join(self.directory, "hello-world.ipynb")
+        os.utime(path, ns=(0, 0))
+        results = notebook_slim.slim_many([self.directory], in_place=True, max_pixels=10000)
+        self.assertEqual([None] * 3, [result.error for result in results])
+        self.assertEqual(0, os.stat(path).st_mtime_ns)
+        self.assertEqual(["a.ipynb", "b.ipynb", "hello-world.ipynb"], sorted(os.listdir(self.directory)))
+        self.assertLess(os.path.getsize(os.path.join(self.directory, "a.ipynb")), 100000)
+
+    def test_run_twice(self):
+        for _ in range(2):
+            results = notebook_slim.slim_many([self.directory], max_pixels=10000, workers=2)
+            self.assertEqual(3, len(results))
+        self.assertEqual(
+            ["a-slim.ipynb", "a.ipynb", "b-slim.ipynb", "b.ipynb",
+             "hello-world-slim.ipynb", "hello-world.ipynb"],
+            sorted(os.listdir(self.directory)),
+        )
+
+    def test_main(self):
+        self.assertEqual(
+            0, notebook_slim.main([self.directory, "--in-place", "--max-pixels", "10000"])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,803 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+a streaming reader for jupyter notebook .ipynb files
+
+The notebook cells are read one at a time from the file; the large output
+payloads (base64 images, long texts) are left in the file as lazy byte-range
+references that are only decoded when accessed.
+"""
+
+# Python Standard Library
+import base64
+import binascii
+import contextlib
+import io
+import json
+import mmap
+import os
+import re
+import secrets
+import shutil
+import types
+
+# Local Libraries
+import notebook_json
+
+
+DEFAULT_THRESHOLD = 64 * 1024  # bytes
+CHUNK_SIZE = 64 * 1024  # bytes
+
+_WHITESPACE = b" \t\r\n"
+# The short strings and the other bytes are consumed by the regex (C code) up
+# to the next bracket, or the opening quote of a long string (skipped with
+# bytes.find) or of a string not terminated in the buffer. The atomic groups
+# are written (?=(...))\1, not with the possessive quantifiers of Python 3.11:
+# the regex never backtracks into a run of bytes or a string.
+_CONTAINER_STOP = re.compile(
+    rb'(?:(?=([^"\[\]{}]+))\1|"(?=((?:[^"\\]{1,256}|\\.){0,16}))\2")*([\[\]{}"])',
+    re.DOTALL,
+)
+_SCALAR_STOP = re.compile(rb"[,\]}\s]")
+# The placeholders of the lazy values in the fragments (see `dumps_fragment`)
+_PLACEHOLDER = f"@@lazy-{secrets.token_hex(16)}-"
+_PLACEHOLDERS = re.compile(b'"' + _PLACEHOLDER.encode("ascii") + rb'(\d+)@@"')
+
+
+class JSONScanner:
+    r"""An incremental JSON tokenizer reading a binary file by chunks.
+
+    Args:
+        file (file): a binary file object, positioned at `offset`.
+        offset (int): the absolute position of the file object in the file.
+        chunk_size (int): the number of bytes read at a time.
+
+    Usage:
+
+        >>> import io
+        >>> scanner = JSONScanner(io.BytesIO(b'{"a": [1, "two"], "b": null}'))
+        >>> for key in scanner.iter_object():
+        ...     print(key, scanner.scan())
+        a (6, 16, b'[1, "two"]')
+        b (23, 27, b'null')
+    """
+
+    def __init__(self, file, offset=0, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = b""
+        self.pos = 0
+        self.offset = offset  # position of buffer[0] in the file
+        self._parts = None
+        self._size = 0
+        self._limit = None
+        self._mark = None
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        r"""Build a scanner over a whole bytes-like buffer (e.g. an mmap),
+        without copying it by chunks.
+        """
+        scanner = cls(io.BytesIO())
+        scanner.buffer = buffer
+        return scanner
+
+    def tell(self):
+        r"""Return the absolute position of the scanner in the file."""
+        return self.offset + self.pos
+
+    def _fill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        # On garde les octets du token en cours avant de vider le buffer
+        if self._mark is not None:
+            self._collect(self.buffer[self._mark : self.pos])
+            self._mark = 0
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _collect(self, data):
+        if self._parts is None:
+            return
+        self._size += len(data)
+        if self._limit is not None and self._size > self._limit:
+            self._parts = None
+        else:
+            self._parts.append(data)
+
+    def _search(self, pattern):
+        while True:
+            match = pattern.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos : self.pos + 1]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return b""
+
+    def _skip_string(self):
+        # bytes.find (memchr) is much faster than a regex on long strings
+        while True:
+            buffer = self.buffer
+            quote = buffer.find(b'"', self.pos)
+            end = len(buffer) if quote == -1 else quote
+            backslash = buffer.find(b"\\", self.pos, end)
+            if backslash != -1:
+                self.pos = backslash + 1
+                # the escaped character may be in the next chunk
+                if self.pos >= len(buffer) and not self._fill():
+                    raise ValueError("unterminated JSON string")
+                self.pos += 1
+            elif quote != -1:
+                self.pos = quote + 1
+                return
+            else:
+                self.pos = len(buffer)
+                if not self._fill():
+                    raise ValueError("unterminated JSON string")
+
+    def _skip_container(self):
+        depth = 0
+        while True:
+            match = _CONTAINER_STOP.match(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("unterminated JSON container")
+                continue
+            self.pos = match.end()
+            char = match.group(3)
+            if char == b'"':
+                self._skip_string()
+            elif char in b"[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def peek(self):
+        r"""Skip the whitespace and return the next byte (b'' at the end)."""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos : pos + 1]
+            if not self._fill():
+                return b""
+
+    def next(self):
+        r"""Consume and return the next structural byte."""
+        char = self.peek()
+        if not char:
+            raise ValueError("unexpected end of JSON document")
+        self.pos += 1
+        return char
+
+    def expect(self, char):
+        r"""Consume the next structural byte, which must be `char`."""
+        found = self.next()
+        if found != char:
+            raise ValueError(
+                f"expected {char!r} at byte {self.tell() - 1}, found {found!r}"
+            )
+
+    def scan(self, limit=None):
+        r"""Scan the next JSON value without decoding it.
+
+        Args:
+            limit (int): the raw bytes of the value are only kept
+                when its size does not exceed this limit.
+
+        Returns:
+            tuple: the (start, stop) byte range of the value in the file
+                and its raw bytes (None beyond `limit`).
+        """
+        char = self.peek()
+        if not char:
+            raise ValueError("unexpected end of JSON document")
+        start = self.tell()
+        self._parts, self._size, self._limit, self._mark = [], 0, limit, self.pos
+        if char == b'"':
+            self.pos += 1
+            self._skip_string()
+        elif char in b"[{":
+            self._skip_container()
+        else:
+            self._search(_SCALAR_STOP)
+        self._collect(self.buffer[self._mark : self.pos])
+        raw = None if self._parts is None else b"".join(self._parts)
+        self._parts = self._mark = None
+        return start, self.tell(), raw
+
+    def skip(self):
+        r"""Skip the next JSON value; return its (start, stop) byte range."""
+        start, stop, _ = self.scan(limit=0)
+        return start, stop
+
+    def value(self):
+        r"""Decode the next JSON value."""
+        return json.loads(self.scan()[2])
+
+    def iter_object(self):
+        r"""Iterate the keys of the next JSON object.
+
+        The value of each key must be consumed (`scan`, `skip`, `value`, ...)
+        before the next key is requested.
+        """
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(b":")
+            yield key
+            char = self.next()
+            if char == b"}":
+                return
+            if char != b",":
+                raise ValueError(f"expected ',' or '}}' at byte {self.tell() - 1}")
+
+    def iter_array(self):
+        r"""Iterate the items of the next JSON array.
+
+        Each item must be consumed before the next one is requested.
+        """
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.next()
+            if char == b"]":
+                return
+            if char != b",":
+                raise ValueError(f"expected ',' or ']' at byte {self.tell() - 1}")
+
+
+class LazyValue:
+    r"""A JSON value left undecoded in its .ipynb file.
+
+    Args:
+        filename (str): the name of the notebook file.
+        start (int): the position of the first byte of the value.
+        stop (int): the position after the last byte of the value.
+
+    Usage:
+
+        >>> value = LazyValue("samples/minimal.ipynb", 12, 14)
+        >>> value.raw()
+        b'[]'
+        >>> value.load()
+        []
+    """
+
+    __slots__ = ("filename", "start", "stop")
+
+    def __init__(self, filename, start, stop):
+        self.filename = filename
+        self.start = start
+        self.stop = stop
+
+    def __repr__(self):
+        return f"LazyValue({self.filename!r}, {self.start}, {self.stop})"
+
+    @property
+    def nbytes(self):
+        r"""The size of the encoded value, in bytes."""
+        return self.stop - self.start
+
+    def iter_raw(self, chunk_size=CHUNK_SIZE):
+        r"""Iterate the encoded value by chunks of bytes."""
+        with open(self.filename, "rb") as file:
+            file.seek(self.start)
+            remaining = self.stop - self.start
+            while remaining > 0:
+                chunk = file.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError(f"{self.filename} was truncated")
+                remaining -= len(chunk)
+                yield chunk
+
+    def raw(self):
+        r"""Return the encoded value (bytes)."""
+        return b"".join(self.iter_raw())
+
+    def load(self):
+        r"""Decode the value."""
+        return json.loads(self.raw())
+
+    def to_bytes(self):
+        r"""Decode the base64 content of the (string) value (bytes)."""
+        return base64.b64decode(self.load())
+
+    def to_array(self):
+        r"""Decode the base64 content as an image (NumPy array)."""
+        import numpy as np
+        import PIL.Image  # pillow
+
+        with PIL.Image.open(io.BytesIO(self.to_bytes())) as image:
+            return np.asarray(image)
+
+
+class OutputBlob(LazyValue):
+    r"""A string output value (e.g. a base64 PNG image) left undecoded in
+    a memory-mapped .ipynb file.
+
+    Args:
+        filename (str): the name of the notebook file.
+        buffer (mmap.mmap): the memory-mapped notebook file.
+        start (int): the position of the opening quote of the string.
+        stop (int): the position after the closing quote of the string.
+
+    Usage:
+
+        >>> ipynb = map_ipynb("samples/images.ipynb")
+        >>> blob = ipynb["cells"][-1]["outputs"][0]["data"]["image/png"]
+        >>> blob # doctest: +ELLIPSIS
+        OutputBlob('samples/images.ipynb', ..., ...)
+        >>> bytes(blob.view[:16])
+        b'iVBORw0KGgoAAAAN'
+        >>> blob.to_bytes()[:8]
+        b'\x89PNG\r\n\x1a\n'
+        >>> blob.to_array().shape
+        (600, 512, 3)
+    """
+
+    __slots__ = ("buffer",)
+
+    def __init__(self, filename, buffer, start, stop):
+        super().__init__(filename, start, stop)
+        self.buffer = buffer
+
+    def __repr__(self):
+        return f"OutputBlob({self.filename!r}, {self.start}, {self.stop})"
+
+    @property
+    def view(self):
+        r"""The encoded string content, without its quotes (memoryview)."""
+        return memoryview(self.buffer)[self.start + 1 : self.stop - 1]
+
+    def iter_raw(self, chunk_size=CHUNK_SIZE):
+        r"""Iterate the encoded value by chunks of bytes."""
+        for start in range(self.start, self.stop, chunk_size):
+            yield self.buffer[start : min(start + chunk_size, self.stop)]
+
+    def to_bytes(self):
+        r"""Decode the base64 content of the string (bytes)."""
+        # Les échappements JSON ("\n", ...) imposent de décoder la chaîne d'abord
+        if self.buffer.find(b"\\", self.start, self.stop) != -1:
+            return base64.b64decode(self.load())
+        return binascii.a2b_base64(self.view)
+
+
+def _read_lazy(scanner, make_lazy, threshold):
+    char = scanner.peek()
+    if char == b"{":
+        return {
+            key: _read_lazy(scanner, make_lazy, threshold)
+            for key in scanner.iter_object()
+        }
+    if char == b"[":
+        return [_read_lazy(scanner, make_lazy, threshold) for _ in scanner.iter_array()]
+    start, stop, raw = scanner.scan(limit=threshold)
+    if raw is None:
+        return make_lazy(start, stop)
+    return json.loads(raw)
+
+
+def _read_cell(scanner, make_lazy, threshold, rescan=None):
+    if rescan is not None:
+        # Cellule courte : un seul appel au décodeur JSON (rapide)
+        start, _, raw = scanner.scan(limit=threshold)
+        if raw is not None:
+            return notebook_json.loads(raw)
+        scanner = rescan(start)
+    cell = {}
+    for key in scanner.iter_object():
+        if key == "outputs":
+            cell[key] = _read_lazy(scanner, make_lazy, threshold)
+        else:
+            cell[key] = scanner.value()
+    return cell
+
+
+class CellStream:
+    r"""The cells of a notebook file, read one at a time on iteration.
+
+    Args:
+        filename (str): the name of the notebook file.
+        offset (int): the position of the cells array in the file.
+        threshold (int): the size (in bytes) above which an output value
+            is left in the file as a `LazyValue`.
+        transforms (tuple): functions applied to each cell (dict) on the fly;
+            a cell is dropped when a function returns None.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> cells = ipynb["cells"]
+        >>> [cell["id"] for cell in cells]
+        ['a9541506', 'b777420a', 'a23ab5ac']
+        >>> code = cells.map(lambda cell: cell if cell["cell_type"] == "code" else None)
+        >>> [cell["id"] for cell in code]
+        ['b777420a']
+    """
+
+    def __init__(self, filename, offset, threshold=DEFAULT_THRESHOLD, transforms=()):
+        self.filename = filename
+        self.offset = offset
+        self.threshold = threshold
+        self.transforms = tuple(transforms)
+
+    def __repr__(self):
+        return f"CellStream({self.filename!r}, {self.offset})"
+
+    def __iter__(self):
+        with open(self.filename, "rb") as file, open(self.filename, "rb") as large:
+            file.seek(self.offset)
+            scanner = JSONScanner(file, offset=self.offset)
+            make_lazy = lambda start, stop: LazyValue(self.filename, start, stop)
+
+            def rescan(start):  # the cells larger than threshold are read again
+                large.seek(start)
+                return JSONScanner(large, offset=start)
+
+            for _ in scanner.iter_array():
+                cell = _read_cell(scanner, make_lazy, self.threshold, rescan)
+                for transform in self.transforms:
+                    cell = transform(cell)
+                    if cell is None:
+                        break
+                else:
+                    yield cell
+
+    def map(self, function):
+        r"""Return a new stream of cells, transformed on the fly by function."""
+        return CellStream(
+            self.filename, self.offset, self.threshold, self.transforms + (function,)
+        )
+
+
+def load_ipynb(filename, threshold=DEFAULT_THRESHOLD):
+    r"""
+    Load a jupyter notebook .ipynb file (JSON) as a Python dict whose cells
+    are streamed from the file.
+
+    Only the top-level fields are decoded; the "cells" entry is a `CellStream`.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/minimal.ipynb")
+        >>> ipynb
+        {'cells': CellStream('samples/minimal.ipynb', 12), 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+        >>> list(ipynb["cells"])
+        []
+
+        >>> ipynb = load_ipynb("samples/images.ipynb", threshold=1024)
+        >>> cell = list(ipynb["cells"])[-1]
+        >>> png = cell["outputs"][0]["data"]["image/png"]
+        >>> png # doctest: +ELLIPSIS
+        LazyValue('samples/images.ipynb', ..., ...)
+        >>> png.load()[:16]
+        'iVBORw0KGgoAAAAN'
+    """
+    ipynb = {}
+    with open(filename, "rb") as file:
+        scanner = JSONScanner(file)
+        for key in scanner.iter_object():
+            if key == "cells":
+                start, _ = scanner.skip()
+                ipynb[key] = CellStream(filename, start, threshold)
+            else:
+                ipynb[key] = scanner.value()
+    return ipynb
+
+
+def map_ipynb(filename, threshold=DEFAULT_THRESHOLD):
+    r"""
+    Load a jupyter notebook .ipynb file (JSON) as a Python dict, through a
+    memory map of the file.
+
+    The output strings larger than threshold (in bytes) are not decoded: they
+    are kept as `OutputBlob`s, which reference the memory-mapped file.
+
+    Usage:
+
+        >>> ipynb = map_ipynb("samples/hello-world.ipynb")
+        >>> with open("samples/hello-world.ipynb", encoding="utf-8") as file:
+        ...     ipynb == json.load(file)
+        True
+        >>> ipynb = map_ipynb("samples/images.ipynb")
+        >>> len(ipynb["cells"])
+        4
+    """
+    with open(filename, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    scanner = JSONScanner.from_buffer(buffer)
+    make_lazy = lambda start, stop: OutputBlob(filename, buffer, start, stop)
+
+    def rescan(start):
+        large = JSONScanner.from_buffer(buffer)
+        large.pos = start
+        return large
+
+    ipynb = {}
+    for key in scanner.iter_object():
+        if key == "cells":
+            ipynb[key] = [
+                _read_cell(scanner, make_lazy, threshold, rescan)
+                for _ in scanner.iter_array()
+            ]
+        else:
+            ipynb[key] = scanner.value()
+    return ipynb
+
+
+class RawJSON:
+    r"""A JSON value already encoded, written as is (see `dumps_fragment`).
+
+    Args:
+        chunks: the encoded value, as bytes and `LazyValue`s (copied from
+            their file when written).
+    """
+    __slots__ = ("chunks",)
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+
+    def __repr__(self):
+        return f"RawJSON({bytes(self)!r})"
+
+    def __bytes__(self):
+        return b"".join(
+            chunk.raw() if isinstance(chunk, LazyValue) else chunk for chunk in self.chunks
+        )
+
+
+def _iter_json(value, mode="compact", level=0):
+    # Mêmes octets que notebook_json.dumps(value, mode) ; les LazyValue
+    # sont recopiées telles quelles depuis le fichier source.
+    if isinstance(value, RawJSON):
+        for chunk in value.chunks:
+            if isinstance(chunk, LazyValue):
+                yield from chunk.iter_raw()
+            else:
+                yield chunk
+    elif isinstance(value, LazyValue):
+        yield from value.iter_raw()
+    elif isinstance(value, dict):
+        if not value:
+            yield b"{}"
+            return
+        items = value.items()
+        if mode == "compact":
+            opening, separator, colon, closing = b"{", b",", b":", b"}"
+        else:
+            items = sorted(items)
+            indent = b"\n" + b" " * (level + 1)
+            opening, separator, colon = b"{" + indent, b"," + indent, b": "
+            closing = b"\n" + b" " * level + b"}"
+        yield opening
+        for index, (key, item) in enumerate(items):
+            if index:
+                yield separator
+            yield _dumps_scalar(key, mode) + colon
+            yield from _iter_json(item, mode, level + 1)
+        yield closing
+    elif isinstance(value, (list, tuple, CellStream, types.GeneratorType)):
+        if mode == "compact":
+            opening, separator, closing = b"[", b",", b"]"
+        else:
+            indent = b"\n" + b" " * (level + 1)
+            opening, separator = b"[" + indent, b"," + indent
+            closing = b"\n" + b" " * level + b"]"
+        empty = True
+        for item in value:
+            yield separator if not empty else opening
+            empty = False
+            yield from _iter_json(item, mode, level + 1)
+        yield b"[]" if empty else closing
+    else:
+        yield _dumps_scalar(value, mode)
+
+
+def _dumps_scalar(value, mode):
+    if mode == "compact":
+        return notebook_json.dumps(value)
+    # nbformat-pretty: the floats must be written by the standard library
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_fragment(value, mode="compact", level=0):
+    r"""Encode a value found at the given depth of a notebook (RawJSON).
+
+    The bytes are the same as in `notebook_json.dumps(notebook, mode)`. The
+    value is encoded at once by the JSON backend; its `LazyValue`s are
+    encoded as placeholders, replaced by the values copied from their file
+    when the fragment is written.
+
+    Usage:
+
+        >>> dumps_fragment({"b": [1], "a": None}, "nbformat-pretty", level=2)
+        RawJSON(b'{\n   "a": null,\n   "b": [\n    1\n   ]\n  }')
+        >>> dumps_fragment({"a": LazyValue("samples/minimal.ipynb", 12, 14)})
+        RawJSON(b'{"a":[]}')
+    """
+    lazy = []
+
+    def default(item):
+        if isinstance(item, (LazyValue, RawJSON)):
+            lazy.append(item)
+            return f"{_PLACEHOLDER}{len(lazy) - 1}@@"
+        raise TypeError(f"Object of type {type(item).__name__} is not JSON serializable")
+
+    if mode == "compact":
+        data = notebook_json.dumps(value, default=default)
+    else:
+        # Les chaînes JSON ne contiennent pas de retour à la ligne : on indente
+        text = json.dumps(value, indent=1, sort_keys=True, ensure_ascii=False, default=default)
+        data = text.replace("\n", "\n" + " " * level).encode("utf-8")
+    if not lazy:
+        return RawJSON(data)
+    # [texte, indice, texte, indice, ..., texte]
+    parts = _PLACEHOLDERS.split(data)
+    chunks = [parts[0]]
+    for index, text in zip(parts[1::2], parts[2::2]):
+        item = lazy[int(index)]
+        chunks.extend(item.chunks if isinstance(item, RawJSON) else (item,))
+        chunks.append(text)
+    return RawJSON(*chunks)
+
+
+def write_json(value, file, mode="compact"):
+    r"""Write a notebook (dict) to a binary file, as it is encoded.
+
+    The lists of the notebook may be generators (of cells, for instance),
+    and its values `RawJSON` fragments or `LazyValue`s.
+    """
+    for chunk in _iter_json(value, mode):
+        file.write(chunk)
+    if mode == "nbformat-pretty":
+        file.write(b"\n")
+
+
+@contextlib.contextmanager
+def atomic_open(filename):
+    r"""Open a temporary binary file which replaces filename once written.
+
+    The new file gets the permissions of the file it replaces (or, for a
+    new file, the default ones); on error, filename is left untouched.
+
+    Usage:
+
+        >>> with atomic_open("samples/minimal-save-load.ipynb") as file:
+        ...     _ = file.write(b'{"cells":[],"metadata":{},"nbformat":4,"nbformat_minor":5}')
+        >>> load_ipynb("samples/minimal-save-load.ipynb")
+        {'cells': CellStream('samples/minimal-save-load.ipynb', 9), 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+    """
+    directory, name = os.path.split(os.path.abspath(filename))
+    while True:
+        temporary = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            # 0o666 : les permissions par défaut (umask), contrairement à mkstemp
+            descriptor = os.open(
+                temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+                0o666,
+            )
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            yield file
+        if os.path.exists(filename):
+            shutil.copymode(filename, temporary)
+        os.replace(temporary, filename)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def save_ipynb(ipynb, filename, mode="compact"):
+    r"""
+    Save a jupyter notebook (Python dict) as a .ipynb file (JSON), one cell
+    at a time.
+
+    The notebook may hold a `CellStream` and `LazyValue`s, which are copied
+    from their source file without being decoded. The file is written in
+    the given `notebook_json` mode ("compact" or "nbformat-pretty") and
+    replaced atomically: it may be the source file of the notebook.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/images.ipynb", threshold=1024)
+        >>> save_ipynb(ipynb, "samples/images-save-load.ipynb")
+        >>> import json
+        >>> with open("samples/images.ipynb", encoding="utf-8") as file:
+        ...     original = json.load(file)
+        >>> with open("samples/images-save-load.ipynb", encoding="utf-8") as file:
+        ...     original == json.load(file)
+        True
+    """
+    # Les cellules sont encodées une à une ; le fichier source d'un notebook
+    # chargé en streaming peut être remplacé (voir atomic_open)
+    cells = (dumps_fragment(cell, mode, level=2) for cell in ipynb["cells"])
+    with atomic_open(filename) as file:
+        write_json(dict(ipynb, cells=cells), file, mode)
+
+
+def _cleared_ranges(scanner):
+    # (start, stop, replacement) byte ranges of the outputs and execution
+    # counts of the code cells; the missing keys are inserted before the
+    # closing brace of the cell (start == stop).
+    for key in scanner.iter_object():
+        if key != "cells":
+            scanner.skip()
+            continue
+        for _ in scanner.iter_array():
+            cell_type, ranges = None, []
+            missing = {"execution_count": b"null", "outputs": b"[]"}
+            for cell_key in scanner.iter_object():
+                if cell_key == "cell_type":
+                    cell_type = scanner.value()
+                elif cell_key in missing:
+                    start, stop = scanner.skip()
+                    ranges.append((start, stop, missing.pop(cell_key)))
+                else:
+                    scanner.skip()
+            if cell_type == "code":
+                yield from ranges
+                if missing:
+                    end = scanner.tell() - 1
+                    yield end, end, b"".join(
+                        b',"' + cell_key.encode("ascii") + b'":' + value
+                        for cell_key, value in missing.items()
+                    )
+
+
+def _copy(source, output, size, chunk_size=CHUNK_SIZE):
+    while size > 0:
+        chunk = source.read(min(chunk_size, size))
+        if not chunk:
+            raise ValueError(f"{source.name} was truncated")
+        output.write(chunk)
+        size -= len(chunk)
+
+
+def clear_outputs_file(src, dst, chunk_size=CHUNK_SIZE):
+    r"""
+    Copy the notebook file src to dst without the outputs and the execution
+    counts of its code cells, in constant memory.
+
+    The rest of the file is copied byte for byte and the outputs are skipped
+    without being decoded. The destination is replaced atomically, so src
+    and dst may be the same file.
+
+    Usage:
+
+        >>> clear_outputs_file("samples/images.ipynb", "samples/images-cleared.ipynb")
+        >>> with open("samples/images-cleared.ipynb", encoding="utf-8") as file:
+        ...     [(cell["execution_count"], cell["outputs"]) for cell in json.load(file)["cells"]]
+        [(None, []), (None, []), (None, []), (None, [])]
+    """
+    # src est refermé avant que dst ne soit remplacé
+    with atomic_open(dst) as output, open(src, "rb") as scanned, open(src, "rb") as source:
+        scanner = JSONScanner(scanned, chunk_size=chunk_size)
+        position = 0
+        for start, stop, replacement in _cleared_ranges(scanner):
+            _copy(source, output, start - position, chunk_size)
+            output.write(replacement)
+            source.seek(stop)
+            position = stop
+        shutil.copyfileobj(source, output, chunk_size)
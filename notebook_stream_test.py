@@ -0,0 +1,277 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import notebook_v0 as toolbox
+import notebook_json
+import notebook_stream
+import notebook_v2
+from notebook_v1 import Notebook, Outliner
+
+SAMPLES = [
+    "samples/errors.ipynb",
+    "samples/hello-world.ipynb",
+    "samples/images.ipynb",
+    "samples/metadata.ipynb",
+    "samples/minimal.ipynb",
+    "samples/streams.ipynb",
+]
+
+
+def materialize(value):
+    if isinstance(value, notebook_stream.LazyValue):
+        return value.load()
+    if isinstance(value, dict):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, (list, notebook_stream.CellStream)):
+        return [materialize(item) for item in value]
+    return value
+
+
+class Scanner(unittest.TestCase):
+    def test_small_chunks(self):
+        document = b'{"a": "x\\"y", "b": [1, {"c": [true, null]}], "d": -1.5e3}'
+        for chunk_size in (1, 2, 3, 7):
+            scanner = notebook_stream.JSONScanner(
+                io.BytesIO(document), chunk_size=chunk_size
+            )
+            values = {key: scanner.value() for key in scanner.iter_object()}
+            self.assertEqual(
+                {"a": 'x"y', "b": [1, {"c": [True, None]}], "d": -1500.0}, values
+            )
+
+    def test_escapes(self):
+        document = b'["\\\\", "a\\\\\\"b\\\\", "\\u00e9\\n"]'
+        for chunk_size in (1, 2, 3, 7):
+            scanner = notebook_stream.JSONScanner(
+                io.BytesIO(document), chunk_size=chunk_size
+            )
+            values = [scanner.value() for _ in scanner.iter_array()]
+            self.assertEqual(["\\", 'a\\"b\\', "é\n"], values)
+
+    def test_long_strings(self):
+        strings = ["x" * 300, "a\\" * 200 + "]", "b\n" * 40 + "{", "c" * 5000]
+        document = json.dumps({"outputs": [{"text": strings}], "end": 1}).encode()
+        for chunk_size in (3, 64, 4096):
+            scanner = notebook_stream.JSONScanner(
+                io.BytesIO(document), chunk_size=chunk_size
+            )
+            values = {key: json.loads(scanner.scan()[2]) for key in scanner.iter_object()}
+            self.assertEqual({"outputs": [{"text": strings}], "end": 1}, values)
+
+    def test_limit(self):
+        scanner = notebook_stream.JSONScanner(io.BytesIO(b'["abcdef", "ab"]'), chunk_size=2)
+        items = [scanner.scan(limit=4) for _ in scanner.iter_array()]
+        self.assertEqual([(1, 9, None), (11, 15, b'"ab"')], items)
+
+
+class StreamLoad(unittest.TestCase):
+    def test_same_content(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename, stream=True, threshold=128)
+            self.assertEqual(toolbox.load_ipynb(filename), materialize(ipynb))
+
+    def test_lazy_outputs(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb", stream=True)
+        cell = list(ipynb["cells"])[-1]
+        png = cell["outputs"][0]["data"]["image/png"]
+        self.assertIsInstance(png, notebook_stream.LazyValue)
+        self.assertGreater(png.nbytes, notebook_stream.DEFAULT_THRESHOLD)
+        # les sources ne sont jamais paresseuses
+        self.assertEqual(["plt.imshow(image_array)\n", "plt.show()"], cell["source"])
+
+    def test_converters(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename)
+            streamed = toolbox.load_ipynb(filename, stream=True)
+            self.assertEqual(toolbox.to_percent(ipynb), toolbox.to_percent(streamed))
+            self.assertEqual(
+                toolbox.to_starboard(ipynb), toolbox.to_starboard(streamed)
+            )
+
+    def test_outline(self):
+        for filename in SAMPLES:
+            self.assertEqual(
+                Outliner(Notebook.from_file(filename)).outline(),
+                Outliner(Notebook.from_file(filename, stream=True)).outline(),
+            )
+
+    def test_clear_outputs_and_save(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.clear_outputs(toolbox.load_ipynb(filename))
+            streamed = toolbox.clear_outputs(toolbox.load_ipynb(filename, stream=True))
+            toolbox.save_ipynb(ipynb, "samples/stream-expected-save-load.ipynb")
+            toolbox.save_ipynb(streamed, "samples/stream-save-load.ipynb")
+            try:
+                with open("samples/stream-expected-save-load.ipynb", "rb") as file:
+                    expected = file.read()
+                with open("samples/stream-save-load.ipynb", "rb") as file:
+                    self.assertEqual(expected, file.read())
+            finally:
+                os.remove("samples/stream-expected-save-load.ipynb")
+                os.remove("samples/stream-save-load.ipynb")
+
+
+class Blobs(unittest.TestCase):
+    def test_same_content(self):
+        for filename in SAMPLES:
+            ipynb = toolbox.load_ipynb(filename, lazy=True, threshold=128)
+            self.assertEqual(toolbox.load_ipynb(filename), materialize(ipynb))
+
+    def test_blob(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb", lazy=True)
+        blob = ipynb["cells"][-1]["outputs"][0]["data"]["image/png"]
+        self.assertIsInstance(blob, notebook_stream.OutputBlob)
+        self.assertIsInstance(blob.view, memoryview)
+        png = toolbox.load_ipynb("samples/images.ipynb")["cells"][-1]["outputs"][0]["data"]["image/png"]
+        self.assertEqual(png.encode("ascii"), blob.view.tobytes())
+        self.assertEqual(png, blob.load())
+
+    def test_get_images(self):
+        images = toolbox.get_images(toolbox.load_ipynb("samples/images.ipynb"))
+        lazy_images = toolbox.get_images(toolbox.load_ipynb("samples/images.ipynb", lazy=True))
+        self.assertEqual(len(images), len(lazy_images))
+        for image, lazy_image in zip(images, lazy_images):
+            np.testing.assert_array_equal(image, lazy_image)
+
+    def test_notebook_classes(self):
+        nb = Notebook.from_file("samples/images.ipynb", lazy=True)
+        self.assertIsInstance(
+            nb.cells[-1].outputs[0]["data"]["image/png"], notebook_stream.OutputBlob
+        )
+        nb = notebook_v2.NotebookLoader("samples/images.ipynb", lazy=True).load()
+        self.assertIsInstance(
+            nb.cells[-1].outputs[0]["data"]["image/png"], notebook_stream.OutputBlob
+        )
+
+
+class Fragments(unittest.TestCase):
+    def test_same_as_dumps(self):
+        for filename in SAMPLES:
+            for mode in ("compact", "nbformat-pretty"):
+                ipynb = toolbox.load_ipynb(filename, lazy=True, threshold=16)
+                cells = (
+                    notebook_stream.dumps_fragment(cell, mode, level=2)
+                    for cell in ipynb["cells"]
+                )
+                file = io.BytesIO()
+                notebook_stream.write_json(dict(ipynb, cells=cells), file, mode)
+                self.assertEqual(
+                    notebook_json.dumps(toolbox.load_ipynb(filename), mode), file.getvalue()
+                )
+
+    def test_lazy_chunks(self):
+        ipynb = toolbox.load_ipynb("samples/images.ipynb", lazy=True)
+        fragment = notebook_stream.dumps_fragment(ipynb["cells"][-1])
+        self.assertTrue(
+            any(isinstance(chunk, notebook_stream.OutputBlob) for chunk in fragment.chunks)
+        )
+        self.assertEqual(
+            toolbox.load_ipynb("samples/images.ipynb")["cells"][-1], json.loads(bytes(fragment))
+        )
+
+    def test_not_serializable(self):
+        with self.assertRaises(TypeError):
+            notebook_stream.dumps_fragment({"a": object()})
+
+
+class AtomicOpen(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "notebook.ipynb")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replace(self):
+        with open(self.filename, "wb") as file:
+            file.write(b"old")
+        os.chmod(self.filename, 0o600)
+        with notebook_stream.atomic_open(self.filename) as file:
+            file.write(b"new")
+        with open(self.filename, "rb") as file:
+            self.assertEqual(b"new", file.read())
+        self.assertEqual(0o600, os.stat(self.filename).st_mode & 0o777)
+        self.assertEqual(["notebook.ipynb"], os.listdir(self.directory))
+
+    def test_error(self):
+        with open(self.filename, "wb") as file:
+            file.write(b"old")
+        with self.assertRaises(RuntimeError):
+            with notebook_stream.atomic_open(self.filename) as file:
+                file.write(b"new")
+                raise RuntimeError
+        with open(self.filename, "rb") as file:
+            self.assertEqual(b"old", file.read())
+        self.assertEqual(["notebook.ipynb"], os.listdir(self.directory))
+
+
+class ClearOutputsFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "cleared.ipynb")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_same_as_save_ipynb(self):
+        for filename in SAMPLES:
+            for chunk_size in (5, notebook_stream.CHUNK_SIZE):
+                notebook_stream.clear_outputs_file(filename, self.output, chunk_size)
+                ipynb = toolbox.clear_outputs(toolbox.load_ipynb(filename))
+                self.assertEqual(ipynb, toolbox.load_ipynb(self.output))
+                with open(self.output, "rb") as file:
+                    cleared = file.read()
+                reference = os.path.join(self.directory, "reference.ipynb")
+                toolbox.save_ipynb(ipynb, reference, mode="nbformat-pretty")
+                with open(reference, "rb") as file:
+                    self.assertEqual(file.read(), cleared)
+
+    def test_in_place(self):
+        shutil.copy("samples/images.ipynb", self.output)
+        toolbox.clear_outputs_file(self.output, self.output)
+        self.assertEqual(
+            toolbox.clear_outputs(toolbox.load_ipynb("samples/images.ipynb")),
+            toolbox.load_ipynb(self.output),
+        )
+        self.assertEqual(["cleared.ipynb"], os.listdir(self.directory))
+
+    def test_permissions(self):
+        source = os.path.join(self.directory, "images.ipynb")
+        shutil.copy("samples/images.ipynb", source)
+        shutil.copy("samples/images.ipynb", self.output)
+        os.chmod(source, 0o600)
+        os.chmod(self.output, 0o640)
+        toolbox.clear_outputs_file(source, self.output)
+        self.assertEqual(0o640, os.stat(self.output).st_mode & 0o777)  # celles de dst
+        self.assertEqual(["cleared.ipynb", "images.ipynb"], sorted(os.listdir(self.directory)))
+
+    def test_missing_keys(self):
+        ipynb = {
+            "cells": [
+                {"cell_type": "code", "metadata": {}, "source": []},
+                {"cell_type": "markdown", "metadata": {}, "source": [], "outputs": [1]},
+            ],
+            "nbformat": 4,
+        }
+        source = os.path.join(self.directory, "compact.ipynb")
+        toolbox.save_ipynb(ipynb, source)
+        toolbox.clear_outputs_file(source, self.output)
+        self.assertEqual(toolbox.clear_outputs(ipynb), toolbox.load_ipynb(self.output))
+
+    def test_invalid(self):
+        source = os.path.join(self.directory, "broken.ipynb")
+        with open(source, "w", encoding="utf-8") as file:
+            file.write('{"cells": [{"outputs": [')
+        with self.assertRaises(ValueError):
+            toolbox.clear_outputs_file(source, self.output)
+        self.assertEqual(["broken.ipynb"], os.listdir(self.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+incremental synchronization of a py-percent file into its .ipynb notebook
+
+Usage (command line):
+
+    python notebook_sync.py notebook.py notebook.ipynb
+
+Only the cells whose source changed are patched: the other cells keep their
+id, metadata and outputs, and the .ipynb file is only rewritten when its
+cells actually differ. The outputs are never decoded (see `load_ipynb`).
+"""
+
+# Python Standard Library
+import argparse
+import collections
+import difflib
+import hashlib
+import os
+import sys
+
+# Local Libraries
+import notebook_stream
+import notebook_v0 as toolbox
+from notebook_v2 import PyPercentLoader
+
+
+NO_ID = 'no documented id'
+SIMILARITY = 0.5  # ratio minimal (difflib) pour apparier deux cellules modifiées
+_CELL_TYPES = {'CodeCell': 'code', 'MarkdownCell': 'markdown'}
+
+SyncResult = collections.namedtuple(
+    "SyncResult", ["unchanged", "modified", "added", "removed", "written"]
+)
+
+
+def _source(source):
+    return source if isinstance(source, str) else ''.join(source)
+
+
+def _key(cell_type, source):
+    # Les lignes vides finales ne survivent pas au format py-percent
+    digest = hashlib.sha1(_source(source).rstrip().encode('utf-8')).hexdigest()
+    return cell_type, digest
+
+
+def pair_cells(old_cells, new_cells):
+    r"""Pair the cells of a notebook (v2 cells) with the existing cells (dict).
+
+    The cells with the same content are paired first (in order, then the
+    moved ones), then the cells with the same id; the remaining cells of the
+    same type are paired by position, where the two notebooks differ, and
+    finally by similarity of their sources.
+
+    Args:
+        old_cells (list): the existing cells (dict).
+        new_cells (list): the new cells (`notebook_v2.CodeCell`s and
+            `notebook_v2.MarkdownCell`s).
+
+    Returns:
+        list: for each new cell, the index of its existing cell (or None).
+
+    Usage:
+
+        >>> from notebook_v2 import CodeCell, MarkdownCell
+        >>> old = [
+        ...     {'cell_type': 'markdown', 'source': ['# Title']},
+        ...     {'cell_type': 'code', 'source': ['x = 1']},
+        ...     {'cell_type': 'code', 'source': ['print(x)']},
+        ... ]
+        >>> new = [
+        ...     CodeCell(NO_ID, ['import os'], None),
+        ...     MarkdownCell(NO_ID, ['# Title']),
+        ...     CodeCell(NO_ID, ['x = 2'], None),
+        ...     CodeCell(NO_ID, ['print(x)'], None),
+        ... ]
+        >>> pair_cells(old, new)
+        [None, 0, 1, 2]
+    """
+    old_keys = [_key(cell['cell_type'], cell.get('source', '')) for cell in old_cells]
+    new_keys = [_key(_CELL_TYPES[cell.type], cell.source) for cell in new_cells]
+    pairs = [None] * len(new_cells)
+    used = set()
+
+    def pair(old_index, new_index):
+        pairs[new_index] = old_index
+        used.add(old_index)
+
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    opcodes = matcher.get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            for old_index, new_index in zip(range(i1, i2), range(j1, j2)):
+                pair(old_index, new_index)
+
+    # Cellules déplacées : même contenu, ailleurs
+    unused = collections.defaultdict(list)
+    for old_index, key in enumerate(old_keys):
+        if old_index not in used:
+            unused[key].append(old_index)
+    for new_index, key in enumerate(new_keys):
+        if pairs[new_index] is None and unused[key]:
+            pair(unused[key].pop(0), new_index)
+
+    by_id = {
+        cell['id']: old_index
+        for old_index, cell in enumerate(old_cells)
+        if cell.get('id') not in (None, NO_ID)
+    }
+    for new_index, cell in enumerate(new_cells):
+        old_index = by_id.get(cell.id)
+        if pairs[new_index] is None and old_index is not None and old_index not in used:
+            pair(old_index, new_index)
+
+    # Cellules modifiées : appariées par position dans les zones différentes
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag != 'replace':
+            continue
+        free = [old_index for old_index in range(i1, i2) if old_index not in used]
+        for new_index in range(j1, j2):
+            if pairs[new_index] is not None:
+                continue
+            for old_index in free:
+                if old_keys[old_index][0] == new_keys[new_index][0]:
+                    free.remove(old_index)
+                    pair(old_index, new_index)
+                    break
+
+    # Puis les cellules restantes dont les sources se ressemblent
+    for new_index, new_cell in enumerate(new_cells):
+        if pairs[new_index] is not None:
+            continue
+        similarity = difflib.SequenceMatcher(autojunk=False)
+        similarity.set_seq2(_source(new_cell.source))
+        best, best_ratio = None, SIMILARITY
+        for old_index, old_cell in enumerate(old_cells):
+            if old_index in used or old_keys[old_index][0] != new_keys[new_index][0]:
+                continue
+            similarity.set_seq1(_source(old_cell.get('source', '')))
+            if similarity.real_quick_ratio() >= best_ratio and \
+                    similarity.quick_ratio() >= best_ratio:
+                ratio = similarity.ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = old_index, ratio
+        if best is not None:
+            pair(best, new_index)
+    return pairs
+
+
+def _new_id(source, ids):
+    digest = hashlib.sha1(_source(source).encode('utf-8')).hexdigest()
+    for start in range(0, len(digest) - 8):
+        cell_id = digest[start:start + 8]
+        if cell_id not in ids:
+            ids.add(cell_id)
+            return cell_id
+    raise ValueError("no free cell id")
+
+
+def merge_cells(old_cells, new_cells, with_ids=True):
+    r"""Build the cells (dict) of the notebook new_cells, reusing the
+    existing cells old_cells.
+
+    An unchanged cell is reused as is (with its outputs); a modified cell
+    keeps its id and metadata but loses its (stale) outputs; an added cell
+    gets a new id (derived from its source) when with_ids is True.
+
+    Returns:
+        tuple: the cells (list of dict) and the `SyncResult` counts (with
+            written=False).
+    """
+    pairs = pair_cells(old_cells, new_cells)
+    ids = {cell.get('id') for cell in old_cells}
+    cells, unchanged, modified, added = [], 0, 0, 0
+    for new_cell, old_index in zip(new_cells, pairs):
+        cell_type = _CELL_TYPES[new_cell.type]
+        if old_index is not None:
+            old_cell = old_cells[old_index]
+            if _key(cell_type, old_cell.get('source', '')) == _key(cell_type, new_cell.source):
+                cells.append(old_cell)
+                unchanged += 1
+                continue
+            cell = dict(old_cell)
+            modified += 1
+        else:
+            cell = {'cell_type': cell_type, 'metadata': {}}
+            if with_ids:
+                cell['id'] = _new_id(new_cell.source, ids)
+            added += 1
+        cell['source'] = list(new_cell.source)
+        if cell_type == 'code':
+            cell['execution_count'] = None
+            cell['outputs'] = []
+        cells.append(cell)
+    removed = len(old_cells) - (unchanged + modified)
+    return cells, SyncResult(unchanged, modified, added, removed, False)
+
+
+def sync(percent_file, ipynb_file, mode="nbformat-pretty"):
+    r"""Update the notebook ipynb_file with the cells of the py-percent file.
+
+    The existing notebook is memory-mapped and its outputs are copied
+    without being decoded (see `load_ipynb(lazy=True)`); it is only
+    rewritten (atomically, in the given `notebook_json` mode) when its cells
+    changed. A missing notebook is created.
+
+    Returns:
+        SyncResult: the number of cells unchanged, modified, added and
+            removed, and whether the file was written.
+
+    Usage:
+
+        >>> import shutil, tempfile
+        >>> directory = tempfile.mkdtemp()
+        >>> shutil.copy("samples/hello-world.ipynb", directory)  # doctest: +ELLIPSIS
+        '...hello-world.ipynb'
+        >>> with open(directory + "/hello-world.py", "w", encoding="utf-8") as file:
+        ...     _ = file.write('# %% [markdown]\n# Hello world!\n\n# %%\nprint("Hello world!")\n')
+        >>> sync(directory + "/hello-world.py", directory + "/hello-world.ipynb")
+        SyncResult(unchanged=1, modified=1, added=0, removed=1, written=True)
+        >>> sync(directory + "/hello-world.py", directory + "/hello-world.ipynb")
+        SyncResult(unchanged=2, modified=0, added=0, removed=0, written=False)
+        >>> ipynb = toolbox.load_ipynb(directory + "/hello-world.ipynb")
+        >>> [cell['id'] for cell in ipynb['cells']], ipynb['cells'][1]['outputs'][0]['text']
+        (['a9541506', 'b777420a'], ['Hello world!\n'])
+        >>> shutil.rmtree(directory)
+    """
+    notebook = PyPercentLoader(percent_file).load()
+    if os.path.exists(ipynb_file):
+        ipynb = toolbox.load_ipynb(ipynb_file, lazy=True)
+    else:
+        ipynb = {'cells': [], 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+    old_cells = ipynb['cells']
+    with_ids = (ipynb['nbformat'], ipynb['nbformat_minor']) >= (4, 5)
+    cells, result = merge_cells(old_cells, notebook.cells, with_ids)
+
+    if os.path.exists(ipynb_file) and len(cells) == len(old_cells) and all(
+        cell is old_cell for cell, old_cell in zip(cells, old_cells)
+    ):
+        return result
+    # Le fichier remplacé garde ses permissions
+    with notebook_stream.atomic_open(ipynb_file) as file:
+        notebook_stream.write_json(
+            dict(ipynb, cells=(
+                notebook_stream.dumps_fragment(cell, mode, level=2) for cell in cells
+            )),
+            file, mode,
+        )
+    return result._replace(written=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Update a notebook (.ipynb) with the cells of its py-percent file."
+    )
+    parser.add_argument("percent_file", help="the py-percent file (.py)")
+    parser.add_argument("ipynb_file", help="the notebook file (.ipynb)")
+    parser.add_argument(
+        "--compact", action="store_true", help="write compact JSON (default: nbformat layout)"
+    )
+    args = parser.parse_args(argv)
+
+    result = sync(
+        args.percent_file, args.ipynb_file, "compact" if args.compact else "nbformat-pretty"
+    )
+    print(
+        f"{result.unchanged} unchanged, {result.modified} modified, "
+        f"{result.added} added, {result.removed} removed cells"
+        + ("" if result.written else " (not written)")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import notebook_json
+import notebook_v0 as toolbox
+from notebook_sync import SyncResult, sync
+
+
+class Sync(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ipynb = os.path.join(self.directory, "streams.ipynb")
+        self.percent = os.path.join(self.directory, "streams.py")
+        shutil.copy("samples/streams.ipynb", self.ipynb)
+        self.original = toolbox.load_ipynb(self.ipynb)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_percent(self, text):
+        with open(self.percent, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_unchanged(self):
+        self.write_percent(
+            '# %%\nprint("👋 Hello world! 🌍")\n\n# %%\nimport sys\n'
+            'print("🔥 This is fine. 🔥 (https://gunshowcomic.com/648)", file=sys.stderr)\n'
+        )
+        os.utime(self.ipynb, ns=(0, 0))
+        self.assertEqual(SyncResult(2, 0, 0, 0, False), sync(self.percent, self.ipynb))
+        self.assertEqual(0, os.stat(self.ipynb).st_mtime_ns)
+
+    def test_modified_inserted_moved(self):
+        self.write_percent(
+            "# %% [markdown]\n# Streams\n\n"
+            "# %%\nimport sys\n"
+            'print("🔥 This is fine. 🔥 (https://gunshowcomic.com/648)", file=sys.stderr)\n\n'
+            '# %%\nprint("👋 Hello!")\n'
+        )
+        self.assertEqual(SyncResult(1, 1, 1, 0, True), sync(self.percent, self.ipynb))
+        cells = toolbox.load_ipynb(self.ipynb)["cells"]
+        old = self.original["cells"]
+        self.assertEqual("markdown", cells[0]["cell_type"])
+        self.assertEqual(["Streams"], cells[0]["source"])
+        self.assertNotIn("id", cells[0])  # nbformat 4.4 : pas d'id
+        # déplacée, mais inchangée : sorties conservées
+        self.assertEqual(old[1], cells[1])
+        # modifiée : mêmes métadonnées, sorties effacées
+        self.assertEqual(old[0]["metadata"], cells[2]["metadata"])
+        self.assertEqual(['print("👋 Hello!")'], cells[2]["source"])
+        self.assertEqual((None, []), (cells[2]["execution_count"], cells[2]["outputs"]))
+        self.assertEqual(SyncResult(3, 0, 0, 0, False), sync(self.percent, self.ipynb))
+
+    def test_removed(self):
+        self.write_percent('# %%\nprint("👋 Hello world! 🌍")\n')
+        self.assertEqual(SyncResult(1, 0, 0, 1, True), sync(self.percent, self.ipynb))
+        self.assertEqual(
+            self.original["cells"][:1], toolbox.load_ipynb(self.ipynb)["cells"]
+        )
+
+    def test_layout(self):
+        # les octets des cellules inchangées sont ceux de Jupyter
+        self.write_percent('# %%\nprint("👋 Hello world! 🌍")\n')
+        sync(self.percent, self.ipynb)
+        expected = dict(self.original, cells=self.original["cells"][:1])
+        with open(self.ipynb, "rb") as file:
+            self.assertEqual(notebook_json.dumps(expected, "nbformat-pretty"), file.read())
+        self.assertEqual(["streams.ipynb", "streams.py"], sorted(os.listdir(self.directory)))
+
+    def test_permissions(self):
+        os.chmod(self.ipynb, 0o640)
+        self.write_percent('# %%\nprint("edited")\n')
+        self.assertTrue(sync(self.percent, self.ipynb).written)
+        self.assertEqual(0o640, os.stat(self.ipynb).st_mode & 0o777)
+        self.assertEqual(["streams.ipynb", "streams.py"], sorted(os.listdir(self.directory)))
+
+    def test_new_notebook(self):
+        os.remove(self.ipynb)
+        self.write_percent("# %% [markdown]\n# Title\n\n# %%\nx = 1\n")
+        self.assertEqual(SyncResult(0, 0, 2, 0, True), sync(self.percent, self.ipynb))
+        ipynb = toolbox.load_ipynb(self.ipynb)
+        self.assertEqual("4.5", toolbox.get_format_version(ipynb))
+        self.assertEqual(
+            [("markdown", ["Title"]), ("code", ["x = 1"])],
+            [(cell["cell_type"], cell["source"]) for cell in ipynb["cells"]],
+        )
+        self.assertEqual(2, len({cell["id"] for cell in ipynb["cells"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,769 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Pour git
+"""
+starter code for your evaluation assignment
+"""
+
+# Python Standard Library
+import base64
+import builtins
+import collections
+import io
+import pprint
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Local Libraries
+import notebook_instrument
+import notebook_json
+import notebook_stream
+
+
+STREAM_CHUNK_SIZE = 64 * 1024  # characters
+
+
+def load_ipynb(filename, stream=False, lazy=False,
+               threshold=notebook_stream.DEFAULT_THRESHOLD):
+    r"""
+    Load a jupyter notebook .ipynb file (JSON) as a Python dict.
+
+    With stream=True, the cells are read one at a time from the file when
+    iterated, and the output values larger than threshold (in bytes) are
+    only decoded when accessed (see `notebook_stream.load_ipynb`).
+
+    The file is parsed with the fastest installed JSON library
+    (see `notebook_json`).
+
+    With lazy=True, the file is memory-mapped and the output strings larger
+    than threshold are kept as `notebook_stream.OutputBlob`s
+    (see `notebook_stream.map_ipynb`).
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/minimal.ipynb")
+        >>> ipynb
+        {'cells': [], 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> pprint.pprint(ipynb)
+        {'cells': [{'cell_type': 'markdown',
+                    'id': 'a9541506',
+                    'metadata': {},
+                    'source': ['Hello world!\n',
+                               '============\n',
+                               'Print `Hello world!`:']},
+                   {'cell_type': 'code',
+                    'execution_count': 1,
+                    'id': 'b777420a',
+                    'metadata': {},
+                    'outputs': [{'name': 'stdout',
+                                 'output_type': 'stream',
+                                 'text': ['Hello world!\n']}],
+                    'source': ['print("Hello world!")']},
+                   {'cell_type': 'markdown',
+                    'id': 'a23ab5ac',
+                    'metadata': {},
+                    'source': ['Goodbye! 👋']}],
+         'metadata': {},
+         'nbformat': 4,
+         'nbformat_minor': 5}
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb", stream=True)
+        >>> [cell['id'] for cell in get_cells(ipynb)]
+        ['a9541506', 'b777420a', 'a23ab5ac']
+
+        >>> ipynb = load_ipynb("samples/images.ipynb", lazy=True)
+        >>> get_cells(ipynb)[-1]['outputs'][0]['data']['image/png'] # doctest: +ELLIPSIS
+        OutputBlob('samples/images.ipynb', ..., ...)
+    """
+    with notebook_instrument.stage("load_ipynb"):
+        if stream:
+            return notebook_stream.load_ipynb(filename, threshold)
+        if lazy:
+            return notebook_stream.map_ipynb(filename, threshold)
+        with open(filename, 'rb') as file:
+            data = file.read()
+        notebook_instrument.count("bytes", len(data))
+        ipynb = notebook_json.loads(data)
+    return ipynb 
+
+
+def save_ipynb(ipynb, filename, mode="compact"):
+    r"""
+    Save a jupyter notebook (Python dict) as a .ipynb file (JSON)
+
+    The file is UTF-8 encoded and written with the fastest installed JSON
+    library; mode is "compact" (no whitespace) or "nbformat-pretty" (the
+    layout of the files saved by Jupyter, see `notebook_json.dumps`).
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/minimal.ipynb")
+        >>> ipynb
+        {'cells': [], 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5}
+        >>> ipynb["metadata"]["clone"] = True
+        >>> save_ipynb(ipynb, "samples/minimal-save-load.ipynb")
+        >>> load_ipynb("samples/minimal-save-load.ipynb")
+        {'cells': [], 'metadata': {'clone': True}, 'nbformat': 4, 'nbformat_minor': 5}
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> save_ipynb(ipynb, "samples/hello-world-save-load.ipynb")
+        >>> ipynb == load_ipynb("samples/hello-world-save-load.ipynb")
+        True
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb", stream=True)
+        >>> save_ipynb(ipynb, "samples/hello-world-save-load.ipynb")
+        >>> load_ipynb("samples/hello-world.ipynb") == load_ipynb("samples/hello-world-save-load.ipynb")
+        True
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> save_ipynb(ipynb, "samples/hello-world-save-load.ipynb", mode="nbformat-pretty")
+        >>> open("samples/hello-world.ipynb", "rb").read() == open("samples/hello-world-save-load.ipynb", "rb").read()
+        True
+    """
+    with notebook_instrument.stage("save_ipynb"):
+        if isinstance(ipynb['cells'], notebook_stream.CellStream):
+            notebook_stream.save_ipynb(ipynb, filename, mode)
+            return
+        try:
+            data = notebook_json.dumps(ipynb, mode)
+        except TypeError:
+            # lazy outputs (OutputBlob): copied from their file, without decoding
+            notebook_stream.save_ipynb(ipynb, filename, mode)
+            return
+        with open(filename, 'wb') as json_file:
+            json_file.write(data)
+        notebook_instrument.count("bytes_written", len(data))
+
+
+def get_format_version(ipynb):
+    r"""
+    Return the format version (str) of a jupyter notebook (dict).
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/minimal.ipynb")
+        >>> get_format_version(ipynb)
+        '4.5'
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> get_format_version(ipynb)
+        '4.5'
+    """
+    nbformat = str(ipynb['nbformat'])
+    nbformat_minor = str(ipynb['nbformat_minor'])
+    return nbformat + '.' + nbformat_minor
+
+
+def get_metadata(ipynb):
+    r"""
+    Return the global metadata of a notebook.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/metadata.ipynb")
+        >>> metadata = get_metadata(ipynb)
+        >>> pprint.pprint(metadata)
+        {'celltoolbar': 'Edit Metadata',
+         'kernelspec': {'display_name': 'Python 3 (ipykernel)',
+                        'language': 'python',
+                        'name': 'python3'},
+         'language_info': {'codemirror_mode': {'name': 'ipython', 'version': 3},
+                           'file_extension': '.py',
+                           'mimetype': 'text/x-python',
+                           'name': 'python',
+                           'nbconvert_exporter': 'python',
+                           'pygments_lexer': 'ipython3',
+                           'version': '3.9.7'}}
+    """
+    metadata = ipynb['metadata']
+    return metadata 
+
+
+def get_cells(ipynb):
+    r"""
+    Return the notebook cells.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/minimal.ipynb")
+        >>> cells = get_cells(ipynb)
+        >>> cells
+        []
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> cells = get_cells(ipynb)
+        >>> pprint.pprint(cells)
+        [{'cell_type': 'markdown',
+          'id': 'a9541506',
+          'metadata': {},
+          'source': ['Hello world!\n', '============\n', 'Print `Hello world!`:']},
+         {'cell_type': 'code',
+          'execution_count': 1,
+          'id': 'b777420a',
+          'metadata': {},
+          'outputs': [{'name': 'stdout',
+                       'output_type': 'stream',
+                       'text': ['Hello world!\n']}],
+          'source': ['print("Hello world!")']},
+         {'cell_type': 'markdown',
+          'id': 'a23ab5ac',
+          'metadata': {},
+          'source': ['Goodbye! 👋']}]
+    """
+    cells = ipynb['cells']
+    return cells 
+
+
+def to_percent(ipynb, out=None):
+    r"""
+    Convert a ipynb notebook (dict) to a Python code in the percent format (str).
+
+    When out (a text file) is given, the code is written to it cell by cell
+    instead of being returned.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> print(to_percent(ipynb)) # doctest: +NORMALIZE_WHITESPACE
+        # %% [markdown]
+        # Hello world!
+        # ============
+        # Print `Hello world!`:
+        # %%
+        print("Hello world!")
+        # %% [markdown]
+        # Goodbye! 👋
+
+        >>> notebook_files = Path(".").glob("samples/*.ipynb")
+        >>> for notebook_file in notebook_files:
+        ...     ipynb = load_ipynb(notebook_file)
+        ...     percent_code = to_percent(ipynb)
+        ...     with open(notebook_file.with_suffix(".py"), "w", encoding="utf-8") as output:
+        ...         print(percent_code, file=output)
+
+        >>> output = io.StringIO()
+        >>> to_percent(ipynb, out=output)
+        >>> output.getvalue() == to_percent(ipynb)
+        True
+    """
+    with notebook_instrument.stage("to_percent"):
+        writer = _Writer(out)
+        for cell in ipynb['cells']:
+            content = cell['source']
+            
+            if cell['cell_type'] == 'markdown': 
+                writer.write('# %% [markdown]\n' + ''.join(['# ' + line for line in content]))
+                
+            elif cell['cell_type'] == 'code':
+                writer.write('# %%\n' + ''.join(content))
+            
+            writer.end_cell()
+                   
+        return writer.getvalue()
+
+
+class _Writer:
+    r"""Collects the text of a converted notebook in a list (joined once at
+    the end), or writes it to the file out as it goes.
+    """
+
+    def __init__(self, out=None):
+        self.out = out
+        self.parts = [] if out is None else None
+        self.tail = ''  # les deux derniers caractères écrits
+
+    def write(self, text):
+        if not text:
+            return
+        if self.out is None:
+            self.parts.append(text)
+        else:
+            self.out.write(text)
+        self.tail = (self.tail + text)[-2:]
+
+    def end_cell(self):
+        # Le code source de la cellule peut contenir ou non le saut de ligne final
+        if self.tail[-2] != '\n':
+            self.write('\n')
+
+    def getvalue(self):
+        if self.out is None:
+            return ''.join(self.parts)
+        return None
+
+
+def starboard_html(code):
+    return f"""
+<!doctype html>
+<html>
+    <head>
+        <meta charset="utf-8">
+        <title>Starboard Notebook</title>
+        <meta name="viewport" content="width=device-width,initial-scale=1">
+        <link rel="icon" href="https://cdn.jsdelivr.net/npm/starboard-notebook@0.15.2/dist/favicon.ico">
+        <link href="https://cdn.jsdelivr.net/npm/starboard-notebook@0.15.2/dist/starboard-notebook.css" rel="stylesheet">
+    </head>
+    <body>
+        <script>
+            window.initialNotebookContent = {code!r}
+            window.starboardArtifactsUrl = `https://cdn.jsdelivr.net/npm/starboard-notebook@0.15.2/dist/`;
+        </script>
+        <script src="https://cdn.jsdelivr.net/npm/starboard-notebook@0.15.2/dist/starboard-notebook.js"></script>
+    </body>
+</html>
+"""
+
+
+def to_starboard(ipynb, html=False, out=None):
+    r"""
+    Convert a ipynb notebook (dict) to a Starboard notebook (str)
+    or to a Starboard HTML document (str) if html is True.
+
+    When out (a text file) is given, the notebook is written to it instead
+    of being returned (cell by cell, unless html is True: the HTML document
+    embeds the whole notebook as a single string literal).
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> print(to_starboard(ipynb))
+        # %% [markdown]
+        Hello world!
+        ============
+        Print `Hello world!`:
+        # %% [python]
+        print("Hello world!")
+        # %% [markdown]
+        Goodbye! 👋
+
+        >>> html = to_starboard(ipynb, html=True)
+        >>> print(html) # doctest: +ELLIPSIS, +NORMALIZE_WHITESPACE
+        <!doctype html>
+        <html>
+        ...
+        </html>
+
+        >>> notebook_files = Path(".").glob("samples/*.ipynb")
+        >>> for notebook_file in notebook_files:
+        ...     ipynb = load_ipynb(notebook_file)
+        ...     starboard_html = to_starboard(ipynb, html=True)
+        ...     with open(notebook_file.with_suffix(".html"), "w", encoding="utf-8") as output:
+        ...         print(starboard_html, file=output)
+
+        >>> output = io.StringIO()
+        >>> to_starboard(ipynb, out=output)
+        >>> output.getvalue() == to_starboard(ipynb)
+        True
+    """
+    writer = _Writer(None if html else out)
+    for cell in ipynb['cells']:
+        if cell['cell_type'] == 'markdown': 
+            writer.write('# %% [markdown]\n' + ''.join(cell['source']))
+        elif cell['cell_type'] == 'code':
+            writer.write('# %% [python]\n' + ''.join(cell['source']))
+                
+        writer.end_cell()
+            
+    if html: 
+        html = starboard_html(writer.getvalue())
+        if out is not None:
+            out.write(html)
+            return None
+        return html
+    else:
+        return writer.getvalue()
+
+
+# Outputs
+# ------------------------------------------------------------------------------
+def clear_outputs(ipynb):
+    r"""
+    Remove the notebook cell outputs and resets the cells execution counts.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> pprint.pprint(ipynb)
+        {'cells': [{'cell_type': 'markdown',
+                    'id': 'a9541506',
+                    'metadata': {},
+                    'source': ['Hello world!\n',
+                               '============\n',
+                               'Print `Hello world!`:']},
+                   {'cell_type': 'code',
+                    'execution_count': 1,
+                    'id': 'b777420a',
+                    'metadata': {},
+                    'outputs': [{'name': 'stdout',
+                                 'output_type': 'stream',
+                                 'text': ['Hello world!\n']}],
+                    'source': ['print("Hello world!")']},
+                   {'cell_type': 'markdown',
+                    'id': 'a23ab5ac',
+                    'metadata': {},
+                    'source': ['Goodbye! 👋']}],
+         'metadata': {},
+         'nbformat': 4,
+         'nbformat_minor': 5}
+        >>> clear_outputs(ipynb)
+        >>> pprint.pprint(ipynb)
+        {'cells': [{'cell_type': 'markdown',
+                    'id': 'a9541506',
+                    'metadata': {},
+                    'source': ['Hello world!\n',
+                               '============\n',
+                               'Print `Hello world!`:']},
+                   {'cell_type': 'code',
+                    'execution_count': None,
+                    'id': 'b777420a',
+                    'metadata': {},
+                    'outputs': [],
+                    'source': ['print("Hello world!")']},
+                   {'cell_type': 'markdown',
+                    'id': 'a23ab5ac',
+                    'metadata': {},
+                    'source': ['Goodbye! 👋']}],
+         'metadata': {},
+         'nbformat': 4,
+         'nbformat_minor': 5}
+
+    A streamed notebook (see `load_ipynb`) is cleared on the fly, when its
+    cells are iterated.
+    """
+    if isinstance(ipynb['cells'], notebook_stream.CellStream):
+        ipynb['cells'] = ipynb['cells'].map(_clear_cell_outputs)
+        return ipynb
+
+    for cell in ipynb['cells']:
+        _clear_cell_outputs(cell)
+            
+    return ipynb
+
+
+def clear_outputs_file(src, dst):
+    r"""
+    Remove the cell outputs and reset the cells execution counts of the
+    notebook file src, written to dst.
+
+    The file is never loaded as a whole: the JSON is tokenized as a stream,
+    the outputs are skipped without being decoded and the rest of the file
+    is copied byte for byte (see `notebook_stream.clear_outputs_file`).
+    The result has the content of `clear_outputs` + `save_ipynb`, in the
+    layout of src: for a file saved by Jupyter, the bytes are the ones of
+    `save_ipynb(..., mode="nbformat-pretty")`. src and dst may be the same
+    file.
+
+    Usage:
+
+        >>> clear_outputs_file("samples/hello-world.ipynb", "samples/hello-world-cleared.ipynb")
+        >>> ipynb = clear_outputs(load_ipynb("samples/hello-world.ipynb"))
+        >>> ipynb == load_ipynb("samples/hello-world-cleared.ipynb")
+        True
+    """
+    notebook_stream.clear_outputs_file(src, dst)
+
+
+def _clear_cell_outputs(cell):
+    if cell['cell_type'] == 'code':
+        cell['execution_count'] = None
+        cell['outputs'] = []
+    return cell
+
+
+def iter_stream(ipynb, stdout=True, stderr=False, chunk_size=STREAM_CHUNK_SIZE):
+    r"""
+    Iterate the text written to the standard output and/or error stream.
+
+    Every line of every stream output is visited, in order; the consecutive
+    lines of the same stream are merged in chunks of about chunk_size
+    characters.
+
+    Args:
+        ipynb (dict or str): a notebook, or the name of a .ipynb file whose
+            cells are then streamed from the file (see `load_ipynb`).
+        stdout (bool): include the standard output stream.
+        stderr (bool): include the standard error stream.
+        chunk_size (int): the size of the merged chunks, in characters.
+
+    Yields:
+        tuple: the (name, text) of each chunk, name being "stdout" or "stderr".
+
+    Usage:
+
+        >>> for name, text in iter_stream("samples/streams.ipynb", stderr=True):
+        ...     print(name, repr(text))
+        stdout '👋 Hello world! 🌍\n'
+        stderr '🔥 This is fine. 🔥 (https://gunshowcomic.com/648)\n'
+
+        >>> ipynb = {'cells': [{'cell_type': 'code', 'outputs': [
+        ...     {'name': 'stdout', 'output_type': 'stream', 'text': ['1\n', '2\n']},
+        ...     {'name': 'stdout', 'output_type': 'stream', 'text': '3\n'}]}]}
+        >>> list(iter_stream(ipynb))
+        [('stdout', '1\n2\n3\n')]
+    """
+    if not isinstance(ipynb, dict):
+        ipynb = load_ipynb(ipynb, stream=True)
+    names = {name for name, selected in (('stdout', stdout), ('stderr', stderr)) if selected}
+    name, parts, size = None, [], 0
+    for cell in ipynb['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        for output in cell.get('outputs', ()):
+            if output.get('output_type') != 'stream' or output.get('name') not in names:
+                continue
+            text = output['text']
+            if isinstance(text, notebook_stream.LazyValue):
+                text = text.load()
+            if isinstance(text, str):
+                text = [text]
+            for line in text:
+                if isinstance(line, notebook_stream.LazyValue):
+                    line = line.load()
+                if output['name'] != name or (parts and size + len(line) > chunk_size):
+                    if parts:
+                        yield name, ''.join(parts)
+                    name, parts, size = output['name'], [], 0
+                parts.append(line)
+                size += len(line)
+    if parts:
+        yield name, ''.join(parts)
+
+
+def get_stream(ipynb, stdout=True, stderr=False, out=None):
+    r"""
+    Return the text written to the standard output and/or error stream.
+
+    With out (a text file object), the text is written to out, chunk by
+    chunk, and None is returned (see `iter_stream`).
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/streams.ipynb")
+        >>> print(get_stream(ipynb)) # doctest: +NORMALIZE_WHITESPACE
+        👋 Hello world! 🌍
+        >>> print(get_stream(ipynb, stdout=False, stderr=True)) # doctest: +NORMALIZE_WHITESPACE
+        🔥 This is fine. 🔥 (https://gunshowcomic.com/648)
+        >>> print(get_stream(ipynb, stdout=True, stderr=True)) # doctest: +NORMALIZE_WHITESPACE
+        👋 Hello world! 🌍
+        🔥 This is fine. 🔥 (https://gunshowcomic.com/648)
+
+        >>> output = io.StringIO()
+        >>> get_stream("samples/streams.ipynb", stderr=True, out=output)
+        >>> output.getvalue().count("\n")
+        2
+    """
+    chunks = (text for _, text in iter_stream(ipynb, stdout, stderr))
+    if out is None:
+        return ''.join(chunks)
+    for text in chunks:
+        out.write(text)
+
+
+# Les exceptions natives, par nom (ename)
+BUILTIN_EXCEPTIONS = {
+    name: value
+    for name, value in vars(builtins).items()
+    if isinstance(value, type) and issubclass(value, BaseException)
+}
+_OTHER_EXCEPTIONS = {}  # classes créées pour les noms inconnus
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]")
+
+
+def exception_class(ename):
+    r"""
+    Return the exception class named ename.
+
+    The builtin exceptions are looked up in a table; a subclass of
+    Exception is created (once) for the other names.
+
+    Usage:
+
+        >>> exception_class("ZeroDivisionError")
+        <class 'ZeroDivisionError'>
+        >>> exception_class("HTTPError")
+        <class 'notebook_v0.HTTPError'>
+        >>> exception_class("HTTPError") is exception_class("HTTPError")
+        True
+    """
+    try:
+        return BUILTIN_EXCEPTIONS[ename]
+    except KeyError:
+        pass
+    try:
+        return _OTHER_EXCEPTIONS[ename]
+    except KeyError:
+        cls = type(ename, (Exception,), {"__module__": __name__})
+        return _OTHER_EXCEPTIONS.setdefault(ename, cls)
+
+
+class NotebookError(collections.namedtuple(
+        "NotebookError", ["cell_id", "ename", "evalue", "traceback"])):
+    r"""
+    An exception raised during the execution of a notebook cell.
+
+    Attributes:
+        cell_id (str): the id of the cell (None when the cell has no id).
+        ename (str): the name of the exception class.
+        evalue (str): the exception message.
+        traceback (str): the traceback, without the ANSI color codes.
+    """
+
+    __slots__ = ()
+
+    def exception(self):
+        r"""Return the exception (an instance of `exception_class(ename)`)."""
+        cls = exception_class(self.ename)
+        try:
+            return cls(self.evalue)
+        except TypeError:  # e.g. UnicodeDecodeError needs 5 arguments
+            return exception_class(self.ename + "Record")(self.evalue)
+
+
+def iter_errors(ipynb):
+    r"""
+    Iterate the errors raised during cell executions, as `NotebookError`s.
+
+    Every error output of every code cell is visited. ipynb may also be the
+    name of a .ipynb file, whose cells are then streamed (see `load_ipynb`).
+
+    Usage:
+
+        >>> for error in iter_errors("samples/errors.ipynb"):
+        ...     print(error.cell_id, error.ename, error.traceback.splitlines()[-1])
+        None TypeError TypeError: unsupported operand type(s) for +: 'int' and 'str'
+        None Warning Warning: 🌧️  light rain
+    """
+    if not isinstance(ipynb, dict):
+        ipynb = load_ipynb(ipynb, stream=True)
+    for cell in ipynb['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        for output in cell.get('outputs', ()):
+            if output.get('output_type') == 'error':
+                yield NotebookError(
+                    cell.get('id'),
+                    output['ename'],
+                    output['evalue'],
+                    _ANSI_ESCAPE.sub('', '\n'.join(output.get('traceback', []))),
+                )
+
+
+def get_exceptions(ipynb):
+    r"""
+    Return all exceptions raised during cell executions.
+
+    The exceptions are built from the error outputs (see `iter_errors`):
+    the builtin exceptions have their own class, the others are instances
+    of a subclass of Exception with the same name.
+
+    Usage:
+
+        >>> ipynb = load_ipynb("samples/hello-world.ipynb")
+        >>> get_exceptions(ipynb)
+        []
+
+        >>> ipynb = load_ipynb("samples/errors.ipynb")
+        >>> errors = get_exceptions(ipynb)
+        >>> all(isinstance(error, Exception) for error in errors)
+        True
+        >>> for error in errors:
+        ...     print(repr(error))
+        TypeError("unsupported operand type(s) for +: 'int' and 'str'")
+        Warning('🌧️  light rain')
+    """
+    return [error.exception() for error in iter_errors(ipynb)]
+
+
+def get_images(ipynb, stack=False, workers=None):
+    r"""
+    Return the PNG images contained in a notebook cells outputs
+    (as a list of NumPy arrays).
+
+    The PNG images are decoded in a pool of threads (`workers` threads),
+    since Pillow releases the GIL while decoding; the images are returned
+    in the order of the cells. The images of a lazily loaded notebook
+    (see `load_ipynb`) are decoded straight from the file.
+
+    With stack=True, the images (which must all have the same shape) are
+    decoded into a single preallocated NumPy array, of shape
+    (number of images,) + image shape.
+
+    NumPy and Pillow are only imported when the images are decoded.
+
+    Usage:
+
+        >>> import numpy as np
+        >>> ipynb = load_ipynb("samples/images.ipynb")
+        >>> images = get_images(ipynb)
+        >>> images # doctest: +ELLIPSIS
+        [array([[[ ...]]], dtype=uint8)]
+        >>> grace_hopper_image = images[0]
+        >>> np.shape(grace_hopper_image)
+        (600, 512, 3)
+        >>> grace_hopper_image # doctest: +ELLIPSIS
+        array([[[ 21,  24,  77],
+                [ 27,  30,  85],
+                [ 33,  35,  92],
+                ...,
+                [ 14,  13,  19]]], dtype=uint8)
+
+        >>> ipynb = load_ipynb("samples/images.ipynb", lazy=True)
+        >>> np.shape(get_images(ipynb)[0])
+        (600, 512, 3)
+        >>> np.shape(get_images(ipynb, stack=True))
+        (1, 600, 512, 3)
+    """
+    import numpy as np
+
+    pngs = list(_iter_png(ipynb))
+    notebook_instrument.count("images", len(pngs))
+    if not stack:
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(_decode_png, pngs))
+
+    if not pngs:
+        return np.empty((0,), dtype=np.uint8)
+    # La première image fixe la forme et le type du tableau final
+    first = _decode_png(pngs[0])
+    batch = np.empty((len(pngs),) + first.shape, dtype=first.dtype)
+    batch[0] = first
+    del first
+
+    def decode_into(index):
+        image = _decode_png(pngs[index])
+        if image.shape != batch.shape[1:] or image.dtype != batch.dtype:
+            raise ValueError(
+                f'image #{index} has shape {image.shape} ({image.dtype}), '
+                f'cannot stack it with shape {batch.shape[1:]} ({batch.dtype})'
+            )
+        batch[index] = image
+
+    with ThreadPoolExecutor(workers) as executor:
+        # list() propage les exceptions des threads
+        list(executor.map(decode_into, range(1, len(pngs))))
+    return batch
+
+
+def _iter_png(ipynb):
+    for cell in ipynb['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        for output in cell['outputs']:
+            if output['output_type'] in ('display_data', 'execute_result'):
+                png = output['data'].get('image/png')
+                if png is not None:
+                    yield png
+
+
+def _decode_png(png):
+    import numpy as np
+    import PIL.Image  # pillow
+
+    if isinstance(png, notebook_stream.LazyValue):
+        png = png.to_bytes()
+    else:
+        png = base64.b64decode(''.join(png))
+    with PIL.Image.open(io.BytesIO(png)) as image:
+        return np.asarray(image)
@@ -1,3 +1,4 @@
+import io
 import os
 import unittest
 import numpy as np
@@ -191,6 +192,23 @@ Goodbye! 👋""",
             notebook.to_starboard(ipynb),
         )
 
+    def test_to_percent_out(self):
+        for notebook_file in sorted(os.listdir("samples")):
+            if notebook_file.endswith(".ipynb"):
+                ipynb = notebook.load_ipynb(os.path.join("samples", notebook_file))
+                output = io.StringIO()
+                self.assertIsNone(notebook.to_percent(ipynb, out=output))
+                self.assertEqual(notebook.to_percent(ipynb), output.getvalue())
+
+    def test_to_starboard_out(self):
+        for notebook_file in sorted(os.listdir("samples")):
+            if notebook_file.endswith(".ipynb"):
+                ipynb = notebook.load_ipynb(os.path.join("samples", notebook_file))
+                for html in (False, True):
+                    output = io.StringIO()
+                    self.assertIsNone(notebook.to_starboard(ipynb, html, out=output))
+                    self.assertEqual(notebook.to_starboard(ipynb, html), output.getvalue())
+
 class Question4(unittest.TestCase):
     def test_to_starboard_html(self):
         ipynb = notebook.load_ipynb("samples/hello-world.ipynb")
@@ -276,6 +294,38 @@ class Question6(unittest.TestCase):
             notebook.get_stream(ipynb, stdout=True, stderr=True),
         )
 
+    def test_iter_stream_all_outputs(self):
+        ipynb = {"cells": [
+            {"cell_type": "markdown", "source": []},
+            {"cell_type": "code", "outputs": [
+                {"name": "stdout", "output_type": "stream", "text": ["a\n", "b\n"]},
+                {"name": "stderr", "output_type": "stream", "text": "c\n"},
+                {"data": {"text/plain": ["1"]}, "output_type": "execute_result"},
+                {"name": "stdout", "output_type": "stream", "text": ["d\n"]},
+            ]},
+            {"cell_type": "code", "outputs": [
+                {"name": "stdout", "output_type": "stream", "text": ["e\n"]},
+            ]},
+        ]}
+        self.assertEqual(
+            [("stdout", "a\nb\n"), ("stderr", "c\n"), ("stdout", "d\ne\n")],
+            list(notebook.iter_stream(ipynb, stderr=True)),
+        )
+        self.assertEqual([("stdout", "a\nb\nd\ne\n")], list(notebook.iter_stream(ipynb)))
+        self.assertEqual("c\n", notebook.get_stream(ipynb, stdout=False, stderr=True))
+        self.assertEqual(
+            ["a\nb\n", "d\ne\n"],
+            [text for _, text in notebook.iter_stream(ipynb, chunk_size=4)],
+        )
+
+    def test_get_stream_file(self):
+        output = io.StringIO()
+        self.assertIsNone(
+            notebook.get_stream("samples/streams.ipynb", True, True, out=output)
+        )
+        ipynb = notebook.load_ipynb("samples/streams.ipynb")
+        self.assertEqual(notebook.get_stream(ipynb, True, True), output.getvalue())
+
 class Question7(unittest.TestCase):
     def test_exceptions_hello_world(self):
         ipynb = notebook.load_ipynb("samples/hello-world.ipynb")
@@ -293,6 +343,33 @@ class Question7(unittest.TestCase):
         )
         self.assertEqual("Warning('🌧️  light rain')", repr(errors[1]))
 
+    def test_errors_records(self):
+        ipynb = {"cells": [
+            {"cell_type": "code", "id": "c1", "outputs": [
+                {"name": "stdout", "output_type": "stream", "text": ["x\n"]},
+                {"ename": "ValueError", "evalue": "it's a \"quote\"", "output_type": "error",
+                 "traceback": ["\u001b[0;31mValueError\u001b[0m: it's a \"quote\""]},
+            ]},
+            {"cell_type": "code", "id": "c2", "outputs": [
+                {"ename": "HTTPError", "evalue": "404", "output_type": "error",
+                 "traceback": []},
+                {"ename": "UnicodeDecodeError", "evalue": "bad byte", "output_type": "error",
+                 "traceback": []},
+            ]},
+        ]}
+        errors = list(notebook.iter_errors(ipynb))
+        self.assertEqual(
+            notebook.NotebookError("c1", "ValueError", 'it\'s a "quote"', 'ValueError: it\'s a "quote"'),
+            errors[0],
+        )
+        exceptions = notebook.get_exceptions(ipynb)
+        self.assertIs(ValueError, type(exceptions[0]))
+        self.assertEqual(('it\'s a "quote"',), exceptions[0].args)
+        self.assertEqual("HTTPError", type(exceptions[1]).__name__)
+        self.assertIs(type(exceptions[1]), notebook.exception_class("HTTPError"))
+        self.assertIsInstance(exceptions[2], Exception)
+        self.assertEqual(("bad byte",), exceptions[2].args)
+
 class Question8(unittest.TestCase):
     def test_get_images(self):
         ipynb = notebook.load_ipynb("samples/images.ipynb")
@@ -305,6 +382,34 @@ class Question8(unittest.TestCase):
         self.assertEqual((600, 512, 3), grace_hopper_image.shape)
         self.assertEqual(np.uint8, grace_hopper_image.dtype)
 
+    def test_get_images_stack(self):
+        ipynb = notebook.load_ipynb("samples/images.ipynb")
+        images = notebook.get_images(ipynb)
+        ipynb["cells"].append(ipynb["cells"][-1])
+        batch = notebook.get_images(ipynb, stack=True, workers=2)
+        self.assertEqual((2, 600, 512, 3), batch.shape)
+        self.assertEqual(np.uint8, batch.dtype)
+        np.testing.assert_array_equal(images[0], batch[0])
+        np.testing.assert_array_equal(images[0], batch[1])
+
+    def test_get_images_stack_shape_mismatch(self):
+        ipynb = notebook.load_ipynb("samples/images.ipynb")
+        last = ipynb["cells"][-1]
+        other = {
+            "cell_type": "code",
+            "outputs": [{
+                "output_type": "display_data",
+                "data": {"image/png": (
+                    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4"
+                    "//8/AAX+Av4N70a4AAAAAElFTkSuQmCC"
+                )},
+            }],
+        }
+        ipynb["cells"] = [last, other]
+        self.assertEqual((1, 1, 3), notebook.get_images(ipynb)[1].shape)
+        with self.assertRaises(ValueError):
+            notebook.get_images(ipynb, stack=True)
+
 
 if __name__ == "__main__":
     unittest.main()
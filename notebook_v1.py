@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 # Pour git 
-from black import re
 import notebook_v0 as toolbox
+import notebook_instrument
+import notebook_stream
 import pprint
 import json
 
@@ -10,7 +11,18 @@ import json
 an object-oriented version of the notebook toolbox
 """
 
+
 class Cell:
+    r"""The common part of the cells of a Jupyter notebook.
+
+    The cells hold their attributes in __slots__ (no per-instance __dict__),
+    and their `type` is a class attribute. The keys of the cell that are not
+    attributes (the `attachments` of a markdown cell, for instance) are kept
+    in `extra`, and written back by the `Serializer`.
+    """
+    __slots__ = ('id', 'source', 'metadata', 'extra')
+    _keys = frozenset(('cell_type', 'id', 'source', 'metadata'))
+
     def __init__(self, ipynb): 
         try: 
             self.id = ipynb['id']
@@ -18,6 +30,8 @@ class Cell:
             self.id = 'no documented id'
             
         self.source = ipynb['source']
+        self.metadata = ipynb.get('metadata', {})
+        self.extra = {key: value for key, value in ipynb.items() if key not in self._keys}
 
 
 class CodeCell(Cell):
@@ -30,6 +44,9 @@ class CodeCell(Cell):
         id (int): the cell's id.
         source (list): the cell's source code, as a list of str.
         execution_count (int): number of times the cell has been executed.
+        outputs (list): the cell's outputs, as a list of dict (their large
+            values are `notebook_stream.OutputBlob`s when lazily loaded).
+        metadata (dict): the cell's metadata.
 
     Usage:
 
@@ -45,12 +62,18 @@ class CodeCell(Cell):
         1
         >>> code_cell.source
         ['print("Hello world!")']
+        >>> code_cell.outputs
+        []
     """
 
+    __slots__ = ('execution_count', 'outputs')
+    _keys = Cell._keys | {'execution_count', 'outputs'}
+    type = 'CodeCell'
+
     def __init__(self, ipynb):
         super().__init__(ipynb)
         self.execution_count = ipynb['execution_count']
-        self.type = 'CodeCell'
+        self.outputs = ipynb.get('outputs', [])
 
 
 class MarkdownCell(Cell):
@@ -62,6 +85,7 @@ class MarkdownCell(Cell):
     Attributes:
         id (int): the cell's id.
         source (list): the cell's source code, as a list of str.
+        metadata (dict): the cell's metadata.
 
     Usage:
 
@@ -80,9 +104,48 @@ class MarkdownCell(Cell):
         ['Hello world!\n', '============\n', 'Print `Hello world!`:']
     """
 
-    def __init__(self, ipynb): 
-        super().__init__(ipynb)
-        self.type = 'MarkdownCell'
+    __slots__ = ()
+    type = 'MarkdownCell'
+
+
+class RawCell(Cell):
+    r"""A raw Cell (not rendered nor executed) in a Jupyter notebook.
+
+    Args:
+        ipynb (dict): a dictionary representing the cell in a Jupyter Notebook.
+
+    Attributes:
+        id (int): the cell's id.
+        source (list): the cell's content, as a list of str.
+        metadata (dict): the cell's metadata.
+
+    Usage:
+
+        >>> raw_cell = RawCell({
+        ...    "cell_type": "raw",
+        ...    "id": "c8f0b8e2",
+        ...    "metadata": {"format": "text/x-rst"},
+        ...    "source": ["**raw**"]
+        ... })
+        >>> raw_cell.metadata
+        {'format': 'text/x-rst'}
+    """
+
+    __slots__ = ()
+    type = 'RawCell'
+
+
+_CELL_CLASSES = {'markdown': MarkdownCell, 'code': CodeCell, 'raw': RawCell}
+
+
+def _build_cell(ipynb):
+    # Une cellule inconnue ne peut pas être réécrite : pas de perte silencieuse
+    try:
+        cell_class = _CELL_CLASSES[ipynb['cell_type']]
+    except KeyError:
+        raise ValueError(f"unknown cell type {ipynb['cell_type']!r}") from None
+    return cell_class(ipynb)
+
 
 class Notebook:
     r"""A Jupyter Notebook.
@@ -92,7 +155,8 @@ class Notebook:
 
     Attributes:
         version (str): the version of the notebook format.
-        cells (list): a list of cells (either CodeCell or MarkdownCell).
+        cells (list): a list of cells (CodeCell, MarkdownCell or RawCell).
+        metadata (dict): the metadata of the notebook.
 
     Usage:
 
@@ -112,29 +176,41 @@ class Notebook:
             >>> isinstance(nb.cells[0], Cell)
             True
     """
+    __slots__ = ('version', 'cells', 'metadata')
 
     def __init__(self, ipynb):
         self.version = toolbox.get_format_version(ipynb)
-        cells = []
-        for cell in toolbox.get_cells(ipynb):
-            if cell['cell_type'] == 'markdown':
-                cells.append(MarkdownCell(cell))
-            elif cell['cell_type'] == 'code':
-                cells.append(CodeCell(cell))
-        self.cells = cells
+        self.metadata = ipynb.get('metadata', {})
+        # Un notebook chargé en streaming garde ses cellules dans le fichier
+        if isinstance(ipynb['cells'], notebook_stream.CellStream):
+            self.cells = ipynb['cells'].map(_build_cell)
+            return
+        self.cells = [_build_cell(cell) for cell in toolbox.get_cells(ipynb)]
         
 
     @staticmethod
-    def from_file(filename):
+    def from_file(filename, stream=False, lazy=False):
         r"""Loads a notebook from an .ipynb file.
 
+        With stream=True, the cells are read from the file one at a time,
+        each time the notebook is iterated. With lazy=True, the file is
+        memory-mapped and the large outputs are kept undecoded in the file.
+
         Usage:
 
             >>> nb = Notebook.from_file("samples/minimal.ipynb")
             >>> nb.version
             '4.5'
+
+            >>> nb = Notebook.from_file("samples/hello-world.ipynb", stream=True)
+            >>> [cell.id for cell in nb]
+            ['a9541506', 'b777420a', 'a23ab5ac']
+
+            >>> nb = Notebook.from_file("samples/images.ipynb", lazy=True)
+            >>> nb.cells[-1].outputs[0]['data']['image/png'] # doctest: +ELLIPSIS
+            OutputBlob('samples/images.ipynb', ..., ...)
         """
-        return Notebook(toolbox.load_ipynb(filename))
+        return Notebook(toolbox.load_ipynb(filename, stream=stream, lazy=lazy))
 
     def __iter__(self):
         r"""Iterate the cells of the notebook.
@@ -152,10 +228,18 @@ class Notebook:
 
 
 # +
-    
+
+_CELL_TYPES = {'CodeCell': 'code', 'MarkdownCell': 'markdown', 'RawCell': 'raw'}
+
 class Serializer:
     r"""Serializes a Jupyter Notebook to a file.
 
+    The notebook is written back as loaded: the outputs, the metadata and
+    the other keys of the cells (see `Cell.extra`) are kept.
+    The file is written one cell at a time, and the large output values of
+    a lazily loaded notebook are copied from their file without being
+    decoded (see `notebook_stream.dumps_fragment`).
+
     Args:
         notebook (Notebook): the notebook to print.
 
@@ -174,7 +258,9 @@ class Serializer:
                 'execution_count': 1,
                 'id': 'b777420a',
                 'metadata': {},
-                'outputs': [],
+                'outputs': [{'name': 'stdout',
+                             'output_type': 'stream',
+                             'text': ['Hello world!\n']}],
                 'source': ['print("Hello world!")']},
                {'cell_type': 'markdown',
                 'id': 'a23ab5ac',
@@ -189,48 +275,70 @@ class Serializer:
     def __init__(self, notebook):
         self.notebook = notebook
 
+    @staticmethod
+    def _cell(cell):
+        # Les clés dans l'ordre des notebooks écrits par Jupyter ; une cellule
+        # sans id (nbformat < 4.5) reste sans id
+        JSON_cell = {'cell_type': _CELL_TYPES[cell.type]}
+        # Les cellules de notebook_v2 (sérialisées aussi) n'ont pas d'extra
+        extra = getattr(cell, 'extra', None)
+        if extra:
+            JSON_cell.update(extra)
+        if cell.id != 'no documented id':
+            JSON_cell['id'] = cell.id
+        JSON_cell['metadata'] = cell.metadata
+        if cell.type == 'CodeCell':
+            JSON_cell['execution_count'] = cell.execution_count
+            JSON_cell['outputs'] = cell.outputs
+        JSON_cell['source'] = cell.source
+        return JSON_cell
+
+    def _notebook(self, cells):
+        # "4.10" -> 4, 10
+        nbformat, nbformat_minor = (int(number) for number in self.notebook.version.split('.'))
+        return {'cells': cells,
+                'metadata': self.notebook.metadata,
+                'nbformat': nbformat,
+                'nbformat_minor': nbformat_minor}
+
     def serialize(self):
         r"""Serializes the notebook to a JSON object
 
         Returns:
             dict: a dictionary representing the notebook.
         """        
-        # On a été obligé de réécrire tous les dictionnaires pour garder les clées dans le bon ordre.
-        # Ajoutons un objet metadata aux cellules
-        serie = self.notebook
-        cells = []
-        for cell in serie.cells:
-            JSON_cell = {}
-            if cell.type == 'CodeCell':
-                JSON_cell = {'cell_type': 'code',
-                         'id': cell.id,
-                         'metadata': {},
-                         'execution_count': cell.execution_count,
-                         'outputs': [],
-                         'source': cell.source}
-            elif cell.type == 'MarkdownCell':
-                JSON_cell = {'cell_type': 'markdown',
-                         'id': cell.id,
-                         'metadata': {},
-                         'source': cell.source}
-        
-            cells.append(JSON_cell)
-        
-        # On peut alors créer le notebook avec son objet metadata 
-        JSON = {'cells': cells, 
-               'metadata': {}, 
-               'nbformat': int(serie.version[0]), 
-               'nbformat_minor': int(serie.version[-1])} 
-        
-        return JSON 
+        return self._notebook([self._cell(cell) for cell in self.notebook])
 
-        
+    def write(self, file, mode="compact"):
+        r"""Writes the notebook (JSON) to a binary file, one cell at a time.
 
-    def to_file(self, filename):
+        Args:
+            file: a binary file, open for writing.
+            mode (str): "compact" or "nbformat-pretty" (see `notebook_json`).
+
+        Usage:
+
+                >>> import io
+                >>> file = io.BytesIO()
+                >>> Serializer(Notebook.from_file("samples/minimal.ipynb")).write(file)
+                >>> file.getvalue()
+                b'{"cells":[],"metadata":{},"nbformat":4,"nbformat_minor":5}'
+        """
+        cells = (
+            notebook_stream.dumps_fragment(self._cell(cell), mode, level=2)
+            for cell in self.notebook
+        )
+        notebook_stream.write_json(self._notebook(cells), file, mode)
+
+    def to_file(self, filename, mode="compact"):
         r"""Serializes the notebook to a file
 
+        The file is replaced atomically: it may be the file the notebook
+        was (lazily) loaded from.
+
         Args:
             filename (str): the name of the file to write to.
+            mode (str): "compact" or "nbformat-pretty" (see `notebook_json`).
 
         Usage:
 
@@ -244,8 +352,8 @@ class Serializer:
                 b777420a
                 a23ab5ac
         """
-        JSON = Serializer.serialize(self)
-        toolbox.save_ipynb(JSON, filename)
+        with notebook_stream.atomic_open(filename) as file:
+            self.write(file, mode)
 
 
 # -
@@ -319,9 +427,18 @@ class PyPercentSerializer:
 class Outliner:
     r"""Quickly outlines the strucure of the notebook in a readable format.
 
+    The outline of each cell is kept, keyed by the cell id, type, source
+    lines and execution count: outlining the notebook again after an edit
+    only renders the modified cells. The outlines of the
+    cells that are gone are forgotten at each complete outline.
+
     Args:
         notebook (Notebook): the notebook to outline.
 
+    Attributes:
+        hits (int): the number of cell outlines found in the cache.
+        misses (int): the number of cell outlines rendered.
+
     Usage:
 
             >>> nb = Notebook.from_file("samples/hello-world.ipynb")
@@ -339,31 +456,80 @@ class Outliner:
     """
     def __init__(self, notebook):
         self.notebook = notebook
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}  # (id, type, source, execution_count) -> outline de la cellule
+
+    def _fragments(self):
+        # Les cellules inchangées ne sont pas rendues à nouveau ; le cache ne
+        # garde que les cellules du dernier outline complet
+        cached, fresh = self._cache.get, {}
+        count = misses = 0
+        yield f'Jupyter Notebook v{self.notebook.version}\n'
+        for count, cell in enumerate(self.notebook, 1):
+            execution_count = getattr(cell, 'execution_count', None)
+            # Les lignes elles-mêmes : une collision de hash ne peut pas
+            # renvoyer l'outline d'une autre cellule (chaque str garde son
+            # hash en cache, seules les lignes nouvelles sont relues)
+            key = (cell.id, cell.type, tuple(cell.source), execution_count)
+            fragment = cached(key)
+            if fragment is None:
+                misses += 1
+                fragment = outline_cell(cell.type, cell.id, cell.source, execution_count)
+            fresh[key] = fragment
+            yield fragment
+        self.hits += count - misses
+        self.misses += misses
+        self._cache = fresh
+
+    def iter_outline(self):
+        r"""Outlines the notebook, line by line.
+
+        Returns:
+            iterator: the lines (str, ending with a newline but the last
+                one) of the outline.
+        """
+        for fragment in self._fragments():
+            *lines, last = fragment.split('\n')
+            for line in lines:
+                yield line + '\n'
+            if last:
+                yield last
 
     def outline(self):
         r"""Outlines the notebook in a readable format.
 
+        The outline of each cell is rendered once and cached: outlining
+        the notebook again after an edit only renders its modified cells,
+        and joins the outlines of the others.
+
         Returns:
             str: a string representing the outline of the notebook.
         """
-        nb = self.notebook
-        res = f'Jupyter Notebook v{nb.version}\n'
-        for cell in nb: 
-            
-            if cell.type == 'MarkdownCell':
-                res += f'└─▶ Markdown cell #{cell.id}' + '\n'
-            elif cell.type == 'CodeCell':
-                res += f'└─▶ Code cell #{cell.id} ({cell.execution_count})' + '\n'
-            
-            if len(cell.source) == 1: # Attention, il faut formater la parenthèse qui contient la source
-                res += '    | ' + cell.source[0] + '\n'
-            else: 
-                for s, line in enumerate(cell.source): # ce qui requiert une myriade de test 
-                    if s == 0: 
-                        res += '    ┌ ' + line 
-                    elif s == len(cell.source)-1:
-                        res += '    └ ' + line + '\n'
-                    else: 
-                        res += '    | ' + line 
-                
-        return res
+        with notebook_instrument.stage("Outliner.outline"):
+            return ''.join(list(self._fragments()))
+
+
+def outline_cell(cell_type, id, source, execution_count):
+    r"""Return the outline (str) of a cell.
+
+    Usage:
+
+        >>> outline_cell('CodeCell', 'b777420a', ['print("Hello world!")'], 1)
+        '└─▶ Code cell #b777420a (1)\n    | print("Hello world!")\n'
+    """
+    if cell_type == 'MarkdownCell':
+        header = f'└─▶ Markdown cell #{id}\n'
+    elif cell_type == 'CodeCell':
+        header = f'└─▶ Code cell #{id} ({execution_count})\n'
+    elif cell_type == 'RawCell':
+        header = f'└─▶ Raw cell #{id}\n'
+    else:
+        header = ''
+
+    if len(source) == 1: # Attention, il faut formater la parenthèse qui contient la source
+        return header + '    | ' + source[0] + '\n'
+    if not source:
+        return header
+    # Les lignes de la source finissent déjà par un retour à la ligne, sauf la dernière
+    return f"{header}    ┌ {'    | '.join(source[:-1])}    └ {source[-1]}\n"
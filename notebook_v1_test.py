@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
 
@@ -35,6 +37,13 @@ class Question9(unittest.TestCase):
         ['Hello world!\n', '============\n', 'Print `Hello world!`:'],
              markdown_cell.source)
 
+    def test_cells_slots(self):
+        nb = Notebook.from_file("samples/hello-world.ipynb")
+        for cell in nb:
+            self.assertFalse(hasattr(cell, "__dict__"))
+        self.assertEqual("MarkdownCell", nb.cells[0].type)
+        self.assertEqual("CodeCell", nb.cells[1].type)
+
     def test_build_notebook_minimal(self):
         ipynb = toolbox.load_ipynb("samples/minimal.ipynb")
         nb = Notebook(ipynb)
@@ -65,25 +74,99 @@ class Question12(unittest.TestCase):
         self.assertEqual(
             {'cells': [{'cell_type': 'markdown',
                 'id': 'a9541506',
-                'medatada': {},
+                'metadata': {},
                 'source': ['Hello world!\n',
                            '============\n',
                            'Print `Hello world!`:']},
                {'cell_type': 'code',
                 'execution_count': 1,
                 'id': 'b777420a',
-                'medatada': {},
-                'outputs': [],
+                'metadata': {},
+                'outputs': [{'name': 'stdout',
+                             'output_type': 'stream',
+                             'text': ['Hello world!\n']}],
                 'source': ['print("Hello world!")']},
                {'cell_type': 'markdown',
                 'id': 'a23ab5ac',
-                'medatada': {},
+                'metadata': {},
                 'source': ['Goodbye! 👋']}],
             'metadata': {},
             'nbformat': 4,
             'nbformat_minor': 5}
             , s.serialize())
 
+    def test_to_file_lossless(self):
+        directory = tempfile.mkdtemp()
+        try:
+            output = os.path.join(directory, "serialized.ipynb")
+            for filename in ["samples/metadata.ipynb", "samples/images.ipynb", "samples/streams.ipynb"]:
+                with open(filename, "rb") as file:
+                    original = file.read()
+                for nb in [Notebook.from_file(filename), Notebook.from_file(filename, stream=True)]:
+                    Serializer(nb).to_file(output, mode="nbformat-pretty")
+                    with open(output, "rb") as file:
+                        self.assertEqual(original, file.read())
+                    Serializer(nb).to_file(output)
+                    self.assertEqual(notebook.load_ipynb(filename), notebook.load_ipynb(output))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_raw_cells_and_attachments(self):
+        ipynb = notebook.load_ipynb("samples/hello-world.ipynb")
+        ipynb["cells"][0]["attachments"] = {
+            "dot.png": {"image/png": "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR4nGNgYGD4DwABBAEAwS2OUAAAAABJRU5ErkJggg=="}
+        }
+        ipynb["cells"][0]["source"].append("\n![dot](attachment:dot.png)")
+        ipynb["cells"].insert(1, {
+            "cell_type": "raw", "id": "c8f0b8e2", "metadata": {"format": "text/x-rst"},
+            "source": ["**raw**"],
+        })
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "raw.ipynb")
+            output = os.path.join(directory, "serialized.ipynb")
+            notebook.save_ipynb(ipynb, filename, "nbformat-pretty")
+            with open(filename, "rb") as file:
+                original = file.read()
+            for nb in [Notebook.from_file(filename), Notebook.from_file(filename, stream=True),
+                       Notebook.from_file(filename, lazy=True)]:
+                Serializer(nb).to_file(output, mode="nbformat-pretty")
+                with open(output, "rb") as file:
+                    self.assertEqual(original, file.read())
+            self.assertEqual(["MarkdownCell", "RawCell", "CodeCell", "MarkdownCell"],
+                             [cell.type for cell in Notebook(ipynb)])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_unknown_cell_type(self):
+        ipynb = notebook.load_ipynb("samples/hello-world.ipynb")
+        ipynb["cells"][0]["cell_type"] = "heading"
+        with self.assertRaises(ValueError):
+            Notebook(ipynb)
+
+    def test_version(self):
+        ipynb = notebook.load_ipynb("samples/minimal.ipynb")
+        ipynb["nbformat_minor"] = 10
+        serialized = Serializer(Notebook(ipynb)).serialize()
+        self.assertEqual((4, 10), (serialized["nbformat"], serialized["nbformat_minor"]))
+
+    def test_edit_in_place(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "images.ipynb")
+            shutil.copy("samples/images.ipynb", filename)
+            os.chmod(filename, 0o640)
+            nb = Notebook.from_file(filename, lazy=True)
+            nb.cells[0].source = ["edited"]
+            Serializer(nb).to_file(filename, mode="nbformat-pretty")
+            expected = notebook.load_ipynb("samples/images.ipynb")
+            expected["cells"][0]["source"] = ["edited"]
+            self.assertEqual(expected, notebook.load_ipynb(filename))
+            self.assertEqual(0o640, os.stat(filename).st_mode & 0o777)
+            self.assertEqual(["images.ipynb"], os.listdir(directory))
+        finally:
+            shutil.rmtree(directory)
+
 class Question13(unittest.TestCase):
     def test_py_percent_serializer(self):
             nb = Notebook.from_file("samples/hello-world.ipynb")
@@ -117,5 +200,40 @@ class Question14(unittest.TestCase):
             , o.outline()
             )
 
+    def test_iter_outline(self):
+        for filename in ["samples/hello-world.ipynb", "samples/errors.ipynb", "samples/images.ipynb"]:
+            nb = Notebook.from_file(filename)
+            lines = list(Outliner(nb).iter_outline())
+            self.assertEqual(lines[0], f"Jupyter Notebook v{nb.version}\n")
+            self.assertEqual("".join(lines), Outliner(nb).outline())
+
+    def test_outline_cache(self):
+        nb = Notebook.from_file("samples/hello-world.ipynb")
+        outliner = Outliner(nb)
+        first = outliner.outline()
+        self.assertEqual(first, outliner.outline())
+        self.assertEqual((3, 3), (outliner.hits, outliner.misses))
+        nb.cells[1].source = ['print("Hello cache!")']
+        outline = outliner.outline()
+        self.assertEqual((5, 4), (outliner.hits, outliner.misses))  # seule la cellule modifiée
+        self.assertEqual(outline, first.replace("Hello world!\")", "Hello cache!\")"))
+        nb.cells[1].execution_count = 2
+        nb.cells[2].source = ["Goodbye!", " 👋"]  # même texte, autres lignes
+        outline = outliner.outline()
+        self.assertEqual((6, 6), (outliner.hits, outliner.misses))
+        self.assertEqual(Outliner(nb).outline(), outline)
+        self.assertEqual(3, len(outliner._cache))  # les anciennes versions sont oubliées
+
+    def test_outline_cache_collision(self):
+        class Line(str):
+            def __hash__(self):
+                return 0
+        nb = Notebook.from_file("samples/hello-world.ipynb")
+        outliner = Outliner(nb)
+        nb.cells[2].source = [Line("Goodbye!")]
+        outliner.outline()
+        nb.cells[2].source = [Line("Farewell!")]  # même hash, autre texte
+        self.assertEqual(Outliner(nb).outline(), outliner.outline())
+
 if __name__ == "__main__":
     unittest.main()
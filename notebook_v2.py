@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 # Pour git
-from black import re
 import notebook_v0 as toolbox
+import notebook_instrument
 from notebook_v1 import Serializer, PyPercentSerializer, Outliner
 import pprint
 import json
@@ -18,11 +18,19 @@ class CodeCell:
         id (str): The unique ID of the cell.
         source (list): The source code of the cell, as a list of str.
         execution_count (int): The execution count of the cell.
+        outputs (list): The outputs of the cell, as a list of dict
+            (defaults to no outputs).
+        metadata (dict): The metadata of the cell (defaults to none).
 
     Attributes:
         id (str): The unique ID of the cell.
         source (list): The source code of the cell, as a list of str.
         execution_count (int): The execution count of the cell.
+        outputs (list): The outputs of the cell, as a list of dict (their
+            large values are `notebook_stream.OutputBlob`s when lazily loaded).
+        metadata (dict): The metadata of the cell.
+        type (str): 'CodeCell', a class attribute (the cells store their
+            attributes in __slots__, without a per-instance __dict__).
 
     Usage:
 
@@ -35,7 +43,10 @@ class CodeCell:
         >>> code_cell.source
         ['print("Hello world!")']
     """
-    def __init__(self, id, source, execution_count):
+    __slots__ = ('id', 'source', 'execution_count', 'outputs', 'metadata')
+    type = 'CodeCell'
+
+    def __init__(self, id, source, execution_count, outputs=None, metadata=None):
         try: 
             self.id = id
         except KeyError:
@@ -43,7 +54,27 @@ class CodeCell:
         
         self.source = source 
         self.execution_count = execution_count 
-        self.type = 'CodeCell'
+        self.outputs = [] if outputs is None else outputs
+        self.metadata = {} if metadata is None else metadata
+
+    def replace(self, **changes):
+        r"""Returns a new cell with new values for the given attributes.
+
+        The cell is not modified, and its other attributes (source,
+        outputs...) are shared with the new cell, not copied.
+
+        Usage:
+
+            >>> cell = CodeCell("b777420a", ['print("Hello world!")'], 1)
+            >>> cleared = cell.replace(execution_count=None, outputs=[])
+            >>> cleared.execution_count, cleared.source is cell.source
+            (None, True)
+            >>> cell.execution_count
+            1
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return type(self)(**values)
 
 class MarkdownCell:
     r"""A Cell of Markdown markup in a Jupyter notebook.
@@ -51,10 +82,13 @@ class MarkdownCell:
     Args:
         id (str): The unique ID of the cell.
         source (list): The source code of the cell, as a list of str.
+        metadata (dict): The metadata of the cell (defaults to none).
 
     Attributes:
         id (str): The unique ID of the cell.
         source (list): The source code of the cell, as a list of str.
+        metadata (dict): The metadata of the cell.
+        type (str): 'MarkdownCell', a class attribute.
 
     Usage:
 
@@ -68,22 +102,25 @@ class MarkdownCell:
         >>> markdown_cell.source
         ['Hello world!', '============', 'Print `Hello world!`:']
     """
-    def __init__(self, id, source): 
+    __slots__ = ('id', 'source', 'metadata')
+    type = 'MarkdownCell'
+
+    def __init__(self, id, source, metadata=None): 
         try: 
             self.id = id
         except KeyError:
             self.id = 'no documented id'
 
         self.source = source
-        self.type = 'MarkdownCell'
+        self.metadata = {} if metadata is None else metadata
 
-markdown_cell = MarkdownCell("a9541506", [
-     "Hello world!",
-     "============",
-     "Print `Hello world!`:"
- ])
-print(markdown_cell.id)
-print(markdown_cell.source)
+    def replace(self, **changes):
+        r"""Returns a new cell with new values for the given attributes
+        (see `CodeCell.replace`).
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return type(self)(**values)
 
 
 class Notebook:
@@ -92,10 +129,12 @@ class Notebook:
     Args:
         version (str): The version of the notebook format.
         cells (list): The cells of the notebook (either CodeCell or MarkdownCell).
+        metadata (dict): The metadata of the notebook (defaults to none).
 
     Attributes:
         version (str): The version of the notebook format.
         cells (list): The cells of the notebook (either CodeCell or MarkdownCell).
+        metadata (dict): The metadata of the notebook.
 
     Usage:
 
@@ -119,42 +158,29 @@ class Notebook:
         True
     """
 
-    def __init__(self, version, cells):
+    __slots__ = ('version', 'cells', 'metadata')
+
+    def __init__(self, version, cells, metadata=None):
         self.version = version 
         self.cells = cells
+        self.metadata = {} if metadata is None else metadata
     
     def __iter__(self):
         r"""Iterate the cells of the notebook.
         """
         return iter(self.cells)
 
-# +
-version = "4.5"
-cells = [
-     MarkdownCell("a9541506", [
-         "Hello world!",
-         "============",
-         "Print `Hello world!`:"
-     ]),
-     CodeCell("b777420a", ['print("Hello world!")'], 1),
- ]
-nb = Notebook(version, cells)
-print(nb.version)
-print(isinstance(nb.cells, list))
-print(isinstance(nb.cells[0], MarkdownCell))
-print(isinstance(nb.cells[1], CodeCell))
-
-for cell in nb:
-    print(cell)
-
-
-# -
 
 class NotebookLoader:
     r"""Loads a Jupyter Notebook from a file
 
     Args:
         filename (str): The name of the file to load.
+        lazy (bool): Memory-map the file and keep the large outputs
+            undecoded in it (defaults to False).
+        cache (notebook_cache.ConversionCache): A cache of the loaded
+            notebooks, keyed by the content of the file (defaults to None;
+            not used for lazy loads).
 
     Usage:
             >>> nbl = NotebookLoader("samples/hello-world.ipynb")
@@ -166,37 +192,91 @@ class NotebookLoader:
             a9541506
             b777420a
             a23ab5ac
+
+            >>> nb = NotebookLoader("samples/images.ipynb", lazy=True).load()
+            >>> nb.cells[-1].outputs[0]['data']['image/png'] # doctest: +ELLIPSIS
+            OutputBlob('samples/images.ipynb', ..., ...)
     """
-    def __init__(self, filename):
+    def __init__(self, filename, lazy=False, cache=None):
         self.filename = filename
+        self.lazy = lazy
+        self.cache = cache
 
 
     def load(self):
         r"""Loads a Notebook instance from the file.
         """
-        ipynb = toolbox.load_ipynb(self.filename)
-        version = toolbox.get_format_version(ipynb)
+        with notebook_instrument.stage("NotebookLoader.load"):
+            # Les OutputBlob (mmap) ne peuvent pas être mis en cache
+            if self.cache is not None and not self.lazy:
+                return self.cache.load(self.filename)
+            return self.from_ipynb(toolbox.load_ipynb(self.filename, lazy=self.lazy))
+
+    @staticmethod
+    def from_ipynb(ipynb):
+        r"""Builds a Notebook instance from a notebook (dict).
+
+        Usage:
+            >>> nb = NotebookLoader.from_ipynb(toolbox.load_ipynb("samples/minimal.ipynb"))
+            >>> nb.version, nb.cells
+            ('4.5', [])
+        """
+        with notebook_instrument.stage("NotebookLoader.from_ipynb"):
+            version = toolbox.get_format_version(ipynb)
+
+            cells = []
+            for cell in toolbox.get_cells(ipynb): # nf stands for non_formated
+                cell = cell_from_dict(cell)
+                if cell is not None:
+                    cells.append(cell)
+        if notebook_instrument.is_enabled():
+            notebook_instrument.count("cells", len(cells))
+            notebook_instrument.count(
+                "outputs", sum(len(cell.outputs) for cell in cells if cell.type == 'CodeCell')
+            )
+        return Notebook(version, cells, ipynb.get('metadata'))
 
-        cells = []
-        for cell in toolbox.get_cells(ipynb): # nf stands for non_formated
-            
-            try: 
-                id = cell['id']
-            except KeyError:
-                id = 'no documented id'
-            
-            if cell['cell_type'] == 'code':
-                cells.append(CodeCell(id, cell['source'], cell['execution_count']))
-            elif cell['cell_type'] == 'markdown':
-                cells.append(MarkdownCell(id, cell['source']))
-        
-        return Notebook(version, cells)
 
-nbl = NotebookLoader("samples/errors.ipynb")
-nb = nbl.load()
-nb.version
-for cell in nb:
-     print(cell.id)
+def cell_from_dict(cell):
+    r"""Builds a CodeCell or a MarkdownCell from a notebook cell (dict).
+
+    Returns:
+        CodeCell or MarkdownCell: the cell (None for the other cell types).
+
+    Usage:
+
+        >>> cell_from_dict({'cell_type': 'markdown', 'source': ['# Title']}).id
+        'no documented id'
+    """
+    try: 
+        id = cell['id']
+    except KeyError:
+        id = 'no documented id'
+    
+    if cell['cell_type'] == 'code':
+        return CodeCell(id, cell['source'], cell['execution_count'], cell['outputs'],
+                        cell.get('metadata'))
+    elif cell['cell_type'] == 'markdown':
+        return MarkdownCell(id, cell['source'], cell.get('metadata'))
+    return None
+
+
+def markdownize_cell(cell):
+    r"""Transforms a code cell into a markdown cell (a python code block);
+    the other cells are returned as is.
+
+    The cell is not modified.
+
+    Usage:
+
+        >>> markdownize_cell(CodeCell("b777420a", ['print("Hello world!")'], 1)).source
+        [' ```python\n', 'print("Hello world!")', ' \n ``` ']
+    """
+    if isinstance(cell, CodeCell):
+        # Une nouvelle liste : la source de la cellule de code n'est pas modifiée
+        source = [""" ```python\n""", *cell.source, """ \n ``` """]
+        return MarkdownCell(cell.id, source, cell.metadata)
+    return cell
 
 
 class Markdownizer:
@@ -226,29 +306,17 @@ class Markdownizer:
 
     def markdownize(self):
         r"""Transforms the notebook to a pure markdown notebook.
+
+        The notebook is not modified: its markdown cells (and their
+        sources) are shared with the new notebook, and the code cells are
+        replaced by new markdown cells.
         """
         notebook = self.notebook 
         version = notebook.version 
         
-        new_cells = []
-        for cell in notebook: 
-            if isinstance(cell, CodeCell):
-                source = cell.source
-                source.append(""" \n ``` """)
-                source.insert(0, """ ```python\n""")                 
-                new_cells.append(MarkdownCell(cell.id, source))                
-            else:
-                new_cells.append(cell)
+        new_cells = [markdownize_cell(cell) for cell in notebook]
                 
-        return Notebook(version,new_cells)
-
-nb = NotebookLoader("samples/hello-world.ipynb").load()
-nb2 = Markdownizer(nb).markdownize()
-print(nb2.version)
-for cell in nb2:
-     print(cell.id)
-print(isinstance(nb2.cells[1], MarkdownCell))
-Serializer(nb2).to_file("samples/hello-world-markdown.ipynb")
+        return Notebook(version,new_cells, notebook.metadata)
 
 
 class MarkdownLesser:
@@ -272,6 +340,9 @@ class MarkdownLesser:
     def remove_markdown_cells(self):
         r"""Removes markdown cells from the notebook.
 
+        The notebook is not modified: its code cells are shared with the
+        new notebook.
+
         Returns:
             Notebook: a Notebook instance with only code cells
         """
@@ -283,18 +354,8 @@ class MarkdownLesser:
             if isinstance(cell, CodeCell):
                 code_cells.append(cell)
             
-        return Notebook(version, code_cells)
-
-# +
-nb = NotebookLoader("samples/hello-world.ipynb").load()
-nb2 = MarkdownLesser(nb).remove_markdown_cells()
+        return Notebook(version, code_cells, notebook.metadata)
 
-print(isinstance(nb2.cells[0], CodeCell))
-
-print(Outliner(nb2).outline())
-
-
-# -
 class PyPercentLoader:
     r"""Loads a Jupyter Notebook from a py-percent file.
 
@@ -316,6 +377,11 @@ class PyPercentLoader:
             a9541506
             b777420a
             a23ab5ac
+            >>> for cell in nb2:
+            ...     print(cell.type, cell.source)
+            MarkdownCell ['Hello world!\n', '============\n', 'Print `Hello world!`:']
+            CodeCell ['print("Hello world!")']
+            MarkdownCell ['Goodbye! 👋']
     """
 
     def __init__(self, filename, version="4.5"):
@@ -324,7 +390,44 @@ class PyPercentLoader:
 
     def load(self):
         r"""Loads a Notebook instance from the py-percent file.
+
+        The file is read line by line, in a single pass: a "# %%" line starts
+        a code cell and a "# %% [markdown]" line a markdown cell, whose lines
+        lose their "# " prefix. The blank lines that separate the cells are
+        dropped; the lines before the first header (if any) make a code cell.
+        The cells have no id ('no documented id') and no execution count.
         """
-        pass
+        cells = []
+        markdown, lines = False, []
+        with open(self.filename, encoding='utf-8') as percent_file:
+            for line in percent_file:
+                if line.startswith('# %%'):
+                    if cells or lines:
+                        cells.append(_percent_cell(markdown, lines))
+                    markdown = line[4:].strip() in ('[markdown]', '[md]')
+                    lines = []
+                elif markdown and line.startswith('#'):
+                    # '# texte' -> 'texte', '#' -> ''
+                    lines.append(line[2:] if line.startswith('# ') else line[1:])
+                else:
+                    lines.append(line)
+        if cells or lines:
+            cells.append(_percent_cell(markdown, lines))
+        # Lignes vides (ou rien) avant le premier en-tête
+        if cells and cells[0].type == 'CodeCell' and not cells[0].source:
+            del cells[0]
+        return Notebook(self.version, cells)
+
+
+def _percent_cell(markdown, lines):
+    # Les lignes vides de séparation sont retirées, et la dernière ligne
+    # perd son retour à la ligne (comme dans les fichiers .ipynb)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if lines and lines[-1].endswith('\n'):
+        lines[-1] = lines[-1][:-1]
+    if markdown:
+        return MarkdownCell('no documented id', lines)
+    return CodeCell('no documented id', lines, None)
 
 
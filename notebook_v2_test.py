@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 import unittest
 import numpy as np
 
@@ -26,6 +28,14 @@ class Question15(unittest.TestCase):
         ['Hello world!\n', '============\n', 'Print `Hello world!`:'],
              markdown_cell.source)
 
+    def test_cells_slots(self):
+        code_cell = CodeCell("b777420a", ['print("Hello world!")'], 1)
+        markdown_cell = MarkdownCell("a9541506", ["Hello world!"])
+        self.assertFalse(hasattr(code_cell, "__dict__"))
+        self.assertFalse(hasattr(markdown_cell, "__dict__"))
+        self.assertEqual("CodeCell", code_cell.type)
+        self.assertEqual("MarkdownCell", markdown_cell.type)
+
     def test_build_notebook(self):
         version = "4.5"
         cells = [
@@ -59,12 +69,40 @@ class Question17(unittest.TestCase):
         self.assertIsInstance(nb2.cells[1], MarkdownCell)
         self.assertIsInstance(nb2.cells[2], MarkdownCell)
 
+    def test_markdownizer_copy_on_write(self):
+        nb = NotebookLoader("samples/hello-world.ipynb").load()
+        sources = [list(cell.source) for cell in nb]
+        nb2 = Markdownizer(nb).markdownize()
+        Markdownizer(nb).markdownize()
+        self.assertEqual(sources, [cell.source for cell in nb])
+        self.assertIsInstance(nb.cells[1], CodeCell)
+        self.assertIs(nb.cells[0], nb2.cells[0])
+        self.assertIs(nb.cells[2], nb2.cells[2])
+        self.assertEqual(
+            [' ```python\n', 'print("Hello world!")', ' \n ``` '], nb2.cells[1].source
+        )
+
+    def test_replace(self):
+        nb = NotebookLoader("samples/hello-world.ipynb").load()
+        code_cell = nb.cells[1]
+        cleared = code_cell.replace(execution_count=None, outputs=[])
+        self.assertEqual((None, []), (cleared.execution_count, cleared.outputs))
+        self.assertIs(code_cell.source, cleared.source)
+        self.assertEqual(1, code_cell.execution_count)
+        self.assertEqual(1, len(code_cell.outputs))
+        renamed = nb.cells[0].replace(id="renamed")
+        self.assertEqual(("renamed", "a9541506"), (renamed.id, nb.cells[0].id))
+        with self.assertRaises(TypeError):
+            nb.cells[0].replace(outputs=[])
+
 class Question18(unittest.TestCase):
     def test_markdownlesser(self):
         nb = NotebookLoader("samples/hello-world.ipynb").load()
         nb2 = MarkdownLesser(nb).remove_markdown_cells()
         self.assertEqual(1, len(nb2.cells))
         self.assertIsInstance(nb2.cells[0], CodeCell)
+        self.assertIs(nb.cells[1], nb2.cells[0])
+        self.assertEqual(3, len(nb.cells))
 
 class Question19(unittest.TestCase):
     def test_py_percent_loader(self):
@@ -76,6 +114,78 @@ class Question19(unittest.TestCase):
         self.assertEqual("b777420a", nb.cells[1].id)
         self.assertEqual("a23ab5ac", nb.cells[2].id)
 
+    def test_py_percent_round_trip(self):
+        for name in ("hello-world", "streams", "errors", "images", "metadata", "minimal"):
+            nb = NotebookLoader(f"samples/{name}.ipynb").load()
+            PyPercentSerializer(nb).to_file("samples/round-trip-py-percent.py")
+            nb2 = PyPercentLoader("samples/round-trip-py-percent.py").load()
+            self.assertEqual(
+                [(cell.type, cell.source) for cell in nb],
+                [(cell.type, cell.source) for cell in nb2],
+            )
+            self.assertEqual(
+                PyPercentSerializer(nb).to_py_percent(),
+                PyPercentSerializer(nb2).to_py_percent(),
+            )
+        os.remove("samples/round-trip-py-percent.py")
+
+    def test_py_percent_loader_lines(self):
+        with open("samples/lines-py-percent.py", "w", encoding="utf-8") as file:
+            file.write(
+                "import os\n\n"
+                "# %% [markdown]\n# Title\n#\n#  indented\n\n\n"
+                "# %%\nx = 1\n\ny = 2\n"
+                "# %%\n"
+            )
+        try:
+            nb = PyPercentLoader("samples/lines-py-percent.py", version="4.4").load()
+        finally:
+            os.remove("samples/lines-py-percent.py")
+        self.assertEqual("4.4", nb.version)
+        self.assertEqual(
+            [
+                ("CodeCell", ["import os"]),
+                ("MarkdownCell", ["Title\n", "\n", " indented"]),
+                ("CodeCell", ["x = 1\n", "\n", "y = 2"]),
+                ("CodeCell", []),
+            ],
+            [(cell.type, cell.source) for cell in nb],
+        )
+        self.assertEqual(
+            ["no documented id"] * 4, [cell.id for cell in nb]
+        )
+
+class ImportTime(unittest.TestCase):
+    # secondes, pour un import à froid dans un nouvel interpréteur
+    BUDGET = 0.25
+
+    def measure_import(self):
+        code = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import notebook_v2\n"
+            "print(time.perf_counter() - start)\n"
+            "print(sorted(name for name in ('numpy', 'PIL', 'black') if name in sys.modules))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.splitlines()
+        return float(output[0]), output[1]
+
+    def test_import_time(self):
+        seconds = min(self.measure_import()[0] for _ in range(3))
+        self.assertLess(seconds, self.BUDGET)
+
+    def test_no_heavy_imports(self):
+        self.assertEqual("[]", self.measure_import()[1])
+
+    def test_no_side_effects(self):
+        before = sorted(os.listdir("samples"))
+        self.measure_import()
+        self.assertEqual(before, sorted(os.listdir("samples")))
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()